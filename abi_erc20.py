@@ -0,0 +1,18 @@
+# Generado por web3_mpy/abi_compiler.py a partir de abi.json. No editar a mano.
+# (nombre, selector, tipos_entrada, tipos_salida, nombres_salida, mutabilidad)
+FUNCTIONS = (
+    ('allowance', b'\xddb\xed>', ('address', 'address'), ('uint256',), ('',), 'view'),
+    ('approve', b'\t^\xa7\xb3', ('address', 'uint256'), ('bool',), ('',), 'nonpayable'),
+    ('balanceOf', b'p\xa0\x821', ('address',), ('uint256',), ('',), 'view'),
+    ('decimals', b'1<\xe5g', (), ('uint8',), ('',), 'view'),
+    ('name', b'\x06\xfd\xde\x03', (), ('string',), ('',), 'view'),
+    ('symbol', b'\x95\xd8\x9bA', (), ('string',), ('',), 'view'),
+    ('totalSupply', b'\x18\x16\r\xdd', (), ('uint256',), ('',), 'view'),
+    ('transfer', b'\xa9\x05\x9c\xbb', ('address', 'uint256'), ('bool',), ('',), 'nonpayable'),
+)
+
+# (nombre, topic0, tipos, indexados, nombres, anónimo)
+EVENTS = (
+    ('Approval', '0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925', ('address', 'address', 'uint256'), (1, 1, 0), ('owner', 'spender', 'value'), False),
+    ('Transfer', '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef', ('address', 'address', 'uint256'), (1, 1, 0), ('from', 'to', 'value'), False),
+)
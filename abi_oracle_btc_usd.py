@@ -0,0 +1,17 @@
+# Generado por web3_mpy/abi_compiler.py a partir de abi_oracle_Btc_Usd.json. No editar a mano.
+# (nombre, selector, tipos_entrada, tipos_salida, nombres_salida, mutabilidad)
+FUNCTIONS = (
+    ('aggregator', b'$Z{\xfc', (), ('address',), ('',), 'view'),
+    ('decimals', b'1<\xe5g', (), ('uint8',), ('',), 'view'),
+    ('description', b'r\x84\xe4\x16', (), ('string',), ('',), 'view'),
+    ('getRoundData', b'\x9ao\xc8\xf5', ('uint80',), ('uint80', 'int256', 'uint256', 'uint256', 'uint80'), ('roundId', 'answer', 'startedAt', 'updatedAt', 'answeredInRound'), 'view'),
+    ('latestAnswer', b'P\xd2[\xcd', (), ('int256',), ('',), 'view'),
+    ('latestRound', b'f\x8a\x0f\x02', (), ('uint256',), ('',), 'view'),
+    ('latestRoundData', b'\xfe\xaf\x96\x8c', (), ('uint80', 'int256', 'uint256', 'uint256', 'uint80'), ('roundId', 'answer', 'startedAt', 'updatedAt', 'answeredInRound'), 'view'),
+)
+
+# (nombre, topic0, tipos, indexados, nombres, anónimo)
+EVENTS = (
+    ('AnswerUpdated', '0x0559884fd3a460db3073b7fc896cc77986f16e378210ded43186175bf646fc5f', ('int256', 'uint256', 'uint256'), (1, 1, 0), ('current', 'roundId', 'updatedAt'), False),
+    ('NewRound', '0x0109fc6f55cf40689f02fbaad7af7fe7bbac8a3d2186600afc7d3e10cac60271', ('uint256', 'address', 'uint256'), (1, 1, 0), ('roundId', 'startedBy', 'startedAt'), False),
+)
@@ -0,0 +1,60 @@
+# main/benchmarks/bench_abi_decode.py
+#
+# Benchmark de decodificación ABI sobre un retorno grande uint256[].
+# Compara el camino anterior (bytes.fromhex + copia de cada slot de 32 bytes)
+# con el decodificador sobre memoryview y con el acceso perezoso a un campo.
+# Se ejecuta igual en MicroPython (ESP32) y en CPython.
+
+import sys, gc
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.abi import encode_types, decode_types, parse_type, decode_abi
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+N = 500        # elementos del array
+ROUNDS = 5
+
+
+def legacy_decode_uint_array(raw_result):
+    # Réplica del decode_output/decode_dynamic anterior para uint256[]
+    full_data = bytes.fromhex(raw_result[2:])
+    head_slots = [full_data[0:32]]
+    offset = int.from_bytes(head_slots[0], "big")
+    length = int.from_bytes(full_data[offset:offset + 32], "big")
+    arr = []
+    for i in range(length):
+        start = offset + 32 + i * 32
+        element_data = full_data[start:start + 32]
+        arr.append(int.from_bytes(element_data, "big"))
+    return arr
+
+
+def run(label, fn):
+    gc.collect()
+    before = gc.mem_free() if hasattr(gc, "mem_free") else None
+    start = ticks_ms()
+    for _ in range(ROUNDS):
+        result = fn()
+    ms = elapsed_ms(start) / ROUNDS
+    after = gc.mem_free() if hasattr(gc, "mem_free") else None
+    heap = (before - after) if before is not None else "n/a"
+    print("{:<28} {:>8.1f} ms/llamada   heap usado: {}".format(label, ms, heap))
+    return result
+
+
+values = [(i * 0x10001) << 200 for i in range(N)]
+raw = "0x" + encode_types(["uint256[]"], [values]).hex()
+# latestRoundData seguido de un uint256[] grande: el acceso perezoso solo lee 'answer'
+mixed_types = ["uint80", "int256", "uint256", "uint256", "uint80", "uint256[]"]
+mixed_raw = "0x" + encode_types(mixed_types, [1, -2, 3, 4, 5, values]).hex()
+mixed_nodes = [parse_type(t) for t in mixed_types]
+mixed_names = ("roundId", "answer", "startedAt", "updatedAt", "answeredInRound", "history")
+
+print("uint256[] de {} elementos ({} bytes)".format(N, (len(raw) - 2) // 2))
+a = run("anterior (copias por slot)", lambda: legacy_decode_uint_array(raw))
+b = run("memoryview", lambda: decode_types(["uint256[]"], raw)[0])
+assert a == b
+run("memoryview (todo)", lambda: decode_abi(mixed_nodes, mixed_raw))
+run("perezoso (.answer)", lambda: decode_abi(mixed_nodes, mixed_raw, mixed_names, lazy=True).answer)
@@ -0,0 +1,59 @@
+# main/benchmarks/bench_abi_load.py
+#
+# Compara el arranque de un contrato con el ABI JSON completo frente al ABI
+# compilado con web3_mpy/abi_compiler.py: tiempo de carga + construcción del
+# Contract y heap que queda ocupado. En el ESP32 la diferencia es mayor si el
+# módulo compilado está congelado en el firmware (frozen bytecode).
+
+import sys, gc, json
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.contract import Contract
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+ADDRESS = "0xF4030086522a5bEEa4988F8cA5B36dbC97BeE88c"
+
+
+def open_abi(name):
+    for path in ("main/" + name, name):
+        try:
+            return open(path, "r")
+        except OSError:
+            pass
+    raise OSError("No se encontró " + name)
+
+
+def heap_used():
+    gc.collect()
+    if hasattr(gc, "mem_alloc"):
+        return gc.mem_alloc()
+    return None
+
+
+def measure(label, load):
+    base = heap_used()
+    start = ticks_ms()
+    contract = load()
+    ms = elapsed_ms(start)
+    used = heap_used()
+    resident = (used - base) if base is not None else "n/a"
+    print("{:<22} {:>6} ms   heap residente: {}".format(label, ms, resident))
+    return contract
+
+
+def load_json():
+    with open_abi("abi_oracle_Btc_Usd.json") as f:
+        abi = json.load(f)
+    return Contract(ADDRESS, abi, None)
+
+
+def load_compact():
+    import abi_oracle_btc_usd
+    return Contract(ADDRESS, abi_oracle_btc_usd, None)
+
+
+a = measure("ABI JSON", load_json)
+b = measure("ABI compilado", load_compact)
+assert a.functions.latestRoundData().data == b.functions.latestRoundData().data
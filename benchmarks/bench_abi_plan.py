@@ -0,0 +1,57 @@
+# main/benchmarks/bench_abi_plan.py
+#
+# Compara la codificación/decodificación por llamada analizando el ABI cada vez
+# (parse_params + encode_abi/decode_abi) con el plan compilado una sola vez por
+# función (CodecPlan), sobre getRoundData del oráculo y transfer de ERC-20.
+# Se ejecuta igual en MicroPython (ESP32) y en CPython.
+
+import sys, gc
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.abi import parse_params, encode_abi, decode_abi, encode_types
+from web3_mpy.contract import Contract
+from web3_mpy.clock import ticks_ms, elapsed_ms
+import abi_oracle_btc_usd
+import abi_erc20
+
+ROUNDS = 500
+ROUND_ID = 110680464442257320000
+RECIPIENT = "0x06701723194aF926f01D8480fA559642c425f077"
+
+feed = Contract("0xF4030086522a5bEEa4988F8cA5B36dbC97BeE88c", abi_oracle_btc_usd, None)
+token = Contract("0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238", abi_erc20, None)
+round_fn = feed.functions.getRoundData(ROUND_ID)
+transfer_fn = token.functions.transfer(RECIPIENT, 10 ** 6)
+round_raw = "0x" + encode_types(["uint80", "int256", "uint256", "uint256", "uint80"],
+                                [ROUND_ID, 6512345000000, 1700000000, 1700000012, ROUND_ID]).hex()
+transfer_raw = "0x" + encode_types(["bool"], [True]).hex()
+
+
+def per_call_encode(fn):
+    # Camino anterior: el ABI se analiza en cada llamada
+    return encode_abi(parse_params(fn.abi_item["inputs"]), fn.args, fn.selector)
+
+
+def per_call_decode(fn, raw):
+    return decode_abi(parse_params(fn.abi_item["outputs"]), raw)
+
+
+def run(label, fn):
+    gc.collect()
+    start = ticks_ms()
+    for _ in range(ROUNDS):
+        result = fn()
+    us = elapsed_ms(start) * 1000 / ROUNDS
+    print("{:<34} {:>8.1f} us/llamada".format(label, us))
+    return result
+
+
+for name, fn, raw in (("getRoundData", round_fn, round_raw), ("transfer", transfer_fn, transfer_raw)):
+    a = run(name + " encode (analiza ABI)", lambda: per_call_encode(fn))
+    b = run(name + " encode (plan)", lambda: fn.plan[0].encode(fn.args, fn.selector))
+    assert a == b
+    a = run(name + " decode (analiza ABI)", lambda: per_call_decode(fn, raw))
+    b = run(name + " decode (plan)", lambda: fn.plan[1].decode(raw))
+    assert a == b
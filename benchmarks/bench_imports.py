@@ -0,0 +1,72 @@
+# main/benchmarks/bench_imports.py
+#
+# Informe de arranque: tiempo de importación y heap que queda ocupado por cada
+# módulo de web3_mpy, incluidas las dependencias que arrastra. Cada módulo se
+# mide por separado, desde cero: antes de importarlo se descargan todos los de
+# web3_mpy. Así se ve qué cuesta, por ejemplo, un script de solo lectura
+# (web3 + contract) frente a uno que firma (account).
+# En MicroPython el heap sale de gc.mem_alloc(); en CPython, de tracemalloc.
+# Con el paquete congelado en el firmware (manifest.py) o compilado a .mpy
+# (tools/build_mpy.py) los tiempos bajan y el bytecode deja de contar en el heap.
+
+import sys, gc
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+MODULES = (
+    "web3_mpy.web3",
+    "web3_mpy.contract",
+    "web3_mpy.multicall",
+    "web3_mpy.price_feed",
+    "web3_mpy.cache",
+    "web3_mpy.multi_provider",
+    "web3_mpy.blocks",
+    "web3_mpy.confirmations",
+    "web3_mpy.log_indexer",
+    "web3_mpy.filters",
+    "web3_mpy.fee_oracle",
+    "web3_mpy.account",
+    "web3_mpy.tx",
+    "web3_mpy.ecdsa",
+    "web3_mpy.wallet",
+    "web3_mpy.keccak",
+)
+
+if hasattr(gc, "mem_alloc"):
+    def heap_used():
+        gc.collect()
+        return gc.mem_alloc()
+else:
+    import tracemalloc
+    tracemalloc.start()
+
+    def heap_used():
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+
+
+def unload():
+    for name in [n for n in sys.modules if n.startswith("web3_mpy.") and n != "web3_mpy.clock"]:
+        del sys.modules[name]
+
+
+def measure(name):
+    unload()
+    before_modules = set(sys.modules)
+    base = heap_used()
+    start = ticks_ms()
+    __import__(name)
+    ms = elapsed_ms(start)
+    used = heap_used() - base
+    loaded = [n for n in sys.modules if n not in before_modules]
+    return ms, used, loaded
+
+
+print("{:<26} {:>6} {:>9} {:>8}".format("módulo", "ms", "heap (B)", "módulos"))
+for name in MODULES:
+    ms, used, loaded = measure(name)
+    print("{:<26} {:>6} {:>9} {:>8}".format(name, ms, used, len(loaded)))
+unload()
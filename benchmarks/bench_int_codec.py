@@ -0,0 +1,65 @@
+# main/benchmarks/bench_int_codec.py
+#
+# Compara las conversiones entero <-> bytes/hex byte a byte (como estaban en
+# ecdsa.bytes_to_int, rlp.int_to_bytes y wallet.pad_left) con web3_mpy.codec
+# (int.from_bytes / int.to_bytes, o ubinascii si el port no los tiene).
+# Se ejecuta igual en MicroPython (ESP32) y en CPython.
+
+import sys, gc
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.codec import int_from_bytes, int_to_bytes, int_to_min_bytes, int_to_hex, _NATIVE
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+ROUNDS = 1000
+KEY = bytes(range(1, 33))
+VALUE = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+SMALL = 0x0DE0B6B3A7640000   # 1 ether en wei
+
+
+def loop_bytes_to_int(b):
+    num = 0
+    for byte in b:
+        num = (num << 8) | byte
+    return num
+
+
+def loop_int_to_bytes(x):
+    b = b""
+    while x:
+        b = bytes([x & 0xff]) + b
+        x //= 256
+    return b
+
+
+def loop_pad_left(s, width):
+    while len(s) < width:
+        s = "0" + s
+    return s
+
+
+def run(label, fn):
+    gc.collect()
+    start = ticks_ms()
+    for _ in range(ROUNDS):
+        result = fn()
+    us = elapsed_ms(start) * 1000 / ROUNDS
+    print("{:<40} {:>8.1f} us/llamada".format(label, us))
+    return result
+
+
+print("int.from_bytes/to_bytes nativos:", _NATIVE)
+cases = (
+    ("bytes -> int (32 B)", lambda: loop_bytes_to_int(KEY), lambda: int_from_bytes(KEY)),
+    ("int -> bytes mínimo (256 bits)", lambda: loop_int_to_bytes(VALUE), lambda: int_to_min_bytes(VALUE)),
+    ("int -> bytes mínimo (1 ether)", lambda: loop_int_to_bytes(SMALL), lambda: int_to_min_bytes(SMALL)),
+    ("int -> bytes fijo (32 B)", lambda: b"\x00" * (32 - len(loop_int_to_bytes(SMALL))) + loop_int_to_bytes(SMALL),
+     lambda: int_to_bytes(SMALL, 32)),
+    ("int -> hex 64 dígitos", lambda: loop_pad_left(hex(SMALL)[2:], 64), lambda: int_to_hex(SMALL, 64)),
+)
+for name, old, new in cases:
+    a = run(name + " (bucle)", old)
+    b = run(name + " (codec)", new)
+    assert a == b
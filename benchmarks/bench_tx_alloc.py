@@ -0,0 +1,81 @@
+# main/benchmarks/bench_tx_alloc.py
+#
+# Memoria asignada al preparar una transferencia de ERC-20 y una eth_call:
+# - hex: el calldata pasa a "0x..." al construir la transacción, encode_tx lo
+#   vuelve a convertir a bytes y la transacción codificada se pasa otra vez a hex.
+# - bytes: la transacción circula como bytes y solo se convierte a hex una vez,
+#   al serializar la petición (web3_mpy.codec.to_json).
+# En eth_call no hay ida y vuelta: el calldata se convierte una sola vez en ambos
+# casos. Contract.call y Multicall crean el payload en "0x..." para que to_json
+# lo devuelva sin copiar la lista y el diccionario; la ruta "bytes" hace lo mismo.
+# En MicroPython se mide gc.mem_alloc() con el GC desactivado (bytes por llamada);
+# en CPython, el pico de tracemalloc de una llamada. Las cifras de CPython no
+# sirven para estimar las del dispositivo: hay que ejecutarlo en la placa.
+
+import sys, gc, json
+
+if "/main" not in sys.path:
+    sys.path.insert(0, "/main")
+
+from web3_mpy.contract import Contract
+from web3_mpy.tx import construct_raw_tx, encode_tx
+from web3_mpy.codec import to_hex, to_json
+import abi_erc20
+
+ROUNDS = 50
+TOKEN = "0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238"
+RECIPIENT = "0x06701723194aF926f01D8480fA559642c425f077"
+
+token = Contract(TOKEN, abi_erc20, None)
+fn = token.functions.transfer(RECIPIENT, 10 ** 6)
+
+
+def payload(params):
+    return json.dumps({"jsonrpc": "2.0", "method": "eth_sendRawTransaction", "params": params, "id": 1})
+
+
+def send_hex():
+    tx = construct_raw_tx(7, 2 * 10 ** 9, 60000, TOKEN, 0, "0x" + fn.data.hex(), 11155111)
+    raw = encode_tx(tx)
+    return payload(["0x" + raw.hex()])
+
+
+def send_bytes():
+    tx = construct_raw_tx(7, 2 * 10 ** 9, 60000, TOKEN, 0, fn.data, 11155111)
+    raw = encode_tx(tx)
+    return payload(to_json([raw]))
+
+
+def call_hex():
+    return json.dumps([{"to": TOKEN, "data": "0x" + fn.data.hex()}, "latest"])
+
+
+def call_bytes():
+    # Igual que Contract.call: to_json no encuentra nada que convertir
+    return json.dumps(to_json([{"to": to_json(TOKEN), "data": to_hex(fn.data)}, "latest"]))
+
+
+def allocated(fn):
+    gc.collect()
+    if hasattr(gc, "mem_alloc"):
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(ROUNDS):
+            fn()
+        used = (gc.mem_alloc() - before) // ROUNDS
+        gc.enable()
+        return used
+    import tracemalloc
+    fn()   # Calentamiento: cachés internas de CPython
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+for name, old, new in (("eth_sendRawTransaction", send_hex, send_bytes), ("eth_call", call_hex, call_bytes)):
+    assert old() == new()
+    a = allocated(old)
+    b = allocated(new)
+    print("{:<24} hex: {:>6} B   bytes: {:>6} B   ({:+d} B)".format(name, a, b, b - a))
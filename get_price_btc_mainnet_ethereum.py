@@ -1,9 +1,6 @@
 # main/get_price_btc_mainnet_ethereum.py
 
-import json, time, sys, gc
-
-def clear_memory():
-    gc.collect()
+import json, time, sys
 
 # Agrega el directorio actual (donde se encuentran main.py, network_iot.py y web3_mpy) a sys.path
 if "/my_modules" not in sys.path:
@@ -13,6 +10,7 @@ from web3_mpy.web3 import Web3, HTTPProvider
 from web3_mpy.tx import construct_raw_tx
 from web3_mpy.contract import Contract
 from network_iot import Network
+from web3_mpy.memory import maybe_collect as clear_memory  # Recolecta solo si queda poca memoria
 
 
 # Configuración de red Wi-Fi
@@ -30,9 +28,11 @@ provider = HTTPProvider(infura_url)
 w3 = Web3(provider)
 
 
-# Carga del ABI del contrato token (archivo abi.json)
-with open('main/abi_oracle_Btc_Usd.json', 'r') as abi_file:
-    contract_abi = json.load(abi_file)
+# ABI compilado con web3_mpy/abi_compiler.py (solo selectores, tipos y nombres de las funciones usadas).
+# Alternativa con el ABI completo (más lento de cargar y ocupa más heap):
+#   with open('main/abi_oracle_Btc_Usd.json', 'r') as abi_file:
+#       contract_abi = json.load(abi_file)
+import abi_oracle_btc_usd as contract_abi
 
 # Dirección del contrato del token y la dirección destino
 CONTRACT_ADDRESS = "0xF4030086522a5bEEa4988F8cA5B36dbC97BeE88c"  # Reemplaza con la dirección real del contrato
@@ -63,3 +63,17 @@ latestAnswer = contract.functions.latestAnswer().call()
 print("Resultado decodificado:", latestAnswer)
 precio_normalizado = latestAnswer / (10 ** decimals)
 print("Resultado normalizado:", precio_normalizado)
+
+
+# Seguimiento continuo del precio: en lugar de llamar a latestRoundData en un bucle,
+# PriceFeed lee los eventos AnswerUpdated del agregador y solo consulta el nodo
+# cuando hay bloques nuevos (un eth_blockNumber + un eth_getLogs por bloque).
+from web3_mpy.price_feed import PriceFeed
+
+feed = PriceFeed(w3, CONTRACT_ADDRESS, contract_abi, history=16, max_idle_blocks=7200)
+while True:
+    if feed.poll():
+        round_id, answer, updated_at = feed.latest()
+        print("Nueva ronda:", round_id, "precio:", feed.price(), "actualizado:", updated_at)
+    clear_memory()
+    time.sleep(12)  # Un bloque de Ethereum
@@ -0,0 +1,19 @@
+# main/manifest.py
+#
+# Manifiesto para congelar web3_mpy en el firmware de MicroPython (frozen
+# bytecode). Los módulos congelados se ejecutan desde la flash: no se compilan
+# al importarlos y su bytecode no ocupa heap.
+#
+# Uso (desde el manifiesto de la placa, p. ej. ports/esp32/boards/manifest.py):
+#   include("$(MPY_DIR)/ports/esp32/boards/manifest.py")
+#   include("/ruta/a/web3-micropython/manifest.py")
+# y compilar el firmware: make BOARD=ESP32_GENERIC FROZEN_MANIFEST=...
+
+# urequests viene de micropython-lib ("requests" en versiones recientes)
+require("urequests")
+
+package("web3_mpy", opt=3)
+
+# ABIs compilados con web3_mpy/abi_compiler.py
+module("abi_erc20.py", opt=3)
+module("abi_oracle_btc_usd.py", opt=3)
@@ -5,17 +5,21 @@ import json
 import time
 
 class Network:
-    def __init__(self, ssid, password, static_ip_config=None):
+    def __init__(self, ssid, password, static_ip_config=None, resolver=None, prewarm_urls=None):
         """
         Inicializa la conexión Wi-Fi.
         ssid: Nombre de la red Wi-Fi.
         password: Contraseña de la red.
         static_ip_config: Tupla con la configuración estática 
             (ip, máscara, gateway, DNS) (opcional).
+        resolver: web3_mpy.resolver.Resolver a precalentar tras conectar (opcional).
+        prewarm_urls: URLs de los endpoints cuyo host se resuelve al conectar (opcional).
         """
         self.ssid = ssid
         self.password = password
         self.static_ip_config = static_ip_config
+        self.resolver = resolver
+        self.prewarm_urls = prewarm_urls or []
         self.wlan = network.WLAN(network.STA_IF)
 
     def conectar(self):
@@ -39,6 +43,10 @@ class Network:
                 time.sleep(1)
         if self.wlan.isconnected():
             print("Conexión establecida. Configuración:", self.wlan.ifconfig())
+            if self.resolver is not None and self.prewarm_urls:
+                # Resolver el DNS de los endpoints ahora, no en la primera petición JSON‑RPC
+                self.resolver.prewarm(self.prewarm_urls)
+                print("DNS precalentado:", self.resolver.stats()["last_lookup_ms"])
             return True
         else:
             print("No se pudo conectar a la red.")
@@ -0,0 +1,126 @@
+# main/tests/test_cache.py
+#
+# Pruebas de CacheMiddleware / LRUCache contra un nodo simulado: tabla de
+# políticas, expulsión LRU por bytes, invalidación por bloque, reorganizaciones
+# y nivel en flash (solo bloques alejados de la cabeza). Se ejecutan con pytest
+# o directamente:
+#   python tests/test_cache.py
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3_mpy.cache import (CacheMiddleware, LRUCache, PERMANENT, PER_BLOCK, TTL, NEVER,
+                            canonical_key, fixed_block_number)
+
+HASH = "0x" + "ab" * 32
+
+
+class FakeNode:
+    """
+    Nodo que cuenta las peticiones y responde con un valor distinto en cada una,
+    para distinguir una respuesta cacheada de una nueva.
+    """
+
+    def __init__(self, head=1000):
+        self.head = head
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.head)}
+        return {"jsonrpc": "2.0", "id": 1, "result": {"n": len(self.calls)}}
+
+
+def test_policy_table():
+    cache = CacheMiddleware(FakeNode())
+    assert cache.policy_for("eth_chainId", []) == (PERMANENT, None)
+    assert cache.policy_for("eth_getBlockByHash", [HASH, False]) == (PERMANENT, None)
+    assert cache.policy_for("eth_blockNumber", []) == (TTL, 2)
+    assert cache.policy_for("eth_gasPrice", []) == (PER_BLOCK, None)
+    assert cache.policy_for("eth_call", [{}, "latest"]) == (PER_BLOCK, None)
+    assert cache.policy_for("eth_call", [{}, "pending"]) == (NEVER, None)
+    assert cache.policy_for("eth_call", [{}]) == (PER_BLOCK, None)
+    # Bloque fijo: permanente, con el número para decidir si puede ir a flash
+    assert cache.policy_for("eth_getBalance", ["0x1", "0x10"]) == (PERMANENT, 16)
+    assert cache.policy_for("eth_getBlockReceipts", ["0x3e8"]) == (PERMANENT, 1000)
+    assert cache.policy_for("eth_call", [{}, {"blockHash": HASH}]) == (PERMANENT, None)
+    assert cache.policy_for("eth_sendRawTransaction", ["0x"]) == (NEVER, None)
+    assert cache.policy_for("eth_unknownMethod", []) == (NEVER, None)
+    assert fixed_block_number("earliest") == 0
+    assert fixed_block_number(HASH) is None
+    assert canonical_key("eth_call", [{"to": "0xAB"}]) == canonical_key("eth_call", [{"to": "0xab"}])
+
+
+def test_lru_eviction():
+    lru = LRUCache(max_bytes=100)
+    assert lru.put("a", 1, 40)
+    assert lru.put("b", 2, 40)
+    lru.get("a")                        # "b" pasa a ser la menos reciente
+    assert lru.put("c", 3, 40)
+    assert "a" in lru and "c" in lru and "b" not in lru
+    assert lru.evictions == 1
+    assert lru.size == 80
+    assert not lru.put("big", 4, 101)   # Mayor que la caché completa: no se guarda
+    assert len(lru) == 2
+
+
+def test_per_block_follows_head():
+    node = FakeNode()
+    cache = CacheMiddleware(node)
+    first = cache.make_request("eth_gasPrice", [])
+    assert cache.make_request("eth_gasPrice", []) is first
+    cache.notify_block(1001)
+    assert cache.make_request("eth_gasPrice", []) is not first
+    assert node.calls.count("eth_gasPrice") == 2
+
+
+def test_reorg_clears_ram():
+    node = FakeNode()
+    cache = CacheMiddleware(node)
+    cache.notify_block(1000)
+    receipts = cache.make_request("eth_getBlockReceipts", ["0x3e7"])
+    assert cache.make_request("eth_getBlockReceipts", ["0x3e7"]) is receipts
+    cache.on_reorg(999, 2)
+    assert cache.make_request("eth_getBlockReceipts", ["0x3e7"]) is not receipts
+    assert cache.stats()["block_number"] is None
+
+
+def test_flash_only_below_depth():
+    node = FakeNode(head=1000)
+    flash_dir = os.path.join(tempfile.mkdtemp(), "rpc")
+    cache = CacheMiddleware(node, flash_dir=flash_dir, flash_depth=64)
+    cache.make_request("eth_blockNumber", [])             # Cabeza conocida: 1000
+    cache.make_request("eth_getBlockReceipts", [hex(999)])      # Cerca de la cabeza
+    cache.make_request("eth_getBlockReceipts", [hex(900)])      # 100 bloques por debajo
+    cache.make_request("eth_getBlockByHash", [HASH, False])     # Por hash
+    cache.make_request("eth_chainId", [])
+    assert len(os.listdir(flash_dir)) == 3
+
+    # Un reorg vacía la RAM; lo de flash no puede haber quedado huérfano
+    cache.on_reorg(999, 1)
+    cache.notify_block(1000)
+    node.calls = []
+    cache.make_request("eth_getBlockReceipts", [hex(900)])
+    cache.make_request("eth_getBlockByHash", [HASH, False])
+    cache.make_request("eth_getBlockReceipts", [hex(999)])
+    assert node.calls == ["eth_getBlockReceipts"]
+    assert cache.stats()["flash_hits"] == 2
+
+
+def test_flash_needs_known_head():
+    node = FakeNode()
+    flash_dir = os.path.join(tempfile.mkdtemp(), "rpc")
+    cache = CacheMiddleware(node, flash_dir=flash_dir)
+    cache.make_request("eth_getBlockByNumber", ["0x1", False])
+    assert os.listdir(flash_dir) == []
+
+
+if __name__ == "__main__":
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print("ok", name)
@@ -0,0 +1,164 @@
+# main/tests/test_log_indexer.py
+#
+# Pruebas de LogIndexer contra un nodo simulado: división del tramo cuando el
+# nodo rechaza el rango, crecimiento cuando las respuestas son pequeñas,
+# reintentos ante rate limits / fallos de transporte y reanudación desde el
+# checkpoint. Se ejecutan con pytest o directamente:
+#   python tests/test_log_indexer.py
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3_mpy.log_indexer import LogIndexer, LogRangeError, is_range_error, is_rate_limit
+
+ADDRESS = "0x" + "11" * 20
+
+
+class FakeNode:
+    """
+    Nodo con un log por bloque en 'log_blocks'. Rechaza los rangos de más de
+    'max_range' bloques como lo hace Infura, y puede devolver antes una serie de
+    fallos ('failures': "rate" o "transport") en las siguientes peticiones.
+    """
+
+    def __init__(self, head=999, log_blocks=(), max_range=100, failures=()):
+        self.head = head
+        self.log_blocks = set(log_blocks)
+        self.max_range = max_range
+        self.failures = list(failures)
+        self.ranges = []
+
+    def make_request(self, method, params):
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.head)}
+        assert method == "eth_getLogs"
+        if self.failures:
+            failure = self.failures.pop(0)
+            if failure == "transport":
+                raise OSError("ECONNRESET")
+            return {"jsonrpc": "2.0", "id": 1,
+                    "error": {"code": 429, "message": "Too Many Requests"}}
+        start = int(params[0]["fromBlock"], 16)
+        end = int(params[0]["toBlock"], 16)
+        self.ranges.append((start, end))
+        if end - start + 1 > self.max_range:
+            return {"jsonrpc": "2.0", "id": 1,
+                    "error": {"code": -32005, "message": "query returned more than 10000 results"}}
+        logs = [{"address": ADDRESS, "blockNumber": hex(n), "topics": [], "data": "0x"}
+                for n in range(start, end + 1) if n in self.log_blocks]
+        return {"jsonrpc": "2.0", "id": 1, "result": logs}
+
+
+class FakeWeb3:
+    def __init__(self, node):
+        self.provider = node
+
+
+def make_indexer(node, received, **kwargs):
+    kwargs.setdefault("backoff_ms", 0)
+    return LogIndexer(FakeWeb3(node), {"address": ADDRESS}, received.append, **kwargs)
+
+
+def test_classification():
+    assert is_range_error("query returned more than 10000 results")
+    assert is_range_error("Log response size exceeded.")
+    assert is_range_error("exceed maximum block range: 5000")
+    assert not is_range_error("Too Many Requests")
+    assert not is_range_error("daily request limit exceeded")
+    assert is_rate_limit("Too Many Requests")
+    assert is_rate_limit("", 429)
+
+
+def test_split():
+    node = FakeNode(log_blocks=range(0, 1000, 7), max_range=100)
+    received = []
+    indexer = make_indexer(node, received, chunk=400, grow_below=0)
+    assert indexer.run() == 999
+    assert len(received) == len(node.log_blocks)
+    stats = indexer.stats()
+    assert stats["splits"] == 2             # 400 -> 200 -> 100
+    assert stats["retries"] == 0
+    assert stats["chunk"] == 100
+    covered = [r for r in node.ranges if r[1] - r[0] + 1 <= node.max_range]
+    assert covered[0] == (0, 99)
+    assert sum(end - start + 1 for start, end in covered) == 1000
+
+
+def test_grow_when_sparse():
+    node = FakeNode(log_blocks=(5, 500), max_range=10000)
+    received = []
+    indexer = make_indexer(node, received, chunk=10, grow_below=200, max_chunk=640)
+    indexer.run()
+    assert len(received) == 2
+    sizes = [end - start + 1 for start, end in node.ranges]
+    # 10 + 20 + ... + 320 = 630 bloques; el último tramo llega justo a la cabeza
+    assert sizes == [10, 20, 40, 80, 160, 320, 370]
+    assert indexer.stats()["splits"] == 0
+
+
+def test_min_chunk_raises():
+    node = FakeNode(max_range=5)
+    indexer = make_indexer(node, [], chunk=40, min_chunk=10)
+    try:
+        indexer.step(100)
+    except LogRangeError:
+        pass
+    else:
+        raise AssertionError("se esperaba LogRangeError")
+
+
+def test_rate_limit_and_transport_keep_chunk():
+    node = FakeNode(log_blocks=(3,), max_range=10000, failures=("rate", "transport", "rate"))
+    received = []
+    indexer = make_indexer(node, received, chunk=100, grow_below=0)
+    assert indexer.step(999) == 1
+    stats = indexer.stats()
+    assert stats["retries"] == 3
+    assert stats["splits"] == 0
+    assert stats["chunk"] == 100
+    assert node.ranges == [(0, 99)]
+
+
+def test_retries_exhausted():
+    node = FakeNode(failures=("rate",) * 10)
+    indexer = make_indexer(node, [], max_retries=2)
+    try:
+        indexer.step(999)
+    except LogRangeError:
+        raise AssertionError("un rate limit no es un error de rango")
+    except Exception as e:
+        assert "eth_getLogs" in str(e)
+    else:
+        raise AssertionError("se esperaba una excepción")
+    assert indexer.next_block == 0
+
+
+def test_checkpoint_resume():
+    node = FakeNode(log_blocks=range(0, 1000, 50), max_range=10000)
+    path = os.path.join(tempfile.mkdtemp(), "logs.ckpt")
+    received = []
+    indexer = make_indexer(node, received, chunk=100, grow_below=0, checkpoint_path=path)
+    indexer.run(max_steps=3)
+    assert indexer.next_block == 300
+    assert len(received) == 6
+
+    # Reinicio: el nuevo indexador continúa donde quedó el checkpoint
+    resumed = make_indexer(node, received, chunk=100, grow_below=0, checkpoint_path=path)
+    assert resumed.next_block == 300
+    resumed.run()
+    assert [int(log["blockNumber"], 16) for log in received] == list(range(0, 1000, 50))
+
+    # Otro filtro no reutiliza el checkpoint
+    other = LogIndexer(FakeWeb3(node), {"address": "0x" + "22" * 20}, received.append,
+                       checkpoint_path=path)
+    assert other.next_block == 0
+
+
+if __name__ == "__main__":
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print("ok", name)
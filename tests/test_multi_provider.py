@@ -0,0 +1,133 @@
+# main/tests/test_multi_provider.py
+#
+# Pruebas de las lecturas hedged de MultiProvider con endpoints simulados que
+# responden tras un retardo (sleep_ms) o fallan: lanzamiento del duplicado,
+# contadores hedges_sent / hedges_won, failover cuando todo falla, timeout y
+# límite de hilos en vuelo. Se ejecutan con pytest o directamente:
+#   python tests/test_multi_provider.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3_mpy.clock import sleep_ms
+from web3_mpy.multi_provider import MultiProvider, EndpointError
+
+
+class FakeEndpoint:
+    """
+    Endpoint que responde tras 'delay_ms' con su nombre como resultado, o lanza
+    OSError si 'fail' es True.
+    """
+
+    def __init__(self, name, delay_ms=0, fail=False):
+        self.endpoint_uri = name
+        self.delay_ms = delay_ms
+        self.fail = fail
+        self.calls = 0
+
+    def make_request(self, method, params):
+        self.calls += 1
+        sleep_ms(self.delay_ms)
+        if self.fail:
+            raise OSError("ECONNREFUSED")
+        return {"jsonrpc": "2.0", "id": 1, "result": self.endpoint_uri}
+
+
+def wait_idle(provider, limit_ms=2000):
+    # Los perdedores siguen vivos tras la respuesta: se espera a que terminen
+    waited = 0
+    while provider.in_flight and waited < limit_ms:
+        sleep_ms(10)
+        waited += 10
+    assert provider.in_flight == 0
+
+
+def test_fast_primary_no_hedge():
+    a, b = FakeEndpoint("a"), FakeEndpoint("b")
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=200)
+    assert provider.make_request("eth_blockNumber", [])["result"] == "a"
+    wait_idle(provider)
+    assert provider.hedges_sent == 0
+    assert b.calls == 0
+
+
+def test_slow_primary_hedge_wins():
+    a, b = FakeEndpoint("a", delay_ms=400), FakeEndpoint("b", delay_ms=10)
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=30)
+    assert provider.make_request("eth_call", [])["result"] == "b"
+    assert provider.hedges_sent == 1
+    assert provider.endpoints[1].hedges_won == 1
+    assert provider.endpoints[0].hedges_won == 0
+    wait_idle(provider)
+    assert a.calls == 1 and b.calls == 1
+
+
+def test_primary_failure_hedges_immediately():
+    a, b = FakeEndpoint("a", fail=True), FakeEndpoint("b")
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=5000, hedge_timeout_ms=1000)
+    assert provider.make_request("eth_call", [])["result"] == "b"
+    assert provider.hedges_sent == 1
+    wait_idle(provider)
+    assert provider.endpoints[0].errors == 1
+
+
+def test_all_fail():
+    a, b = FakeEndpoint("a", fail=True), FakeEndpoint("b", fail=True)
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=10)
+    try:
+        provider.make_request("eth_call", [])
+    except EndpointError:
+        pass
+    else:
+        raise AssertionError("se esperaba EndpointError")
+    wait_idle(provider)
+    assert a.calls == 1 and b.calls == 1
+
+
+def test_hedge_timeout():
+    a, b = FakeEndpoint("a", delay_ms=500), FakeEndpoint("b", delay_ms=500)
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=10, hedge_timeout_ms=100)
+    try:
+        provider.make_request("eth_call", [])
+    except EndpointError as e:
+        assert "Timeout" in str(e)
+    else:
+        raise AssertionError("se esperaba un timeout")
+    wait_idle(provider)
+
+
+def test_in_flight_bound():
+    a, b = FakeEndpoint("a", delay_ms=300), FakeEndpoint("b", delay_ms=300)
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=10, max_in_flight=1)
+    # Un solo hilo: el mejor endpoint responde sin duplicado
+    assert provider.make_request("eth_call", [])["result"] == "a"
+    assert provider.hedges_sent == 0
+    assert b.calls == 0
+    wait_idle(provider)
+
+    # Sin hilos libres (perdedor anterior aún vivo) la lectura se hace en el hilo actual
+    c, d = FakeEndpoint("c", delay_ms=300), FakeEndpoint("d", delay_ms=0)
+    provider = MultiProvider([c, d], hedge=True, hedge_min_ms=10, max_in_flight=2)
+    assert provider.make_request("eth_call", [])["result"] == "d"   # c pierde y sigue vivo
+    assert provider.in_flight == 1
+    provider.max_in_flight = 1
+    assert provider.make_request("eth_call", [])["result"] in ("c", "d")
+    assert provider.in_flight <= 1
+    wait_idle(provider)
+
+
+def test_non_read_only_not_hedged():
+    a, b = FakeEndpoint("a", delay_ms=100), FakeEndpoint("b")
+    provider = MultiProvider([a, b], hedge=True, hedge_min_ms=10)
+    assert provider.make_request("eth_sendRawTransaction", ["0x"])["result"] == "a"
+    assert provider.hedges_sent == 0
+    assert b.calls == 0
+
+
+if __name__ == "__main__":
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print("ok", name)
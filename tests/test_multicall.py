@@ -0,0 +1,147 @@
+# main/tests/test_multicall.py
+#
+# Pruebas de Multicall contra un nodo simulado que ejecuta aggregate3: codificación
+# del calldata (selector 0x82ad56cb, tuplas (address, allowFailure, bytes)),
+# resultados con allowFailure, sub-llamadas revertidas y recurso al batch de
+# eth_call cuando la red no tiene Multicall3. Se ejecutan con pytest o directamente:
+#   python tests/test_multicall.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3_mpy.abi import parse_type, encode_abi, decode_abi
+from web3_mpy.codec import to_hex, from_hex, to_json
+from web3_mpy.multicall import Multicall, MULTICALL3_ADDRESS
+from web3_mpy.web3 import Web3
+
+TOKEN = "0x" + "11" * 20
+BROKEN = "0x" + "22" * 20
+WALLET = "0x" + "33" * 20
+
+ERC20_ABI = [
+    {"type": "function", "name": "balanceOf", "stateMutability": "view",
+     "inputs": [{"name": "owner", "type": "address"}], "outputs": [{"name": "", "type": "uint256"}]},
+    {"type": "function", "name": "decimals", "stateMutability": "view",
+     "inputs": [], "outputs": [{"name": "", "type": "uint8"}]},
+    {"type": "function", "name": "symbol", "stateMutability": "view",
+     "inputs": [], "outputs": [{"name": "", "type": "string"}]},
+]
+
+CALLS = parse_type("(address,bool,bytes)[]")
+RESULTS = parse_type("(bool,bytes)[]")
+UINT = parse_type("uint256")
+# Error(string) de un require que falla
+REVERT_DATA = b"\x08\xc3\x79\xa0" + encode_abi((parse_type("string"),), ("paused",))
+
+
+class FakeNode:
+    """
+    Nodo con Multicall3 (si 'multicall' es True) y dos contratos: TOKEN responde
+    balanceOf y decimals; BROKEN revierte en todas sus funciones.
+    """
+
+    def __init__(self, multicall=True):
+        self.multicall = multicall
+        self.calls = []
+        self.aggregated = None
+
+    def execute(self, to, data):
+        # Retorna (éxito, datos de retorno) de una llamada a un contrato simulado
+        if to.lower() != TOKEN:
+            return False, REVERT_DATA
+        selector = to_hex(data[:4])
+        if selector == "0x70a08231":    # balanceOf(address)
+            return True, encode_abi((UINT,), (1234,))
+        if selector == "0x313ce567":    # decimals()
+            return True, encode_abi((UINT,), (18,))
+        return True, b""                # symbol(): retorno vacío, no decodificable
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if method == "eth_getCode":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x6080" if self.multicall else "0x"}
+        assert method == "eth_call"
+        call = to_json(params[0])
+        data = from_hex(call["data"])
+        if call["to"].lower() == MULTICALL3_ADDRESS.lower():
+            assert data[:4] == b"\x82\xad\x56\xcb"
+            self.aggregated = decode_abi((CALLS,), data[4:])[0]
+            results = []
+            for target, allow_failure, call_data in self.aggregated:
+                ok, ret = self.execute(target, call_data)
+                if not ok and not allow_failure:
+                    return {"jsonrpc": "2.0", "id": 1,
+                            "error": {"code": 3, "message": "execution reverted: Multicall3: call failed"}}
+                results.append((ok, ret))
+            return {"jsonrpc": "2.0", "id": 1, "result": to_hex(encode_abi((RESULTS,), (results,)))}
+        ok, ret = self.execute(call["to"], data)
+        if not ok:
+            return {"jsonrpc": "2.0", "id": 1,
+                    "error": {"code": 3, "message": "execution reverted", "data": to_hex(ret)}}
+        return {"jsonrpc": "2.0", "id": 1, "result": to_hex(ret)}
+
+
+def build(node, **kwargs):
+    w3 = Web3(node)
+    token = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+    broken = w3.eth.contract(address=BROKEN, abi=ERC20_ABI)
+    mc = Multicall(w3, **kwargs)
+    mc.add(token.functions.balanceOf(WALLET))
+    mc.add(broken.functions.decimals())
+    mc.add(token.functions.decimals())
+    mc.add(token.functions.symbol())
+    return mc
+
+
+def test_encode_aggregate3():
+    mc = build(FakeNode())
+    data = mc.encode()
+    assert to_hex(data[:4]) == "0x82ad56cb"
+    calls = decode_abi((CALLS,), data[4:])[0]
+    assert len(calls) == 4
+    target, allow_failure, call_data = calls[0]
+    assert str(target).lower() == TOKEN
+    assert allow_failure is True
+    assert to_hex(call_data) == "0x70a08231" + "00" * 12 + "33" * 20
+    assert str(calls[1][0]).lower() == BROKEN
+    assert to_hex(calls[2][2]) == "0x313ce567"
+
+
+def test_allow_failure_results():
+    node = FakeNode()
+    mc = build(node)
+    results = mc.call()
+    assert results == [(True, 1234), (False, None), (True, 18), (False, None)]
+    # Un solo eth_getCode (se recuerda) y un solo eth_call
+    assert node.calls == ["eth_getCode", "eth_call"]
+    assert all(entry[1] is True for entry in node.aggregated)
+    mc.call()
+    assert node.calls.count("eth_getCode") == 1
+
+
+def test_revert_without_allow_failure():
+    mc = build(FakeNode(), allow_failure=False)
+    assert all(entry[1] is False for entry in decode_abi((CALLS,), mc.encode()[4:])[0])
+    try:
+        mc.call()
+    except Exception as e:
+        assert "aggregate3" in str(e)
+    else:
+        raise AssertionError("se esperaba el revert de aggregate3")
+
+
+def test_batch_fallback():
+    node = FakeNode(multicall=False)
+    mc = build(node)
+    assert mc.call() == [(True, 1234), (False, None), (True, 18), (False, None)]
+    assert node.calls == ["eth_getCode"] + ["eth_call"] * 4
+    assert node.aggregated is None
+
+
+if __name__ == "__main__":
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print("ok", name)
@@ -0,0 +1,87 @@
+# main/tools/build_mpy.py
+#
+# Compila el paquete a bytecode (.mpy) con mpy-cross, para copiarlo al
+# dispositivo en lugar de los .py: el ESP32 no tiene que compilar cada módulo
+# al importarlo, lo que ahorra tiempo de arranque y heap.
+# Se ejecuta en el PC (CPython). Usa el ejecutable "mpy-cross" del PATH o el
+# paquete de pip "mpy-cross" (python -m mpy_cross).
+#
+# Uso:
+#   python tools/build_mpy.py                       # -> build/web3_mpy/*.mpy
+#   python tools/build_mpy.py --march xtensawin -O3 # ESP32 / ESP32-S3
+#   mpremote cp -r build/web3_mpy :/main/
+#
+# La versión de mpy-cross debe coincidir con la del firmware (formato .mpy).
+# Para congelar el paquete en el firmware, ver manifest.py.
+
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "web3_mpy"
+# ABIs compilados (web3_mpy/abi_compiler.py) que también conviene precompilar
+EXTRA_MODULES = ("abi_erc20.py", "abi_oracle_btc_usd.py")
+
+
+def find_mpy_cross():
+    path = shutil.which("mpy-cross")
+    if path:
+        return [path]
+    try:
+        import mpy_cross  # noqa: F401
+    except ImportError:
+        raise SystemExit("No se encontró mpy-cross (instálalo con: pip install mpy-cross)")
+    return [sys.executable, "-m", "mpy_cross"]
+
+
+def compile_file(cmd, source, target, options):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # -s fija el nombre del archivo fuente que aparece en las trazas
+    args = cmd + options + ["-s", os.path.relpath(source, ROOT), "-o", target, source]
+    subprocess.check_call(args)
+    return os.path.getsize(source), os.path.getsize(target)
+
+
+def build(out_dir, options):
+    cmd = find_mpy_cross()
+    sources = []
+    package_dir = os.path.join(ROOT, PACKAGE)
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            sources.append((os.path.join(package_dir, name), os.path.join(out_dir, PACKAGE, name[:-3] + ".mpy")))
+    for name in EXTRA_MODULES:
+        path = os.path.join(ROOT, name)
+        if os.path.exists(path):
+            sources.append((path, os.path.join(out_dir, name[:-3] + ".mpy")))
+    total_py = total_mpy = 0
+    for source, target in sources:
+        py_size, mpy_size = compile_file(cmd, source, target, options)
+        total_py += py_size
+        total_mpy += mpy_size
+        print("{:<40} {:>7} B -> {:>7} B".format(os.path.relpath(source, ROOT), py_size, mpy_size))
+    print("{:<40} {:>7} B -> {:>7} B".format("total", total_py, total_mpy))
+
+
+def main(argv):
+    out_dir = os.path.join(ROOT, "build")
+    options = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--out", "-o"):
+            out_dir = argv[i + 1]
+            i += 2
+            continue
+        if arg == "--march":
+            options.append("-march=" + argv[i + 1])
+            i += 2
+            continue
+        options.append(arg)   # -O3, -X emit=native, ... se pasan tal cual a mpy-cross
+        i += 1
+    build(out_dir, options)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,9 +1,6 @@
 # main/transfer_eth.py
 
-import json, time, sys, gc
-
-def clear_memory():
-    gc.collect()
+import json, time, sys
 
 # Agrega el directorio actual (donde se encuentran main.py, network_iot.py y web3_mpy) a sys.path
 if "/my_modules" not in sys.path:
@@ -13,6 +10,7 @@ from web3_mpy.web3 import Web3, HTTPProvider
 from web3_mpy.tx import construct_raw_tx
 from web3_mpy.contract import Contract
 from network_iot import Network
+from web3_mpy.memory import maybe_collect as clear_memory  # Recolecta solo si queda poca memoria
 
 
 # Configuración de red Wi-Fi
@@ -64,14 +62,12 @@ def transfer_ether(sender_address,TO_ADDRESS,value, private_key):
         }
     #print("tx_object",tx_object)
     clear_memory()
-    gas_estimated_hex = w3.eth.eth_estimateGas(tx_object,  "latest")
-    #print("gas_estimated_hex:",gas_estimated_hex)
+    # Estimación con margen del 20%; se reutiliza para transferencias con la misma forma
+    gas_limit = w3.eth.estimate_gas(tx_object, "latest")
     clear_memory()
 
     gas_price = w3.eth.account.gas_price
-    gas_estimated = int(gas_estimated_hex, 16)
-    gas_limit = int(gas_estimated * 1.2)
-    #print(f"gas_estimated: {gas_estimated} | gas_limit: {gas_limit} | gas_price: {gas_price}")
+    #print(f"gas_limit: {gas_limit} | gas_price: {gas_price}")
     clear_memory()
     ##time.sleep(2)
 
@@ -139,6 +135,9 @@ total_time = end_time - start_time
 print(f"\nTiempo total para {num_transacciones} transacciones: {total_time:.2f} segundos")
 print(f"Tiempo promedio por transacción: {total_time/num_transacciones:.2f} segundos")
 
+from web3_mpy.memory import stats as gc_stats
+print("Recolecciones de basura:", gc_stats())
+
 '''
 otput final:
 
@@ -1,9 +1,6 @@
 # main/transfer_token_network_sepolia.py
 
-import json, time, sys, gc
-
-def clear_memory():
-    gc.collect()
+import json, time, sys
 
 # Agrega el directorio actual (donde se encuentran main.py, network_iot.py y web3_mpy) a sys.path
 if "/my_modules" not in sys.path:
@@ -12,7 +9,9 @@ if "/my_modules" not in sys.path:
 from web3_mpy.web3 import Web3, HTTPProvider
 from web3_mpy.tx import construct_raw_tx
 from web3_mpy.contract import Contract
+from web3_mpy.fee_oracle import FeeOracle
 from network_iot import Network
+from web3_mpy.memory import maybe_collect as clear_memory  # Recolecta solo si queda poca memoria
 
 
 # Configuración de red Wi-Fi
@@ -29,6 +28,11 @@ infura_url = "https://sepolia.infura.io/v3/Token_infura"
 provider = HTTPProvider(infura_url)
 w3 = Web3(provider)
 
+# Precio del gas desde el oráculo de comisiones: uno solo para todo el script, así su
+# ventana de bloques se reutiliza entre transferencias (eth_feeHistory como mucho una vez por bloque)
+fee_oracle = FeeOracle(w3)
+w3.eth.set_gas_price_strategy(fee_oracle)
+
 
 print("chain_id:",w3.chain_id)
 clear_memory()
@@ -41,9 +45,11 @@ private_key = ""
 sender_address = ""
 print("sender_address:",sender_address)
 
-# Carga del ABI del contrato token (archivo abi.json)
-with open('main/abi.json', 'r') as abi_file:
-    contract_abi = json.load(abi_file)
+# ABI compilado con web3_mpy/abi_compiler.py (solo selectores, tipos y nombres de las funciones usadas).
+# Alternativa con el ABI completo (más lento de cargar y ocupa más heap):
+#   with open('main/abi.json', 'r') as abi_file:
+#       contract_abi = json.load(abi_file)
+import abi_erc20 as contract_abi
 
 # Dirección del contrato del token y la dirección destino
 CONTRACT_ADDRESS = "0x29f2D40B0605204364af54EC677bD022dA425d03"  # Reemplaza con la dirección real del contrato
@@ -72,21 +78,16 @@ def transfer_token(private_key, to_address, token_amount):
     tx_object = {
         "from": sender_address,    # Dirección del remitente
         "to": CONTRACT_ADDRESS,      # Dirección del contrato
-        "data": "0x" + tx_payload.data.hex(),  # Datos codificados de la función
+        "data": tx_payload.data,  # Datos codificados de la función (bytes; el proveedor los pasa a hex)
         "value": hex(0)                 # Sin enviar Ether (para tokens)
     }
     print("tx_object:",tx_object)
     clear_memory()
     
-    # Estimar el gas:
-    gas_estimated_hex = w3.eth.eth_estimateGas(tx_object, "latest")
-    print("gas_estimated_hex:",gas_estimated_hex)
-
-    gas_estimated = int(gas_estimated_hex, 16)
-    print("Gas estimado:", gas_estimated)
-    
-    # Agregar un margen de seguridad (por ejemplo, 20% extra):
-    gas_limit = int(gas_estimated * 1.2)
+    # Estimar el gas (con un margen de seguridad del 20%, w3.eth.gas_estimates.multiplier).
+    # Las siguientes transferencias del mismo token reutilizan la estimación sin llamar a eth_estimateGas.
+    gas_limit = w3.eth.estimate_gas(tx_object, "latest")
+    print("Gas límite:", gas_limit)
 
 
     # Arma la transacción: se envía a la dirección del contrato, sin transferir Ether (value=0)
@@ -96,7 +97,7 @@ def transfer_token(private_key, to_address, token_amount):
         'gasLimit': gas_limit,                    # Ajusta el límite de gas según sea necesario
         'to': CONTRACT_ADDRESS,
         'value': 0,                          # No se envía Ether en la transferencia de tokens
-        'data': "0x" + tx_payload.data.hex(), # Payload de la llamada a transfer
+        'data': tx_payload.data,             # Payload de la llamada a transfer (bytes, sin pasar por hex)
         'chain_id': w3.chain_id
     }
 
@@ -121,19 +122,16 @@ def transfer_token(private_key, to_address, token_amount):
     tx_hash = w3.eth.account.send_raw_transaction(signed["rawTransaction"])
     print("Transaction hash:", tx_hash)
 
-    # (Opcional) Espera la confirmación de la transacción consultando el blockNumber
-    while w3.eth.eth_getTransactionByHash(tx_hash)['blockNumber'] is None:
-        print("Esperando confirmación...")
-        time.sleep(4)
-    
-    '''
-    # con el tiempo de espera para mostrar mensaje de "recibo" o "no recibo"
+    # Espera el recibo, con tiempo máximo para mostrar mensaje de "recibo" o "no recibo"
+    print("Esperando confirmación...")
     receipt = w3.eth.account.wait_for_transaction_receipt(tx_hash, timeout=120)
     if receipt:
         print("Recibo de transacción:", receipt)
+        # Si se quedó sin gas, se descarta la estimación cacheada: la siguiente transferencia vuelve a estimar
+        if w3.eth.gas_estimates.check_receipt(tx_object, receipt, gas_limit):
+            print("La transacción agotó el gas; se volverá a estimar.")
     else:
         print("No se obtuvo recibo en el tiempo especificado.")
-    '''
 
 # Ejemplo de uso: enviar 1000000 wei token (opcional considerando 18 decimales)
 token_amount = 1000000
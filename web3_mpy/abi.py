@@ -0,0 +1,563 @@
+# main/web3_mpy/abi.py
+#
+# Codificación y decodificación ABI v2 (Solidity) para MicroPython.
+# - Tipos estáticos y dinámicos, arrays anidados (fijos y dinámicos) y tuplas.
+# - Codificación: se calcula primero el tamaño total y después se escriben las
+#   secciones head/tail en un único bytearray preasignado (una sola asignación).
+# - Decodificación: trabaja sobre un memoryview (sin copias intermedias) y puede
+#   ser perezosa, decodificando cada campo solo cuando se accede a él.
+
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+from web3_mpy.address import canonical_address
+from web3_mpy.codec import int_from_bytes, int_to_bytes
+
+# Tipos internos de nodo: (tipo, argumento, hijo/hijos)
+UINT = 0      # argumento: bits
+INT = 1       # argumento: bits
+ADDRESS = 2
+BOOL = 3
+FBYTES = 4    # bytes1..bytes32; argumento: longitud
+BYTES = 5     # bytes dinámico
+STRING = 6
+ARRAY = 7     # array de longitud fija; argumento: longitud, hijo: nodo del elemento
+DARRAY = 8    # array dinámico; hijo: nodo del elemento
+TUPLE = 9     # hijos: lista de nodos; argumento: nombres de los componentes
+
+_TWO_256 = 1 << 256
+
+
+def _ceil32(n):
+    return (n + 31) & ~31
+
+
+def parse_type(typ, components=None):
+    """
+    Convierte un tipo del ABI ("uint256", "address[]", "tuple[2]", ...) en un nodo.
+    'components' es la lista de componentes del ABI para las tuplas.
+    """
+    if typ.endswith("]"):
+        idx = typ.rindex("[")
+        child = parse_type(typ[:idx], components)
+        length = typ[idx + 1:-1]
+        if length == "":
+            return (DARRAY, None, child)
+        return (ARRAY, int(length), child)
+    if typ == "tuple":
+        comps = components or []
+        names = tuple(c.get("name", "") for c in comps)
+        return (TUPLE, names, [parse_type(c["type"], c.get("components")) for c in comps])
+    if typ.startswith("("):
+        # Tupla en forma canónica "(address,uint256)" (ABI compilado, sin nombres)
+        children = [parse_type(t) for t in split_tuple_types(typ[1:-1])]
+        return (TUPLE, ("",) * len(children), children)
+    if typ.startswith("uint"):
+        return (UINT, int(typ[4:] or 256), None)
+    if typ.startswith("int"):
+        return (INT, int(typ[3:] or 256), None)
+    if typ == "address":
+        return (ADDRESS, None, None)
+    if typ == "bool":
+        return (BOOL, None, None)
+    if typ == "string":
+        return (STRING, None, None)
+    if typ == "bytes":
+        return (BYTES, None, None)
+    if typ.startswith("bytes"):
+        size = int(typ[5:])
+        if not 0 < size <= 32:
+            raise ValueError("Tipo bytesN inválido: " + typ)
+        return (FBYTES, size, None)
+    if typ == "function":
+        return (FBYTES, 24, None)
+    raise ValueError("Tipo ABI no soportado: " + typ)
+
+
+def split_tuple_types(inner):
+    """
+    Separa "address,(uint8,bytes)[],bool" por las comas de primer nivel.
+    """
+    types = []
+    depth = 0
+    start = 0
+    for i in range(len(inner)):
+        c = inner[i]
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            types.append(inner[start:i])
+            start = i + 1
+    if inner:
+        types.append(inner[start:])
+    return types
+
+
+def parse_params(abi_params):
+    """
+    Convierte la lista 'inputs'/'outputs' de un elemento del ABI en una lista de nodos.
+    """
+    return [parse_type(p["type"], p.get("components")) for p in abi_params]
+
+
+def is_dynamic(node):
+    kind = node[0]
+    if kind == BYTES or kind == STRING or kind == DARRAY:
+        return True
+    if kind == ARRAY:
+        return is_dynamic(node[2])
+    if kind == TUPLE:
+        for child in node[2]:
+            if is_dynamic(child):
+                return True
+    return False
+
+
+def head_size(node):
+    """
+    Bytes que ocupa el nodo en la sección head (32 para cualquier tipo dinámico).
+    """
+    if is_dynamic(node):
+        return 32
+    kind = node[0]
+    if kind == ARRAY:
+        return node[1] * head_size(node[2])
+    if kind == TUPLE:
+        return sum(head_size(c) for c in node[2])
+    return 32
+
+
+def _tuple_values(node, value):
+    if isinstance(value, dict):
+        return [value[name] for name in node[1]]
+    return value
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        if value.startswith("0x"):
+            value = value[2:]
+        return bytes.fromhex(value)
+    return value
+
+
+def _seq_size(nodes, values):
+    if len(nodes) != len(values):
+        raise ValueError("Se esperaban {} valores y se recibieron {}".format(len(nodes), len(values)))
+    size = 0
+    for node, value in zip(nodes, values):
+        if is_dynamic(node):
+            size += 32 + encoded_size(node, value)
+        else:
+            size += head_size(node)
+    return size
+
+
+def encoded_size(node, value):
+    """
+    Tamaño en bytes de la codificación de 'value' (sin contar su slot de offset).
+    """
+    kind = node[0]
+    if kind == STRING:
+        return 32 + _ceil32(len(value.encode("utf-8") if isinstance(value, str) else value))
+    if kind == BYTES:
+        return 32 + _ceil32(len(_to_bytes(value)))
+    if kind == DARRAY:
+        return 32 + _seq_size([node[2]] * len(value), value)
+    if kind == ARRAY:
+        if len(value) != node[1]:
+            raise ValueError("Array de longitud fija {}: se recibieron {} elementos".format(node[1], len(value)))
+        return _seq_size([node[2]] * node[1], value)
+    if kind == TUPLE:
+        return _seq_size(node[2], _tuple_values(node, value))
+    return head_size(node)
+
+
+def _write_word(buf, pos, value):
+    buf[pos:pos + 32] = int_to_bytes(value, 32)
+
+
+def _enc_uint(buf, pos, node, value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0 or value >> node[1]:
+        raise ValueError("Valor fuera de rango para uint{}: {}".format(node[1], value))
+    _write_word(buf, pos, value)
+
+
+def _enc_int(buf, pos, node, value):
+    bound = 1 << (node[1] - 1)
+    if isinstance(value, bool) or not isinstance(value, int) or not -bound <= value < bound:
+        raise ValueError("Valor fuera de rango para int{}: {}".format(node[1], value))
+    _write_word(buf, pos, value + _TWO_256 if value < 0 else value)
+
+
+def _enc_address(buf, pos, node, value):
+    # Cadenas, bytes o Address; las direcciones repetidas salen de la tabla de to_address
+    buf[pos + 12:pos + 32] = canonical_address(value)
+
+
+def _enc_bool(buf, pos, node, value):
+    buf[pos + 31] = 1 if value else 0
+
+
+def _enc_fbytes(buf, pos, node, value):
+    data = _to_bytes(value)
+    if len(data) > node[1]:
+        raise ValueError("Demasiados bytes para bytes{}".format(node[1]))
+    buf[pos:pos + len(data)] = data
+
+
+_STATIC_ENCODERS = {
+    UINT: _enc_uint,
+    INT: _enc_int,
+    ADDRESS: _enc_address,
+    BOOL: _enc_bool,
+    FBYTES: _enc_fbytes,
+}
+
+
+def _encode_static(buf, pos, node, value):
+    enc = _STATIC_ENCODERS.get(node[0])
+    if enc is None:
+        raise ValueError("Tipo no estático")
+    enc(buf, pos, node, value)
+
+
+def _encode_seq(buf, start, nodes, values):
+    """
+    Codifica una secuencia (argumentos, tupla o array) a partir de 'start'.
+    Retorna la posición final de la sección tail.
+    """
+    head = start
+    tail = start
+    for node in nodes:
+        tail += head_size(node)
+    for node, value in zip(nodes, values):
+        if is_dynamic(node):
+            _write_word(buf, head, tail - start)
+            head += 32
+            tail = _encode_into(buf, tail, node, value)
+        else:
+            _encode_into(buf, head, node, value)
+            head += head_size(node)
+    return tail
+
+
+def _encode_into(buf, pos, node, value):
+    """
+    Escribe 'value' en 'buf' a partir de 'pos'. Retorna la posición final.
+    """
+    kind = node[0]
+    if kind == STRING or kind == BYTES:
+        data = value.encode("utf-8") if kind == STRING and isinstance(value, str) else _to_bytes(value)
+        _write_word(buf, pos, len(data))
+        buf[pos + 32:pos + 32 + len(data)] = data
+        return pos + 32 + _ceil32(len(data))
+    if kind == DARRAY:
+        _write_word(buf, pos, len(value))
+        return _encode_seq(buf, pos + 32, [node[2]] * len(value), value)
+    if kind == ARRAY:
+        return _encode_seq(buf, pos, [node[2]] * node[1], value)
+    if kind == TUPLE:
+        return _encode_seq(buf, pos, node[2], _tuple_values(node, value))
+    _encode_static(buf, pos, node, value)
+    return pos + 32
+
+
+def encode_abi(nodes, values, prefix=b""):
+    """
+    Codifica 'values' según la lista de nodos 'nodes' (ver parse_params).
+    'prefix' (por ejemplo el selector de 4 bytes) se escribe al inicio.
+    Retorna un único bytearray con prefix + head + tail.
+    """
+    plen = len(prefix)
+    buf = bytearray(plen + _seq_size(nodes, values))
+    buf[:plen] = prefix
+    _encode_seq(buf, plen, nodes, values)
+    return buf
+
+
+def encode_types(types, values, prefix=b""):
+    """
+    Atajo para tipos en texto: encode_types(["address", "uint256"], [to, amount]).
+    """
+    return encode_abi([parse_type(t) for t in types], values, prefix)
+
+
+# ---------------------------------------------------------------------------
+# Decodificación
+# ---------------------------------------------------------------------------
+
+def to_buffer(data):
+    """
+    Convierte el resultado de eth_call ("0x..." o bytes) en un memoryview.
+    La única copia es la conversión de hexadecimal a bytes.
+    """
+    if isinstance(data, str):
+        data = binascii.unhexlify(data[2:] if data.startswith("0x") else data)
+    return memoryview(data)
+
+
+def _word(mv, pos):
+    if pos + 32 > len(mv):
+        raise ValueError("Datos ABI truncados en la posición {}".format(pos))
+    return int_from_bytes(mv[pos:pos + 32])
+
+
+def _dec_uint(mv, pos, node):
+    return _word(mv, pos)
+
+
+def _dec_int(mv, pos, node):
+    value = _word(mv, pos)
+    return value - _TWO_256 if value >> 255 else value
+
+
+def _dec_address(mv, pos, node):
+    _word(mv, pos)  # Verificación de límites
+    return "0x" + binascii.hexlify(mv[pos + 12:pos + 32]).decode()
+
+
+def _dec_bool(mv, pos, node):
+    return _word(mv, pos) != 0
+
+
+def _dec_fbytes(mv, pos, node):
+    _word(mv, pos)
+    return bytes(mv[pos:pos + node[1]])
+
+
+def _dec_array(mv, pos, node):
+    return _decode_seq(mv, pos, [node[2]] * node[1])
+
+
+def _dec_tuple(mv, pos, node):
+    return tuple(_decode_seq(mv, pos, node[2]))
+
+
+_STATIC_DECODERS = {
+    UINT: _dec_uint,
+    INT: _dec_int,
+    ADDRESS: _dec_address,
+    BOOL: _dec_bool,
+    FBYTES: _dec_fbytes,
+    ARRAY: _dec_array,
+    TUPLE: _dec_tuple,
+}
+
+
+def _decode_static(mv, pos, node):
+    dec = _STATIC_DECODERS.get(node[0])
+    if dec is None:
+        raise ValueError("Tipo no estático")
+    return dec(mv, pos, node)
+
+
+def decode_tail(mv, pos, node):
+    """
+    Decodifica un tipo dinámico cuyo contenido empieza en 'pos'.
+    """
+    kind = node[0]
+    if kind == STRING or kind == BYTES:
+        length = _word(mv, pos)
+        end = pos + 32 + length
+        if end > len(mv):
+            raise ValueError("Longitud de {} fuera de los datos".format("string" if kind == STRING else "bytes"))
+        data = bytes(mv[pos + 32:end])
+        return data.decode("utf-8") if kind == STRING else data
+    if kind == DARRAY:
+        length = _word(mv, pos)
+        child = node[2]
+        start = pos + 32
+        if child[0] == UINT:
+            # Camino rápido para uint256[] y similares
+            if start + 32 * length > len(mv):
+                raise ValueError("Array fuera de los datos")
+            return [int_from_bytes(mv[p:p + 32]) for p in range(start, start + 32 * length, 32)]
+        return _decode_seq(mv, start, [child] * length)
+    if kind == ARRAY:
+        return _decode_seq(mv, pos, [node[2]] * node[1])
+    if kind == TUPLE:
+        return tuple(_decode_seq(mv, pos, node[2]))
+    raise ValueError("Tipo no dinámico")
+
+
+def _decode_field(mv, start, head, node):
+    """
+    Decodifica el campo cuyo slot head está en 'head' dentro de la secuencia que empieza en 'start'.
+    """
+    if is_dynamic(node):
+        offset = _word(mv, head)
+        if start + offset > len(mv):
+            raise ValueError("Offset ABI fuera de los datos: {}".format(offset))
+        return decode_tail(mv, start + offset, node)
+    return _decode_static(mv, head, node)
+
+
+def _decode_seq(mv, start, nodes):
+    values = []
+    head = start
+    for node in nodes:
+        values.append(_decode_field(mv, start, head, node))
+        head += head_size(node)
+    return values
+
+
+def decode_abi(nodes, data, names=None, lazy=False):
+    """
+    Decodifica 'data' ("0x...", bytes, bytearray o memoryview) según 'nodes'.
+    - lazy=False: retorna una lista con todos los valores.
+    - lazy=True: retorna un LazyResult que decodifica cada campo al accederlo.
+    """
+    mv = data if isinstance(data, memoryview) else to_buffer(data)
+    if lazy:
+        return LazyResult(mv, nodes, names)
+    return _decode_seq(mv, 0, nodes)
+
+
+def decode_types(types, data):
+    """
+    Atajo para tipos en texto: decode_types(["uint80", "int256"], raw_result).
+    """
+    return decode_abi([parse_type(t) for t in types], data)
+
+
+def _dec_offset(mv, pos, node):
+    # Campo dinámico de primer nivel: el slot head guarda el offset desde el inicio
+    offset = _word(mv, pos)
+    if offset > len(mv):
+        raise ValueError("Offset ABI fuera de los datos: {}".format(offset))
+    return decode_tail(mv, offset, node)
+
+
+class CodecPlan:
+    """
+    Plan de codificación/decodificación de una lista de parámetros, compilado una
+    sola vez: cada campo queda como (posición en el head, función específica, nodo),
+    sin análisis de tipos ni cálculo de offsets en cada llamada.
+        plan = CodecPlan(parse_params(abi_item["outputs"]))
+        plan.decode(raw_result)
+    """
+
+    __slots__ = ("nodes", "head", "heads", "encoders", "decoders", "dynamic")
+
+    def __init__(self, nodes):
+        nodes = tuple(nodes)
+        heads = []
+        encoders = []
+        decoders = []
+        dynamic = []
+        pos = 0
+        for i in range(len(nodes)):
+            node = nodes[i]
+            heads.append(pos)
+            if is_dynamic(node):
+                dynamic.append(i)
+                encoders.append((pos, None, node))
+                decoders.append((pos, _dec_offset, node))
+            else:
+                # Arrays fijos y tuplas estáticas se escriben con el codificador genérico
+                encoders.append((pos, _STATIC_ENCODERS.get(node[0], _encode_into), node))
+                decoders.append((pos, _STATIC_DECODERS[node[0]], node))
+            pos += head_size(node)
+        self.nodes = nodes
+        self.head = pos
+        self.heads = tuple(heads)
+        self.encoders = tuple(encoders)
+        self.decoders = tuple(decoders)
+        self.dynamic = tuple(dynamic)
+
+    def encode(self, values, prefix=b""):
+        """
+        Equivalente a encode_abi(self.nodes, values, prefix).
+        """
+        if len(values) != len(self.nodes):
+            raise ValueError("Se esperaban {} valores y se recibieron {}".format(len(self.nodes), len(values)))
+        plen = len(prefix)
+        size = plen + self.head
+        for i in self.dynamic:
+            size += encoded_size(self.nodes[i], values[i])
+        buf = bytearray(size)
+        buf[:plen] = prefix
+        tail = plen + self.head
+        i = 0
+        for pos, enc, node in self.encoders:
+            if enc is None:
+                _write_word(buf, plen + pos, tail - plen)
+                tail = _encode_into(buf, tail, node, values[i])
+            else:
+                enc(buf, plen + pos, node, values[i])
+            i += 1
+        return buf
+
+    def decode(self, data, names=None, lazy=False):
+        """
+        Equivalente a decode_abi(self.nodes, data, names, lazy).
+        """
+        mv = data if isinstance(data, memoryview) else to_buffer(data)
+        if lazy:
+            return LazyResult(mv, self.nodes, names, self.heads)
+        return [dec(mv, pos, node) for pos, dec, node in self.decoders]
+
+
+_PENDING = object()
+
+
+class LazyResult:
+    """
+    Resultado ABI perezoso: cada campo se decodifica la primera vez que se accede
+    (por índice o por nombre) y queda cacheado. Ejemplo con latestRoundData:
+        r = fn.call(lazy=True)
+        r.answer   # solo decodifica 'answer'
+    """
+
+    __slots__ = ("_mv", "_nodes", "_names", "_heads", "_values")
+
+    def __init__(self, mv, nodes, names=None, heads=None):
+        self._mv = mv
+        self._nodes = nodes
+        self._names = names or ()
+        if heads is None:
+            heads = []
+            pos = 0
+            for node in nodes:
+                heads.append(pos)
+                pos += head_size(node)
+        self._heads = heads
+        self._values = [_PENDING] * len(nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, index):
+        value = self._values[index]
+        if value is _PENDING:
+            value = _decode_field(self._mv, 0, self._heads[index], self._nodes[index])
+            self._values[index] = value
+        return value
+
+    def __getattr__(self, name):
+        names = self._names
+        for i in range(len(names)):
+            if names[i] == name:
+                return self[i]
+        raise AttributeError("El resultado no tiene el campo " + name)
+
+    def __iter__(self):
+        for i in range(len(self._nodes)):
+            yield self[i]
+
+    def to_tuple(self):
+        """
+        Decodifica todos los campos pendientes y retorna una tupla.
+        """
+        return tuple(self)
+
+    def to_dict(self):
+        return {name: self[i] for i, name in enumerate(self._names)}
+
+    def __repr__(self):
+        return "LazyResult" + repr(self.to_tuple())
@@ -0,0 +1,150 @@
+# main/web3_mpy/abi_compiler.py
+#
+# Compilador de ABI JSON a un módulo Python compacto.
+# El módulo generado solo contiene tuplas de constantes (nombres, selectores,
+# tipos canónicos), de modo que al congelarlo en el firmware (frozen bytecode)
+# o compilarlo a .mpy no ocupa heap y no hace falta calcular ningún Keccak al
+# arrancar.
+#
+# Uso en el PC (CPython):
+#   python -m web3_mpy.abi_compiler abi_oracle_Btc_Usd.json abi_oracle_btc_usd.py \
+#       --functions description,decimals,latestRoundData --events AnswerUpdated
+#
+# Uso en el dispositivo:
+#   import abi_oracle_btc_usd
+#   contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=abi_oracle_btc_usd)
+#
+# Formato:
+#   FUNCTIONS = ((nombre, selector, tipos_entrada, tipos_salida, nombres_salida, mutabilidad), ...)
+#   EVENTS = ((nombre, topic0_hex, tipos, indexados, nombres, anónimo), ...)
+
+def is_compact_abi(abi):
+    """
+    Retorna True si 'abi' es un ABI compilado (módulo o diccionario con FUNCTIONS).
+    """
+    if isinstance(abi, dict):
+        return "FUNCTIONS" in abi
+    return hasattr(abi, "FUNCTIONS")
+
+
+def compact_parts(abi):
+    """
+    Retorna (FUNCTIONS, EVENTS) de un ABI compilado.
+    """
+    if isinstance(abi, dict):
+        return abi.get("FUNCTIONS", ()), abi.get("EVENTS", ())
+    return getattr(abi, "FUNCTIONS", ()), getattr(abi, "EVENTS", ())
+
+
+def expand_function(entry):
+    """
+    Convierte una entrada compacta de función en un abi_item mínimo.
+    """
+    name, _selector, inputs, outputs, output_names, mutability = entry
+    return {
+        "type": "function",
+        "name": name,
+        "inputs": [{"type": t, "name": ""} for t in inputs],
+        "outputs": [{"type": t, "name": n} for t, n in zip(outputs, output_names)],
+        "stateMutability": mutability,
+    }
+
+
+def expand_event(entry):
+    """
+    Convierte una entrada compacta de evento en un abi_item mínimo.
+    """
+    name, _topic, types, indexed, names, anonymous = entry
+    return {
+        "type": "event",
+        "name": name,
+        "inputs": [{"type": t, "name": n, "indexed": bool(i)} for t, i, n in zip(types, indexed, names)],
+        "anonymous": anonymous,
+    }
+
+
+def compile_entries(abi, functions=None, events=None):
+    """
+    Calcula las entradas compactas a partir de un ABI JSON.
+    'functions'/'events' restringen la salida a esos nombres (None = todos).
+    """
+    # Import local: solo se usa en el PC y evita el import circular con contract.py
+    from web3_mpy.contract import canonical_type, get_function_selector, get_event_topic
+    fn_entries = []
+    ev_entries = []
+    for item in abi:
+        kind = item.get("type")
+        if kind == "function" and (functions is None or item["name"] in functions):
+            outputs = item.get("outputs", [])
+            fn_entries.append((
+                item["name"],
+                get_function_selector(item),
+                tuple(canonical_type(p) for p in item.get("inputs", [])),
+                tuple(canonical_type(p) for p in outputs),
+                tuple(p.get("name", "") for p in outputs),
+                item.get("stateMutability", "nonpayable"),
+            ))
+        elif kind == "event" and (events is None or item["name"] in events):
+            inputs = item.get("inputs", [])
+            ev_entries.append((
+                item["name"],
+                "0x" + get_event_topic(item).hex(),
+                tuple(canonical_type(p) for p in inputs),
+                tuple(1 if p.get("indexed") else 0 for p in inputs),
+                tuple(p.get("name", "") for p in inputs),
+                item.get("anonymous", False),
+            ))
+    return tuple(fn_entries), tuple(ev_entries)
+
+
+def compile_abi(abi, functions=None, events=None, source_name="ABI"):
+    """
+    Retorna el código fuente del módulo compacto para 'abi'.
+    """
+    fn_entries, ev_entries = compile_entries(abi, functions, events)
+    lines = [
+        "# Generado por web3_mpy/abi_compiler.py a partir de {}. No editar a mano.".format(source_name),
+        "# (nombre, selector, tipos_entrada, tipos_salida, nombres_salida, mutabilidad)",
+        "FUNCTIONS = (",
+    ]
+    for entry in fn_entries:
+        lines.append("    {},".format(repr(entry)))
+    lines.append(")")
+    lines.append("")
+    lines.append("# (nombre, topic0, tipos, indexados, nombres, anónimo)")
+    lines.append("EVENTS = (")
+    for entry in ev_entries:
+        lines.append("    {},".format(repr(entry)))
+    lines.append(")")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _split_names(value):
+    return [n for n in value.split(",") if n] if value else None
+
+
+def main(argv):
+    import json
+    if len(argv) < 3:
+        print("Uso: python -m web3_mpy.abi_compiler abi.json salida.py [--functions a,b] [--events X,Y]")
+        return 1
+    functions = events = None
+    args = argv[3:]
+    for i in range(0, len(args) - 1, 2):
+        if args[i] == "--functions":
+            functions = _split_names(args[i + 1])
+        elif args[i] == "--events":
+            events = _split_names(args[i + 1])
+    with open(argv[1], "r") as f:
+        abi = json.load(f)
+    source = compile_abi(abi, functions, events, argv[1].replace("\\", "/").split("/")[-1])
+    with open(argv[2], "w") as f:
+        f.write(source)
+    print("ABI compilado: {} -> {} ({} bytes)".format(argv[1], argv[2], len(source)))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv))
@@ -1,10 +1,10 @@
 # main/web3_mpy/account.py
 
 import time
-from web3_mpy.tx import sign_tx, construct_signed_tx
+from web3_mpy.memory import before_large_alloc, SIGN_RESERVE
 
-from web3_mpy.ecdsa import ecdsa_sign
-from web3_mpy.wallet import Wallet  # Importa la clase Wallet
+# tx (rlp, keccak), ecdsa y wallet se importan dentro de los métodos que firman o
+# generan claves: consultar el precio del gas o esperar un recibo no los carga.
 
 class Account:
     def __init__(self, web3):
@@ -15,14 +15,18 @@ class Account:
         Genera una nueva cuenta Ethereum usando la clase Wallet.
         Retorna un diccionario con la clave privada y la dirección.
         """
+        from web3_mpy.wallet import Wallet
         private_key, address = Wallet.generate_keypair()
         return {"private_key": private_key, "address": address}
 
     def sign_transaction(self, tx, private_key_hex):
+        from web3_mpy.tx import sign_tx, construct_signed_tx
+        from web3_mpy.ecdsa import ecdsa_sign
         # Convierte la clave privada hex a bytes:
         if private_key_hex.startswith("0x"):
             private_key_hex = private_key_hex[2:]
         priv_bytes = bytes.fromhex(private_key_hex)
+        before_large_alloc(SIGN_RESERVE)  # La multiplicación escalar crea muchos enteros grandes
 
         # (r, s, recid, tx_hash) = sign_tx(..., priv_bytes, ecdsa_sign)
         r, s, recid, tx_hash = sign_tx(tx, priv_bytes, ecdsa_sign)
@@ -48,7 +52,8 @@ class Account:
         Envía la transacción firmada al nodo Ethereum.
         Retorna el hash de la transacción o un error.
         """
-        result = self.web3.provider.make_request("eth_sendRawTransaction", ["0x" + signed_tx.hex()])
+        # Los bytes se convierten a "0x..." una sola vez, al serializar la petición
+        result = self.web3.provider.make_request("eth_sendRawTransaction", [signed_tx])
         if result.get("result"):
             return result.get("result")
         else:
@@ -69,7 +74,11 @@ class Account:
     @property
     def gas_price(self):
         """
-        Retorna el precio del gas actual (en wei) consultando "eth_gasPrice".
+        Retorna el precio del gas (en wei). Si hay una estrategia de gas configurada
+        (w3.eth.set_gas_price_strategy, p. ej. FeeOracle) se usa esa; si no, "eth_gasPrice".
         """
+        price = self.web3.eth.generate_gas_price()
+        if price is not None:
+            return price
         result = self.web3.provider.make_request("eth_gasPrice", [])
         return int(result.get("result", "0x0"), 16)
@@ -1,15 +1,31 @@
 # main/web3_mpy/address.py
+#
+# Direcciones Ethereum.
+# Address guarda los 20 bytes canónicos y calcula el checksum EIP-55 (un Keccak)
+# solo la primera vez que se pide. Se compara y se usa como clave por sus bytes.
+# to_address() mantiene una tabla acotada (LRU) de direcciones ya vistas, de modo
+# que las direcciones habituales (el contrato, el remitente) se convierten y se
+# verifican una sola vez.
+#
+# Uso:
+#   token = to_address("0x779877A7B0D9E8603169DdbD7836e478b4624789")
+#   token.canonical     # 20 bytes (ABI, RLP)
+#   token.hex           # "0x7798...": minúsculas, sin Keccak (JSON-RPC)
+#   str(token)          # "0x7798...": checksum EIP-55, calculado una vez
 
-import re
-from web3_mpy.eth_utils_helpers import (
-    add_0x_prefix,
-    remove_0x_prefix,
-    decode_hex,
-    encode_hex,
-    hexstr_if_str,
-    to_hex,
-)
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+try:
+    from ucollections import OrderedDict
+except ImportError:
+    from collections import OrderedDict
+
+from web3_mpy.eth_utils_helpers import remove_0x_prefix
 from web3_mpy.keccak import keccak_256
+from web3_mpy.codec import int_to_bytes, int_to_hex, to_hex
 
 # Funciones auxiliares para detectar tipos en MicroPython
 def is_text(value):
@@ -18,8 +34,113 @@ def is_text(value):
 def is_bytes(value):
     return isinstance(value, bytes)
 
-# Expresión regular para direcciones hexadecimales (40 dígitos, con o sin "0x")
-_HEX_ADDRESS_REGEXP = re.compile(r"(0x)?[0-9a-f]{40}", re.IGNORECASE)
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+
+def _parse(value):
+    """
+    Convierte una dirección (cadena hexadecimal, 20 bytes o Address) a sus 20 bytes.
+    """
+    if isinstance(value, Address):
+        return value.canonical
+    if isinstance(value, str):
+        text = value[2:] if value.startswith("0x") or value.startswith("0X") else value
+        if len(text) == 40:
+            try:
+                return binascii.unhexlify(text)
+            except ValueError:
+                pass
+    elif isinstance(value, (bytes, bytearray, memoryview)) and len(value) == 20:
+        return bytes(value)
+    raise ValueError("Dirección inválida: " + repr(value))
+
+
+class Address:
+    """
+    Dirección de 20 bytes con checksum EIP-55 perezoso.
+    """
+
+    __slots__ = ("canonical", "_checksum")
+
+    def __init__(self, value):
+        """
+        :param value: Cadena hexadecimal (con o sin "0x", cualquier capitalización), 20 bytes o Address.
+        """
+        self.canonical = _parse(value)
+        self._checksum = None
+
+    @property
+    def hex(self):
+        """
+        "0x" + 40 dígitos en minúsculas (sin Keccak).
+        """
+        return to_hex(self.canonical)
+
+    @property
+    def checksum(self):
+        if self._checksum is None:
+            lower = binascii.hexlify(self.canonical).decode()
+            hashed = keccak_256(lower.encode())
+            out = []
+            for i, c in enumerate(lower):
+                # Nibble i del hash: alto en posiciones pares, bajo en impares
+                nibble = hashed[i >> 1] >> 4 if not i & 1 else hashed[i >> 1] & 15
+                out.append(c.upper() if nibble >= 8 else c)
+            self._checksum = "0x" + "".join(out)
+        return self._checksum
+
+    def __str__(self):
+        return self.checksum
+
+    def __repr__(self):
+        return "Address('" + self.hex + "')"
+
+    def __eq__(self, other):
+        if isinstance(other, Address):
+            return self.canonical == other.canonical
+        try:
+            return self.canonical == _parse(other)
+        except (ValueError, TypeError):
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.canonical)
+
+
+# Tabla de direcciones ya convertidas: valor de entrada (cadena o bytes) -> Address
+_interned = OrderedDict()
+_INTERN_MAX = 32
+
+
+def to_address(value):
+    """
+    Retorna el Address de 'value' (cadena hexadecimal, 20 bytes o Address).
+    Las direcciones recientes se reutilizan sin volver a convertirlas.
+    """
+    if isinstance(value, Address):
+        return value
+    if isinstance(value, (bytearray, memoryview)):
+        value = bytes(value)
+    address = _interned.pop(value, None)
+    if address is None:
+        address = Address(value)
+        if len(_interned) >= _INTERN_MAX:
+            _interned.pop(next(iter(_interned)))
+    _interned[value] = address
+    return address
+
+
+def canonical_address(value):
+    """
+    Los 20 bytes de una dirección (atajo para ABI y RLP).
+    """
+    if isinstance(value, Address):
+        return value.canonical
+    return to_address(value).canonical
+
 
 def is_hex_address(value):
     """
@@ -27,7 +148,13 @@ def is_hex_address(value):
     """
     if not is_text(value):
         return False
-    return _HEX_ADDRESS_REGEXP.fullmatch(value) is not None
+    text = value[2:] if value.startswith("0x") else value
+    if len(text) != 40:
+        return False
+    for c in text:
+        if c not in _HEX_DIGITS:
+            return False
+    return True
 
 def is_binary_address(value):
     """
@@ -37,23 +164,17 @@ def is_binary_address(value):
 
 def is_address(value):
     """
-    Verifica si el valor es una dirección en formato hexadecimal o binario.
+    Verifica si el valor es una dirección en formato hexadecimal, binario o Address.
     """
-    return is_hex_address(value) or is_binary_address(value)
+    return isinstance(value, Address) or is_hex_address(value) or is_binary_address(value)
 
 def to_normalized_address(value):
     """
     Convierte una dirección a su representación hexadecimal normalizada (minúsculas con "0x").
     """
-    try:
-        # Si es cadena, se convierte usando hexstr_if_str y to_hex
-        hex_address = hexstr_if_str(to_hex, value).lower()
-    except AttributeError:
-        raise TypeError("El valor debe ser una cadena o bytes")
-    if is_address(hex_address):
-        return hex_address
-    else:
+    if not is_address(value):
         raise ValueError("Formato desconocido para la dirección: " + repr(value))
+    return to_address(value).hex
 
 def is_normalized_address(value):
     """
@@ -67,24 +188,23 @@ def to_canonical_address(address):
     """
     Convierte una dirección válida a su forma canónica (bytes de 20).
     """
-    norm = to_normalized_address(address)
-    return decode_hex(norm)
+    if not is_address(address):
+        raise ValueError("Formato desconocido para la dirección: " + repr(address))
+    return canonical_address(address)
 
 def is_canonical_address(address):
     """
     Verifica si el valor es una dirección canónica (bytes de 20).
     """
-    if not is_bytes(address) or len(address) != 20:
-        return False
-    return address == to_canonical_address(address)
+    return is_binary_address(address)
 
 def is_same_address(left, right):
     """
-    Comprueba si dos direcciones son iguales (comparación normalizada).
+    Comprueba si dos direcciones son iguales (comparación de los 20 bytes).
     """
     if not (is_address(left) and is_address(right)):
         raise ValueError("Ambos valores deben ser direcciones válidas")
-    return to_normalized_address(left) == to_normalized_address(right)
+    return canonical_address(left) == canonical_address(right)
 
 def public_key_to_eth_address(pub_x, pub_y):
     """
@@ -93,35 +213,18 @@ def public_key_to_eth_address(pub_x, pub_y):
       - keccak_256 => 32 bytes
       - últimos 20 => '0x' + hex
     """
-    x_bytes = pub_x.to_bytes(32, 'big')
-    y_bytes = pub_y.to_bytes(32, 'big')
-    pub_concat = x_bytes + y_bytes
+    pub_concat = int_to_bytes(pub_x, 32) + int_to_bytes(pub_y, 32)
     hashed = keccak_256(pub_concat)
-    addr_bytes = hashed[-20:]
-    return "0x" + hexlify(addr_bytes).decode('ascii')
+    return to_hex(hashed[-20:])
 
 def to_checksum_address(address):
     """
     Calcula la dirección EIP-55 en checksummed.
-    Asume que 'address' llega con '0x...' en minúsculas.
+    Acepta cadena hexadecimal (cualquier capitalización), 20 bytes o Address.
     """
-    addr = address.lower()
-    if addr.startswith('0x'):
-        addr = addr[2:]
-    if len(addr) != 40:
-        raise ValueError("La dirección debe tener 40 hex dígitos.")
-
-    hash_bytes = keccak_256(addr.encode('ascii'))
-    hash_hex = hexlify(hash_bytes).decode('ascii')  # 64 hex chars
-
-    result = []
-    for i, c in enumerate(addr):
-        if int(hash_hex[i], 16) >= 8:
-            result.append(c.upper())
-        else:
-            result.append(c.lower())
-
-    return "0x" + "".join(result)
+    if not is_address(address):
+        raise ValueError("Dirección Ethereum inválida: " + repr(address))
+    return to_address(address).checksum
 
 def is_checksum_address(value):
     """
@@ -148,19 +251,8 @@ def is_checksum_formatted_address(value):
 def compress_pubkey(pub_x, pub_y):
     prefix = 2 | (pub_y & 1)  # 0x02 si y es par, 0x03 si impar
     prefix_hex = "%02x" % prefix
-    x_bytes = pub_x.to_bytes(32, 'big')
-    x_hex = hexlify(x_bytes).decode('ascii')
-    return "0x" + prefix_hex + x_hex
+    return "0x" + prefix_hex + int_to_hex(pub_x, 64)
 
 def uncompressed_pubkey_hex(pub_x, pub_y):
     # '0x04' + 64 hex de x + 64 hex de y
-    def pad_left(s, length):
-        while len(s) < length:
-            s = '0' + s
-        return s
-
-    x_hex = hex(pub_x)[2:]
-    x_hex = pad_left(x_hex, 64)
-    y_hex = hex(pub_y)[2:]
-    y_hex = pad_left(y_hex, 64)
-    return "0x04" + x_hex + y_hex
\ No newline at end of file
+    return "0x04" + int_to_hex(pub_x, 64) + int_to_hex(pub_y, 64)
\ No newline at end of file
@@ -0,0 +1,225 @@
+# main/web3_mpy/blocks.py
+#
+# Seguimiento de la cabeza de la cadena con una vista compartida de los últimos
+# bloques. BlockFollower sondea eth_blockNumber y guarda las cabeceras de los
+# últimos N bloques (número, hash, parentHash, baseFee, gasLimit, logsBloom y
+# número de transacciones) en un buffer circular de tamaño fijo. Si el
+# parentHash de un bloque nuevo no coincide con el hash guardado, hay una
+# reorganización: se retrocede hasta el ancestro común, se descartan las
+# cabeceras huérfanas y se avisa a los oyentes.
+#
+# Los oyentes son objetos con notify_block(número) (CacheMiddleware, CallCache,
+# GasEstimateCache...) y, opcionalmente, on_reorg(bloque_fork, profundidad).
+#
+# Uso:
+#   follower = w3.eth.follow_blocks(size=16)
+#   follower.add_listener(provider)      # CacheMiddleware
+#   while True:
+#       follower.poll()
+#       total, avg = w3.eth.eth_avgGasLimit()   # Sin petición: sale del buffer
+#       time.sleep(12)
+
+
+def _int(value):
+    return int(value, 16) if isinstance(value, str) else (value or 0)
+
+
+class HeaderRing:
+    """
+    Buffer circular de cabeceras, con memoria fija e indexado por número de bloque.
+    """
+
+    FIELDS = ("number", "hash", "parentHash", "baseFeePerGas", "gasLimit", "logsBloom", "txCount")
+
+    def __init__(self, size=16):
+        self.size = size
+        self._slots = [None] * size    # Cada slot: tupla con los campos de FIELDS
+        self.head = None               # Número del bloque más reciente guardado
+
+    def put(self, header):
+        self._slots[header[0] % self.size] = header
+        if self.head is None or header[0] > self.head:
+            self.head = header[0]
+
+    def get(self, number):
+        """
+        Retorna la cabecera (tupla) del bloque 'number' si sigue en el buffer, o None.
+        """
+        entry = self._slots[number % self.size]
+        if entry is not None and entry[0] == number:
+            return entry
+        return None
+
+    def drop_from(self, number):
+        """
+        Descarta las cabeceras con número >= 'number' (bloques huérfanos tras un reorg).
+        """
+        for i in range(self.size):
+            entry = self._slots[i]
+            if entry is not None and entry[0] >= number:
+                self._slots[i] = None
+        self.head = number - 1 if self.get(number - 1) is not None else None
+
+    def __len__(self):
+        return sum(1 for e in self._slots if e is not None)
+
+
+def header_from_block(block):
+    """
+    Extrae la cabecera compacta de un bloque de eth_getBlockByNumber (sin transacciones completas).
+    """
+    base_fee = block.get("baseFeePerGas")
+    return (
+        _int(block["number"]),
+        block["hash"],
+        block["parentHash"],
+        _int(base_fee) if base_fee is not None else None,
+        _int(block["gasLimit"]),
+        block.get("logsBloom"),
+        len(block.get("transactions", ())),
+    )
+
+
+class BlockFollower:
+    def __init__(self, web3, size=16, on_reorg=None, backfill=False):
+        """
+        :param web3: Instancia de Web3.
+        :param size: Número de cabeceras guardadas (también la profundidad máxima de reorg detectable).
+        :param on_reorg: Callback opcional on_reorg(bloque_fork, profundidad).
+        :param backfill: Si es True, el primer sondeo llena el buffer con los 'size' últimos
+                         bloques ('size' peticiones); por defecto solo se guarda la cabeza.
+        """
+        self.web3 = web3
+        self.ring = HeaderRing(size)
+        self.backfill = backfill
+        self.listeners = []
+        if on_reorg is not None:
+            self.listeners.append(_Callback(on_reorg))
+        self.head_number = None
+        self.reorgs = 0
+        self.requests = 0
+
+    def add_listener(self, listener):
+        """
+        Registra un objeto con notify_block(número) y/o on_reorg(bloque_fork, profundidad).
+        """
+        self.listeners.append(listener)
+        if self.head_number is not None and hasattr(listener, "notify_block"):
+            listener.notify_block(self.head_number)
+
+    def _request(self, method, params):
+        self.requests += 1
+        response = self.web3.provider.make_request(method, params)
+        if "error" in response:
+            raise Exception("Error en {}: {}".format(method, response["error"].get("message")))
+        return response.get("result")
+
+    def _fetch(self, number):
+        block = self._request("eth_getBlockByNumber", [hex(number), False])
+        if block is None:
+            return None
+        return header_from_block(block)
+
+    def poll(self):
+        """
+        Consulta la cabeza de la cadena y guarda las cabeceras nuevas.
+        Retorna el número de bloques nuevos (0 si la cabeza no cambió).
+        """
+        number = _int(self._request("eth_blockNumber", []))
+        if number == self.head_number:
+            return 0
+        ring = self.ring
+        if ring.head is None and not self.backfill:
+            start = number
+        else:
+            start = number - ring.size + 1
+        if ring.head is not None and ring.head + 1 > start:
+            start = ring.head + 1
+        added = 0
+        for n in range(start, number + 1):
+            header = self._fetch(n)
+            if header is None:
+                break
+            parent = ring.get(n - 1)
+            if parent is not None and parent[1] != header[2]:
+                self._handle_reorg(header)
+            ring.put(header)
+            added += 1
+        if ring.head is not None:
+            self.head_number = ring.head
+            for listener in self.listeners:
+                if hasattr(listener, "notify_block"):
+                    listener.notify_block(self.head_number)
+        return added
+
+    def _handle_reorg(self, header):
+        """
+        El parentHash de 'header' no coincide con el bloque guardado: se retrocede por
+        los parentHash (eth_getBlockByHash, que no cambia aunque haya reorg) hasta el
+        ancestro común y se sustituyen las cabeceras huérfanas.
+        """
+        ring = self.ring
+        replaced = []
+        parent_hash = header[2]
+        number = header[0] - 1
+        while True:
+            stored = ring.get(number)
+            if stored is None or stored[1] == parent_hash:
+                break
+            block = self._request("eth_getBlockByHash", [parent_hash, False])
+            if block is None:
+                break
+            parent = header_from_block(block)
+            replaced.append(parent)
+            parent_hash = parent[2]
+            number -= 1
+        fork = number + 1   # Primer bloque que cambió
+        ring.drop_from(fork)
+        for parent in reversed(replaced):
+            ring.put(parent)
+        self.reorgs += 1
+        for listener in self.listeners:
+            if hasattr(listener, "on_reorg"):
+                listener.on_reorg(fork, len(replaced))
+
+    def header(self, number=None):
+        """
+        Retorna la cabecera del bloque 'number' (o de la cabeza) como diccionario, o None si no está.
+        """
+        if number is None:
+            number = self.head_number
+        if number is None:
+            return None
+        entry = self.ring.get(number)
+        if entry is None:
+            return None
+        return dict(zip(HeaderRing.FIELDS, entry))
+
+    def block_hash(self, number):
+        entry = self.ring.get(number)
+        return entry[1] if entry is not None else None
+
+    def avg_gas_limit(self, number=None):
+        """
+        (gasLimit, gasLimit // número de transacciones) a partir del buffer, o None si no está.
+        """
+        if number is None:
+            number = self.head_number
+        entry = self.ring.get(number) if number is not None else None
+        if entry is None:
+            return None
+        gas_limit, tx_count = entry[4], entry[6]
+        return gas_limit, (gas_limit // tx_count) if tx_count else gas_limit
+
+    def stats(self):
+        return {
+            "head": self.head_number,
+            "headers": len(self.ring),
+            "reorgs": self.reorgs,
+            "requests": self.requests,
+        }
+
+
+class _Callback:
+    def __init__(self, fn):
+        self.on_reorg = fn
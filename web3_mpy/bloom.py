@@ -0,0 +1,114 @@
+# main/web3_mpy/bloom.py
+#
+# Prefiltro local con el logsBloom de las cabeceras de bloque.
+# El bloom (2048 bits) de un bloque contiene, por cada log, la dirección del
+# contrato y cada topic. Cada elemento activa 3 bits derivados de su Keccak-256.
+# Si alguno de los bits de un elemento vigilado está a 0, el bloque no puede
+# contener ese log y no hace falta pedir sus logs ni sus recibos.
+# (Un bloom puede dar falsos positivos, nunca falsos negativos.)
+#
+# Uso:
+#   matcher = BloomMatcher.from_filter(token.events.Transfer.filter_params())
+#   if matcher.matches(block["logsBloom"]):
+#       ... pedir logs/recibos del bloque
+
+from web3_mpy.keccak import keccak_256
+from web3_mpy.address import Address
+
+# Posiciones ya calculadas: elemento (bytes) -> ((índice_byte, máscara), ...)
+_positions_cache = {}
+_CACHE_MAX = 64
+
+
+def _to_bytes(item):
+    if isinstance(item, Address):
+        return item.canonical
+    if isinstance(item, str):
+        return bytes.fromhex(item[2:] if item.startswith("0x") else item)
+    return bytes(item)
+
+
+def bloom_positions(item):
+    """
+    Retorna los 3 pares (índice de byte, máscara) que 'item' (dirección o topic)
+    activa en un logsBloom de 256 bytes. Un Keccak por elemento; el resultado se cachea.
+    """
+    data = _to_bytes(item)
+    positions = _positions_cache.get(data)
+    if positions is None:
+        h = keccak_256(data)
+        pairs = []
+        for i in (0, 2, 4):
+            bit = ((h[i] << 8) | h[i + 1]) & 2047
+            pairs.append((255 - bit // 8, 1 << (bit % 8)))
+        positions = tuple(pairs)
+        if len(_positions_cache) >= _CACHE_MAX:
+            _positions_cache.pop(next(iter(_positions_cache)))
+        _positions_cache[data] = positions
+    return positions
+
+
+def _has(bloom, positions):
+    if isinstance(bloom, str):
+        # Se lee el byte directamente de la cadena hexadecimal, sin convertir los 256 bytes
+        for index, mask in positions:
+            start = 2 + 2 * index
+            if not int(bloom[start:start + 2], 16) & mask:
+                return False
+        return True
+    for index, mask in positions:
+        if not bloom[index] & mask:
+            return False
+    return True
+
+
+def bloom_contains(bloom, item):
+    """
+    True si 'item' puede estar en 'bloom' ("0x" + 512 hex o 256 bytes).
+    """
+    return _has(bloom, bloom_positions(item))
+
+
+def _options(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [bloom_positions(v) for v in value]
+    return [bloom_positions(value)]
+
+
+class BloomMatcher:
+    """
+    Comprueba si un bloque puede contener logs de un filtro (direcciones y topics
+    con la misma estructura que eth_getLogs: cada posición de topics es un valor,
+    una lista de alternativas o None).
+    """
+
+    def __init__(self, addresses=None, topics=None):
+        self.addresses = _options(addresses)
+        self.topics = [_options(t) for t in (topics or ())]
+
+    @classmethod
+    def from_filter(cls, filter_params):
+        return cls(filter_params.get("address"), filter_params.get("topics"))
+
+    def matches(self, bloom):
+        """
+        False solo si el bloque seguro que no contiene ningún log del filtro.
+        Sin bloom (None) se asume que puede contenerlo.
+        """
+        if not bloom:
+            return True
+        if self.addresses is not None and not self._any(bloom, self.addresses):
+            return False
+        for options in self.topics:
+            if options is not None and not self._any(bloom, options):
+                return False
+        return True
+
+    @staticmethod
+    def _any(bloom, options):
+        for positions in options:
+            if _has(bloom, positions):
+                return True
+        return False
@@ -0,0 +1,529 @@
+# main/web3_mpy/cache.py
+#
+# Caché de respuestas JSON‑RPC consciente del bloque.
+# - Políticas por método: permanente, por bloque, TTL o nunca.
+# - LRU acotada por tamaño en bytes (pensada para heaps pequeños).
+# - Nivel opcional en flash para las respuestas permanentes. Solo se escriben las
+#   que no pueden reorganizarse: pedidas por hash o por un número al menos
+#   'flash_depth' bloques por debajo de la cabeza conocida.
+
+import json
+import time
+import os
+
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+try:
+    from ucollections import OrderedDict
+except ImportError:
+    from collections import OrderedDict
+
+from web3_mpy.address import Address
+
+# Tipos de política
+PERMANENT = "permanent"    # La respuesta nunca cambia (eth_chainId, bloque por hash...)
+PER_BLOCK = "block"        # Válida mientras no avance el número de bloque
+TTL = "ttl"                # Válida durante N segundos
+NEVER = "never"            # No se guarda nunca
+BLOCK_PARAM = "block_param"  # Depende del parámetro de bloque: fijo -> PERMANENT, "latest" -> PER_BLOCK
+
+# Etiquetas de bloque que se mueven con la cadena
+_MOVING_TAGS = ("latest", "safe", "finalized")
+
+# Política por método: (tipo, argumento). Para TTL el argumento son los segundos;
+# para BLOCK_PARAM es la posición del parámetro de bloque dentro de params.
+DEFAULT_POLICIES = {
+    "eth_chainId": (PERMANENT, None),
+    "net_version": (PERMANENT, None),
+    "web3_clientVersion": (PERMANENT, None),
+    "eth_getBlockByHash": (PERMANENT, None),
+    "eth_getBlockTransactionCountByBlockHash": (PERMANENT, None),
+    "eth_getTransactionByBlockHashAndIndex": (PERMANENT, None),
+    "eth_blockNumber": (TTL, 2),
+    "eth_gasPrice": (PER_BLOCK, None),
+    "eth_blobBaseFee": (PER_BLOCK, None),
+    "eth_feeHistory": (PER_BLOCK, None),
+    "eth_call": (BLOCK_PARAM, 1),
+    "eth_getCode": (BLOCK_PARAM, 1),
+    "eth_getBalance": (BLOCK_PARAM, 1),
+    "eth_getStorageAt": (BLOCK_PARAM, 2),
+    "eth_getTransactionCount": (BLOCK_PARAM, 1),
+    "eth_getBlockByNumber": (BLOCK_PARAM, 0),
+    "eth_getBlockTransactionCountByBlockNumber": (BLOCK_PARAM, 0),
+    "eth_getTransactionByBlockNumberAndIndex": (BLOCK_PARAM, 0),
+    "eth_getBlockReceipts": (BLOCK_PARAM, 0),
+    "eth_getProof": (BLOCK_PARAM, 2),
+    "eth_sendRawTransaction": (NEVER, None),
+    "eth_estimateGas": (NEVER, None),
+}
+
+
+def _canonical(value, out):
+    """
+    Serializa 'value' de forma determinista en la lista 'out':
+    claves de diccionario ordenadas y cadenas hexadecimales en minúsculas,
+    de modo que "0xAbC" y "0xabc" produzcan la misma clave.
+    """
+    if isinstance(value, dict):
+        out.append("{")
+        for k in sorted(value):
+            out.append(k)
+            out.append(":")
+            _canonical(value[k], out)
+            out.append(",")
+        out.append("}")
+    elif isinstance(value, (list, tuple)):
+        out.append("[")
+        for v in value:
+            _canonical(v, out)
+            out.append(",")
+        out.append("]")
+    elif isinstance(value, str):
+        out.append(value.lower() if value.startswith("0x") else value)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.append("0x" + binascii.hexlify(value).decode())
+    elif isinstance(value, Address):
+        out.append(value.hex)
+    else:
+        out.append(str(value))
+
+
+def canonical_key(method, params):
+    """
+    Retorna la clave de caché para (method, params).
+    """
+    out = [method, "|"]
+    _canonical(params, out)
+    return "".join(out)
+
+
+def approx_size(value):
+    """
+    Estima el tamaño en bytes que ocupa 'value' en el heap.
+    No pretende ser exacto: solo sirve para acotar la LRU.
+    """
+    if isinstance(value, str) or isinstance(value, (bytes, bytearray)):
+        return 16 + len(value)
+    if isinstance(value, dict):
+        size = 32
+        for k in value:
+            size += approx_size(k) + approx_size(value[k])
+        return size
+    if isinstance(value, (list, tuple)):
+        size = 16
+        for v in value:
+            size += approx_size(v)
+        return size
+    return 16
+
+
+def fixed_block_number(block_identifier):
+    """
+    Número de bloque de un identificador fijo, o None si va por hash (o no es fijo).
+    """
+    if isinstance(block_identifier, int):
+        return block_identifier
+    if isinstance(block_identifier, dict):
+        return fixed_block_number(block_identifier.get("blockNumber"))
+    if block_identifier == "earliest":
+        return 0
+    if isinstance(block_identifier, str) and block_identifier.startswith("0x") and len(block_identifier) < 66:
+        return int(block_identifier, 16)
+    return None
+
+
+def is_fixed_block(block_identifier):
+    """
+    Retorna True si el identificador de bloque apunta a un bloque inmutable
+    (número concreto, hash o "earliest").
+    """
+    if isinstance(block_identifier, int):
+        return True
+    if isinstance(block_identifier, dict):
+        return "blockHash" in block_identifier or "blockNumber" in block_identifier
+    if isinstance(block_identifier, str):
+        return block_identifier.startswith("0x") or block_identifier == "earliest"
+    return False
+
+
+class LRUCache:
+    """
+    Caché LRU acotada por el tamaño aproximado en bytes de sus entradas.
+    Cada entrada es una tupla (valor, tamaño, datos_extra).
+    """
+
+    def __init__(self, max_bytes=8192):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """
+        Retorna la entrada asociada a 'key' (o None) y la marca como la más reciente.
+        """
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._data[key] = entry
+        return entry
+
+    def put(self, key, value, size, extra=None):
+        """
+        Inserta una entrada y expulsa las menos recientes hasta respetar max_bytes.
+        Las entradas más grandes que la caché completa no se guardan.
+        """
+        self.remove(key)
+        if size > self.max_bytes:
+            return False
+        while self._data and self.size + size > self.max_bytes:
+            oldest = next(iter(self._data))
+            self.remove(oldest)
+            self.evictions += 1
+        self._data[key] = (value, size, extra)
+        self.size += size
+        return True
+
+    def remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+        return entry
+
+    def remove_where(self, predicate):
+        """
+        Elimina todas las entradas cuyo 'extra' cumpla el predicado.
+        """
+        for key in [k for k, e in self._data.items() if predicate(e[2])]:
+            self.remove(key)
+
+    def clear(self):
+        self._data = OrderedDict()
+        self.size = 0
+
+
+class FlashCache:
+    """
+    Nivel secundario en flash para respuestas permanentes.
+    Cada entrada es un archivo cuyo nombre es el CRC32 de la clave; la primera
+    línea guarda la clave completa para descartar colisiones.
+    """
+
+    def __init__(self, directory, max_entries=64):
+        self.directory = directory
+        self.max_entries = max_entries
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass  # Ya existe
+
+    def _path(self, key):
+        return "{}/{:08x}".format(self.directory, binascii.crc32(key.encode()) & 0xFFFFFFFF)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r") as f:
+                if f.readline().rstrip("\n") != key:
+                    return None
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        try:
+            names = os.listdir(self.directory)
+            if len(names) >= self.max_entries:
+                # Sin mtime fiable en MicroPython: se libera la primera entrada listada.
+                os.remove(self.directory + "/" + names[0])
+            with open(self._path(key), "w") as f:
+                f.write(key)
+                f.write("\n")
+                f.write(json.dumps(value))
+        except OSError:
+            pass  # Flash llena o no disponible: la caché en RAM sigue funcionando
+
+    def clear(self):
+        try:
+            for name in os.listdir(self.directory):
+                os.remove(self.directory + "/" + name)
+        except OSError:
+            pass
+
+
+class CacheMiddleware:
+    """
+    Envuelve un proveedor (HTTPProvider, Provider...) y cachea sus respuestas
+    según la política de cada método.
+
+    Las entradas PER_BLOCK se invalidan cuando cambia el número de bloque, que la
+    caché solo conoce si una respuesta de eth_blockNumber pasa por ella o si está
+    registrada en un BlockFollower (follower.add_listener(provider)). Sin ninguna
+    de las dos, caducan a los 'block_ttl' segundos.
+
+    Ejemplo:
+        provider = CacheMiddleware(HTTPProvider(url), max_bytes=6144)
+        w3 = Web3(provider)
+    """
+
+    def __init__(self, provider, max_bytes=8192, policies=None, block_ttl=15,
+                 flash_dir=None, flash_max_entries=64, flash_depth=64):
+        """
+        :param provider: Proveedor subyacente con método make_request(method, params).
+        :param max_bytes: Tamaño máximo aproximado de la LRU en RAM.
+        :param policies: Diccionario {método: (tipo, argumento)} que amplía DEFAULT_POLICIES.
+        :param block_ttl: Segundos máximos de vida de una entrada PER_BLOCK si no llega
+                          ningún número de bloque nuevo (evita datos rancios sin polling).
+        :param flash_dir: Directorio para el nivel en flash (None lo desactiva).
+        :param flash_max_entries: Número máximo de archivos en el nivel en flash.
+        :param flash_depth: Bloques bajo la cabeza a partir de los cuales una respuesta pedida
+                            por número se escribe en flash (las más recientes pueden quedar
+                            huérfanas por un reorg y solo se guardan en RAM).
+        """
+        self.provider = provider
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.block_ttl = block_ttl
+        self.lru = LRUCache(max_bytes)
+        self.flash = FlashCache(flash_dir, flash_max_entries) if flash_dir else None
+        self.flash_depth = flash_depth
+        self.block_number = None
+        self.hits = 0
+        self.misses = 0
+        self.flash_hits = 0
+
+    def __getattr__(self, name):
+        # Delegar el resto de atributos (endpoint_uri, etc.) en el proveedor envuelto
+        return getattr(self.provider, name)
+
+    def policy_for(self, method, params):
+        """
+        Resuelve la política efectiva (tipo, argumento) para una llamada concreta.
+        Para PERMANENT, el argumento es el número de bloque fijado (None si va por hash
+        o el método no depende del bloque).
+        """
+        kind, arg = self.policies.get(method, (NEVER, None))
+        if kind == BLOCK_PARAM:
+            block = params[arg] if params is not None and len(params) > arg else "latest"
+            if is_fixed_block(block):
+                return PERMANENT, fixed_block_number(block)
+            if block in _MOVING_TAGS:
+                return PER_BLOCK, None
+            return NEVER, None  # "pending" cambia dentro del mismo bloque
+        if kind == PERMANENT:
+            return PERMANENT, None
+        return kind, arg
+
+    def _flash_safe(self, number):
+        # Por hash (o sin bloque) no cambia nunca; por número, solo lejos de la cabeza
+        if number is None:
+            return True
+        return self.block_number is not None and number <= self.block_number - self.flash_depth
+
+    def notify_block(self, block_number):
+        """
+        Informa de un nuevo número de bloque. Si avanzó (o retrocedió por reorg),
+        se invalidan todas las entradas PER_BLOCK.
+        """
+        if block_number != self.block_number:
+            self.block_number = block_number
+            self.lru.remove_where(lambda extra: extra[0] == PER_BLOCK)
+
+    def on_reorg(self, fork_block, depth):
+        """
+        Reorganización de la cadena (BlockFollower): las respuestas de bloques recientes,
+        incluso las pedidas por número, pueden ser de bloques huérfanos. Se vacía la RAM;
+        en flash solo hay bloques a más de 'flash_depth' de la cabeza.
+        """
+        self.block_number = None
+        self.lru.clear()
+
+    def _is_valid(self, extra, now):
+        kind, expires, block = extra
+        if expires is not None and now >= expires:
+            return False
+        if kind == PER_BLOCK and block != self.block_number:
+            return False
+        return True
+
+    def make_request(self, method, params):
+        kind, arg = self.policy_for(method, params)
+        if kind == NEVER:
+            return self.provider.make_request(method, params)
+
+        key = canonical_key(method, params)
+        now = time.time()
+        entry = self.lru.get(key)
+        if entry is not None:
+            if self._is_valid(entry[2], now):
+                self.hits += 1
+                return entry[0]
+            self.lru.remove(key)
+
+        if kind == PERMANENT and self.flash is not None and self._flash_safe(arg):
+            response = self.flash.get(key)
+            if response is not None:
+                self.hits += 1
+                self.flash_hits += 1
+                self.lru.put(key, response, len(key) + approx_size(response), (PERMANENT, None, None))
+                return response
+
+        self.misses += 1
+        response = self.provider.make_request(method, params)
+        if "error" in response or response.get("result") is None:
+            return response
+
+        if method == "eth_blockNumber":
+            self.notify_block(int(response["result"], 16))
+
+        if kind == TTL:
+            extra = (TTL, now + arg, None)
+        elif kind == PER_BLOCK:
+            extra = (PER_BLOCK, now + self.block_ttl, self.block_number)
+        else:
+            extra = (PERMANENT, None, None)
+            if self.flash is not None and self._flash_safe(arg):
+                self.flash.put(key, response)
+        self.lru.put(key, response, len(key) + approx_size(response), extra)
+        return response
+
+    def clear(self, flash=False):
+        """
+        Vacía la caché en RAM (y opcionalmente el nivel en flash).
+        """
+        self.lru.clear()
+        if flash and self.flash is not None:
+            self.flash.clear()
+
+    def stats(self):
+        """
+        Retorna los contadores de la caché.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "flash_hits": self.flash_hits,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "entries": len(self.lru),
+            "bytes": self.lru.size,
+            "evictions": self.lru.evictions,
+            "block_number": self.block_number,
+        }
+
+
+class CallCache:
+    """
+    Caché de resultados ya decodificados de ContractFunction.call(),
+    por (dirección, calldata, bloque).
+      - Getters inmutables (stateMutability "pure" o nombres en 'immutable'): permanentes.
+      - Bloque fijo (número, hash o "earliest"): permanentes.
+      - "latest"/"safe"/"finalized": válidos hasta que avance el bloque (notify_block)
+        o pasen 'block_ttl' segundos.
+      - "pending": no se guardan.
+
+    Ejemplo:
+        calls = CallCache(immutable=("decimals", "symbol", "name"))
+        token.functions.decimals().call(cache=calls)
+    """
+
+    MISS = object()
+
+    def __init__(self, max_bytes=4096, immutable=None, block_ttl=15):
+        """
+        :param max_bytes: Tamaño máximo aproximado de la LRU.
+        :param immutable: Nombres de funciones cuyo resultado nunca cambia (decimals, symbol...).
+        :param block_ttl: Segundos máximos de vida de un resultado en "latest" sin nuevo bloque.
+        """
+        self.lru = LRUCache(max_bytes)
+        self.immutable = set(immutable or ())
+        self.block_ttl = block_ttl
+        self.block_number = None
+        self.hits = 0
+        self.misses = 0
+
+    def policy_for(self, abi_item, block_identifier):
+        if abi_item.get("stateMutability") == "pure" or abi_item.get("name") in self.immutable:
+            return PERMANENT
+        if is_fixed_block(block_identifier):
+            return PERMANENT
+        if block_identifier in _MOVING_TAGS:
+            return PER_BLOCK
+        return NEVER
+
+    def _key(self, address, data, kind, block_identifier, lazy):
+        # Los resultados permanentes de getters inmutables no dependen del bloque
+        block = None if kind == PERMANENT and not is_fixed_block(block_identifier) else block_identifier
+        address = address.hex if isinstance(address, Address) else address.lower()
+        return canonical_key(address, [data, block, lazy])
+
+    def get(self, fn, block_identifier="latest", lazy=False):
+        """
+        Retorna el resultado cacheado de 'fn' (ContractFunction) o CallCache.MISS.
+        Los resultados perezosos (LazyResult) se guardan aparte de los decodificados.
+        """
+        kind = self.policy_for(fn.abi_item, block_identifier)
+        if kind == NEVER:
+            return self.MISS
+        key = self._key(fn.address, fn.data, kind, block_identifier, lazy)
+        entry = self.lru.get(key)
+        if entry is not None:
+            extra = entry[2]
+            if extra is None or (extra[1] == self.block_number and time.time() < extra[0]):
+                self.hits += 1
+                return entry[0]
+            self.lru.remove(key)
+        self.misses += 1
+        return self.MISS
+
+    def put(self, fn, block_identifier, value, lazy=False, size=None):
+        """
+        Guarda el resultado decodificado de 'fn'. 'size' permite indicar el tamaño
+        cuando approx_size no lo refleja (por ejemplo, un LazyResult).
+        """
+        kind = self.policy_for(fn.abi_item, block_identifier)
+        if kind == NEVER:
+            return False
+        key = self._key(fn.address, fn.data, kind, block_identifier, lazy)
+        extra = None if kind == PERMANENT else (time.time() + self.block_ttl, self.block_number)
+        if size is None:
+            size = approx_size(value)
+        return self.lru.put(key, value, len(key) + size, extra)
+
+    def notify_block(self, block_number):
+        """
+        Informa de un nuevo número de bloque: invalida los resultados en "latest".
+        """
+        if block_number != self.block_number:
+            self.block_number = block_number
+            self.lru.remove_where(lambda extra: extra is not None)
+
+    def on_reorg(self, fork_block, depth):
+        """
+        Reorganización de la cadena: descarta todo, también los resultados de bloques fijos recientes.
+        """
+        self.block_number = None
+        self.lru.clear()
+
+    def clear(self):
+        self.lru.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "entries": len(self.lru),
+            "bytes": self.lru.size,
+            "evictions": self.lru.evictions,
+            "block_number": self.block_number,
+        }
@@ -0,0 +1,27 @@
+# main/web3_mpy/clock.py
+#
+# Utilidades de tiempo en milisegundos compatibles con MicroPython y CPython.
+
+import time
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
+except AttributeError:
+    # CPython (Raspberry Pi, pruebas en PC)
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+
+def elapsed_ms(start):
+    """
+    Retorna los milisegundos transcurridos desde 'start' (obtenido con ticks_ms()).
+    """
+    return ticks_diff(ticks_ms(), start)
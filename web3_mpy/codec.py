@@ -0,0 +1,161 @@
+# main/web3_mpy/codec.py
+#
+# Conversión entre texto hexadecimal, bytes y enteros grandes, en un único sitio.
+# Dentro de la librería los datos binarios (calldata, transacciones firmadas,
+# hashes, direcciones) circulan como bytes/bytearray/memoryview. El texto "0x..."
+# solo se genera al serializar la petición JSON-RPC (to_json, en el proveedor) y
+# solo se convierte a bytes al leer un campo de la respuesta (from_hex).
+# Ambas conversiones usan ubinascii (en C), sin bucles en Python.
+#
+# Los enteros (claves, firmas, campos RLP, palabras ABI) se convierten con
+# int.from_bytes / int.to_bytes. Si el port no los tiene (o no admite enteros
+# de 256 bits), se usa la ruta hexadecimal, también en C.
+#
+# Uso:
+#   provider.make_request("eth_sendRawTransaction", [signed_bytes])   # to_json lo convierte
+#   data = from_hex(response["result"])
+#   int_to_bytes(r, 32)          # ancho fijo, big-endian
+#   int_to_min_bytes(nonce)      # longitud mínima (RLP); 0 -> b""
+
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+_BUFFERS = (bytes, bytearray, memoryview)
+
+
+def _probe():
+    # Comprueba (una vez, al importar) que el port convierte enteros de 256 bits
+    try:
+        value = (1 << 255) | 1
+        return int.from_bytes(value.to_bytes(32, "big"), "big") == value
+    except (AttributeError, OverflowError, TypeError, ValueError, NotImplementedError):
+        return False
+
+
+_NATIVE = _probe()
+
+
+if _NATIVE:
+    def int_from_bytes(data):
+        """
+        Entero sin signo de bytes big-endian (bytes, bytearray o memoryview).
+        """
+        return int.from_bytes(data, "big")
+
+    def int_to_bytes(value, length):
+        """
+        'value' (>= 0) en exactamente 'length' bytes big-endian.
+        """
+        return value.to_bytes(length, "big")
+else:
+    def int_from_bytes(data):
+        """
+        Entero sin signo de bytes big-endian (bytes, bytearray o memoryview).
+        """
+        return int(binascii.hexlify(data), 16) if len(data) else 0
+
+    def int_to_bytes(value, length):
+        """
+        'value' (>= 0) en exactamente 'length' bytes big-endian.
+        """
+        text = "%x" % value
+        if len(text) > 2 * length:
+            raise OverflowError("El entero no cabe en {} bytes".format(length))
+        return binascii.unhexlify("0" * (2 * length - len(text)) + text)
+
+
+def int_to_min_bytes(value):
+    """
+    'value' (>= 0) en la mínima cantidad de bytes big-endian (0 -> b"").
+    """
+    if not value:
+        return b""
+    text = "%x" % value
+    if len(text) & 1:
+        text = "0" + text
+    return binascii.unhexlify(text)
+
+
+def pad_hex(text, width):
+    """
+    Rellena con ceros a la izquierda el texto hexadecimal 'text' hasta 'width' dígitos.
+    """
+    missing = width - len(text)
+    return "0" * missing + text if missing > 0 else text
+
+
+def int_to_hex(value, width):
+    """
+    Hexadecimal (sin "0x") de 'value' con exactamente 'width' dígitos.
+    """
+    return pad_hex("%x" % value, width)
+
+
+def to_hex(data):
+    """
+    "0x" + hexadecimal en minúsculas de bytes, bytearray o memoryview.
+    """
+    return "0x" + binascii.hexlify(data).decode()
+
+
+def from_hex(text):
+    """
+    Bytes de una cadena hexadecimal (con o sin "0x"; longitud impar admitida).
+    """
+    if text.startswith("0x") or text.startswith("0X"):
+        text = text[2:]
+    if len(text) & 1:
+        text = "0" + text
+    return binascii.unhexlify(text)
+
+
+def as_bytes(value):
+    """
+    Vista binaria de 'value' sin copiar si ya es binario:
+    bytes/bytearray/memoryview tal cual, Address -> 20 bytes, texto "0x..." -> bytes.
+    """
+    if isinstance(value, _BUFFERS):
+        return value
+    if isinstance(value, str):
+        return from_hex(value)
+    canonical = getattr(value, "canonical", None)
+    if canonical is not None:
+        return canonical
+    raise TypeError("Se esperaban bytes o texto hexadecimal: " + repr(value))
+
+
+def to_json(value):
+    """
+    Prepara 'value' (params de una petición) para json.dumps: los valores binarios
+    y los Address pasan a "0x...". Si no hay nada que convertir, retorna el mismo
+    objeto sin copiarlo. Los enteros no se tocan (las cantidades las formatea quien llama).
+    """
+    if isinstance(value, (str, int)) or value is None:
+        return value
+    if isinstance(value, _BUFFERS):
+        return to_hex(value)
+    if isinstance(value, dict):
+        out = None
+        for k in value:
+            v = value[k]
+            c = to_json(v)
+            if c is not v:
+                if out is None:
+                    out = dict(value)
+                out[k] = c
+        return value if out is None else out
+    if isinstance(value, (list, tuple)):
+        out = None
+        for i, v in enumerate(value):
+            c = to_json(v)
+            if c is not v:
+                if out is None:
+                    out = list(value)
+                out[i] = c
+        return value if out is None else out
+    canonical = getattr(value, "canonical", None)
+    if canonical is not None:
+        return to_hex(canonical)   # Address
+    return value
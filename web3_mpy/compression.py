@@ -0,0 +1,192 @@
+# main/web3_mpy/compression.py
+#
+# Descompresión en streaming de respuestas HTTP (gzip/deflate).
+# - MicroPython >= 1.21: módulo 'deflate' (DeflateIO).
+# - MicroPython antiguo: 'zlib'/'uzlib' con DecompIO.
+# - CPython: zlib.decompressobj.
+# La ventana de descompresión está acotada por 'window_bits' (15 = 32 KB).
+
+import io
+import json
+
+try:
+    import deflate
+except ImportError:
+    deflate = None
+
+try:
+    import zlib
+except ImportError:
+    try:
+        import uzlib as zlib
+    except ImportError:
+        zlib = None
+
+# Cabecera Accept-Encoding a anunciar (None si no hay descompresor disponible)
+if deflate is not None or zlib is not None:
+    ACCEPT_ENCODING = "gzip, deflate"
+else:
+    ACCEPT_ENCODING = None
+
+# En MicroPython solo existe io.IOBase para streams definidos por el usuario
+_StreamBase = getattr(io, "RawIOBase", io.IOBase)
+
+_CHUNK = 512
+
+
+class CountingReader(_StreamBase):
+    """
+    Envuelve un stream y cuenta los bytes leídos a través de él.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        n = self.stream.readinto(buf)
+        if n:
+            self.count += n
+        return n
+
+    def read(self, size=-1):
+        data = self.stream.read() if size is None or size < 0 else self.stream.read(size)
+        if data:
+            self.count += len(data)
+        return data
+
+
+class _ZlibReader(_StreamBase):
+    """
+    Stream de descompresión para CPython basado en zlib.decompressobj.
+    Lee la entrada comprimida en bloques y nunca retiene más de una ventana.
+    """
+
+    def __init__(self, stream, window_bits):
+        self.stream = stream
+        # 32 + wbits: detecta automáticamente cabecera gzip o zlib
+        self._d = zlib.decompressobj(32 + window_bits)
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = []
+            while True:
+                chunk = self.read(_CHUNK * 8)
+                if not chunk:
+                    return b"".join(parts)
+                parts.append(chunk)
+        out = b""
+        while not out and not self._eof:
+            if self._d.unconsumed_tail:
+                out = self._d.decompress(self._d.unconsumed_tail, size)
+                continue
+            data = self.stream.read(_CHUNK)
+            if not data:
+                out = self._d.flush()
+                self._eof = True
+            else:
+                out = self._d.decompress(data, size)
+        return out
+
+    def readinto(self, buf):
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+
+def open_decoder(stream, encoding="gzip", window_bits=15):
+    """
+    Retorna un stream que descomprime 'stream' según 'encoding' ("gzip" o "deflate").
+    """
+    if deflate is not None:
+        # AUTO distingue entre cabecera gzip y zlib
+        return deflate.DeflateIO(stream, deflate.AUTO, window_bits)
+    if zlib is None:
+        raise Exception("No hay soporte de descompresión en este firmware")
+    if hasattr(zlib, "DecompIO"):
+        # MicroPython antiguo: wbits + 16 indica cabecera gzip
+        return zlib.DecompIO(stream, window_bits + 16 if encoding == "gzip" else window_bits)
+    return _ZlibReader(stream, window_bits)
+
+
+def header_value(headers, name):
+    """
+    Busca una cabecera HTTP sin distinguir mayúsculas/minúsculas.
+    """
+    if not headers:
+        return None
+    name = name.lower()
+    for key in headers:
+        k = key.decode() if isinstance(key, bytes) else key
+        if k.lower() == name:
+            value = headers[key]
+            value = value.decode() if isinstance(value, bytes) else value
+            return value.strip().lower()
+    return None
+
+
+def read_compressed_json(raw, encoding="gzip", window_bits=15, stats=None, method=None):
+    """
+    Descomprime y decodifica como JSON la respuesta leída de 'raw'.
+    Solo mantiene en memoria la ventana del descompresor y el texto JSON final.
+    """
+    wire = CountingReader(raw)
+    decoded = CountingReader(open_decoder(wire, encoding, window_bits))
+    parts = []
+    while True:
+        chunk = decoded.read(_CHUNK)
+        if not chunk:
+            break
+        parts.append(chunk)
+    body = b"".join(parts)
+    parts = None
+    if stats is not None:
+        stats.record(method, wire.count, decoded.count)
+    return json.loads(body)
+
+
+class CompressionStats:
+    """
+    Contadores de bytes recibidos (en el cable) y decodificados, por método JSON‑RPC.
+    """
+
+    def __init__(self):
+        self.methods = {}
+
+    def record(self, method, wire_bytes, decoded_bytes):
+        entry = self.methods.get(method)
+        if entry is None:
+            entry = self.methods[method] = [0, 0, 0]
+        entry[0] += wire_bytes
+        entry[1] += decoded_bytes
+        entry[2] += 1
+
+    def totals(self):
+        wire = decoded = 0
+        for entry in self.methods.values():
+            wire += entry[0]
+            decoded += entry[1]
+        return wire, decoded
+
+    def stats(self):
+        """
+        Retorna {método: {"wire": n, "decoded": n, "responses": n, "ratio": x}} y los totales.
+        """
+        out = {}
+        for method, (wire, decoded, count) in self.methods.items():
+            out[method] = {
+                "wire": wire,
+                "decoded": decoded,
+                "responses": count,
+                "ratio": (decoded / wire) if wire else 1.0,
+            }
+        wire, decoded = self.totals()
+        out["total"] = {"wire": wire, "decoded": decoded, "ratio": (decoded / wire) if wire else 1.0}
+        return out
@@ -0,0 +1,312 @@
+# main/web3_mpy/confirmations.py
+#
+# Seguimiento de la confirmación de muchas transacciones a la vez.
+# En lugar de un eth_getTransactionReceipt por transacción y por sondeo, se
+# sigue el número de bloque y, por cada bloque nuevo, se piden todos sus recibos
+# con un único eth_getBlockReceipts, que se cruzan con las transacciones
+# pendientes mediante un diccionario hash -> pendiente. Si el nodo no soporta
+# eth_getBlockReceipts se usa un batch de eth_getTransactionReceipt.
+# El intervalo de sondeo se adapta al tiempo de bloque observado.
+#
+# Uso:
+#   tracker = ConfirmationTracker(w3, confirmations=2)
+#   tracker.add(tx_hash, callback=lambda h, receipt: print(h, receipt["status"]))
+#   tracker.wait(timeout=120)
+
+from web3_mpy.clock import ticks_ms, ticks_diff, sleep_ms
+
+# Respuestas de un nodo que no implementa eth_getBlockReceipts
+_UNSUPPORTED = ("method not found", "not supported", "unsupported", "does not exist", "not available")
+
+
+def _is_unsupported(error):
+    if error.get("code") == -32601:
+        return True
+    message = str(error.get("message", "")).lower()
+    for fragment in _UNSUPPORTED:
+        if fragment in message:
+            return True
+    return False
+
+
+def _lower(tx_hash):
+    if not isinstance(tx_hash, str):
+        tx_hash = "0x" + bytes(tx_hash).hex()
+    return tx_hash.lower()
+
+
+class TxFuture:
+    """
+    Resultado pendiente de una transacción: se resuelve con su recibo
+    cuando alcanza las confirmaciones pedidas.
+    """
+
+    __slots__ = ("tx_hash", "callback", "receipt")
+
+    def __init__(self, tx_hash, callback=None):
+        self.tx_hash = tx_hash
+        self.callback = callback
+        self.receipt = None
+
+    def done(self):
+        return self.receipt is not None
+
+    def success(self):
+        """
+        True si la transacción se ejecutó correctamente (status 0x1), None si aún no se confirmó.
+        """
+        if self.receipt is None:
+            return None
+        return int(self.receipt.get("status", "0x1"), 16) == 1
+
+    def result(self):
+        return self.receipt
+
+
+class ConfirmationTracker:
+    def __init__(self, web3, confirmations=1, min_interval_ms=500, max_interval_ms=15000,
+                 block_time_ms=12000, max_catchup=16, follower=None, bloom=None,
+                 bloom_recheck_blocks=8, bloom_recheck_ms=60000, max_confirmed=32):
+        """
+        :param web3: Instancia de Web3.
+        :param confirmations: Bloques necesarios (1 = incluida en un bloque).
+        :param min_interval_ms: Intervalo mínimo entre sondeos.
+        :param max_interval_ms: Intervalo máximo entre sondeos.
+        :param block_time_ms: Tiempo de bloque inicial; se ajusta con lo observado.
+        :param max_catchup: Bloques nuevos máximos que se recorren uno a uno; con un hueco
+                            mayor se consultan directamente los recibos pendientes.
+        :param follower: BlockFollower opcional (w3.eth.follow_blocks()). Da la cabeza de la
+                         cadena compartida y, tras un reorg, devuelve a pendientes las
+                         transacciones de bloques huérfanos.
+        :param bloom: BloomMatcher opcional, válido solo si TODAS las transacciones seguidas
+                      emiten un log que lo cumple (por ejemplo, transferencias de un token).
+                      Con follower, los bloques cuyo logsBloom lo descarta no piden recibos.
+        :param bloom_recheck_blocks: Tras este número de bloques saltados por el bloom se buscan
+                                     igualmente los recibos pendientes (una transacción revertida
+                                     no emite logs y su bloque nunca cumple el bloom).
+        :param bloom_recheck_ms: Lo mismo, si pasa este tiempo desde el primer bloque saltado.
+        :param max_confirmed: Confirmadas más recientes que se conservan en 'confirmed'.
+        """
+        self.web3 = web3
+        self.confirmations = confirmations
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.block_time_ms = block_time_ms
+        self.max_catchup = max_catchup
+        self.use_block_receipts = True
+        self.pending = {}      # hash -> TxFuture sin recibo
+        self.unchecked = []    # hashes añadidos que aún no se han buscado (pueden estar ya minados)
+        self.mined = {}        # hash -> (TxFuture, recibo) a la espera de confirmaciones
+        self.confirmed = []    # [(hash, recibo)] en orden de confirmación (las 'max_confirmed' últimas)
+        self.max_confirmed = max_confirmed
+        self.head = None
+        self._head_ticks = None
+        self.requests = 0
+        self.follower = follower
+        self.bloom = bloom
+        self.bloom_skips = 0
+        self.bloom_recheck_blocks = bloom_recheck_blocks
+        self.bloom_recheck_ms = bloom_recheck_ms
+        self._skipped = 0          # Bloques saltados por el bloom desde la última búsqueda de pendientes
+        self._skipped_ticks = None
+        if follower is not None:
+            follower.add_listener(self)
+
+    def add(self, tx_hash, callback=None):
+        """
+        Añade una transacción a seguir. 'callback(tx_hash, receipt)' se llama al confirmarse.
+        Retorna un TxFuture.
+        """
+        key = _lower(tx_hash)
+        future = TxFuture(key, callback)
+        self.pending[key] = future
+        self.unchecked.append(key)
+        return future
+
+    def __len__(self):
+        return len(self.pending) + len(self.mined)
+
+    def _request(self, method, params):
+        self.requests += 1
+        return self.web3.provider.make_request(method, params)
+
+    def _observe_head(self, head):
+        now = ticks_ms()
+        if self.head is not None and head > self.head and self._head_ticks is not None:
+            # Media móvil del tiempo por bloque
+            per_block = ticks_diff(now, self._head_ticks) // (head - self.head)
+            self.block_time_ms = (self.block_time_ms * 3 + per_block) // 4
+        self.head = head
+        self._head_ticks = now
+
+    def next_poll_ms(self):
+        """
+        Tiempo sugerido hasta el siguiente sondeo: hasta el próximo bloque esperado
+        y, si ya debería haber llegado, el intervalo mínimo.
+        """
+        if self._head_ticks is None:
+            return self.min_interval_ms
+        remaining = self.block_time_ms - ticks_diff(ticks_ms(), self._head_ticks)
+        return max(self.min_interval_ms, min(self.max_interval_ms, remaining))
+
+    def _match(self, receipt):
+        if not receipt:
+            return
+        key = receipt.get("transactionHash", "").lower()
+        future = self.pending.pop(key, None)
+        if future is not None:
+            self.mined[key] = (future, receipt)
+
+    def _fetch_receipts(self, hashes):
+        """
+        Busca los recibos de 'hashes' en un único batch (o uno a uno si el proveedor no soporta batches).
+        """
+        if not hashes:
+            return
+        calls = [("eth_getTransactionReceipt", [h]) for h in hashes]
+        provider = self.web3.provider
+        if hasattr(provider, "make_batch_request"):
+            self.requests += 1
+            responses = provider.make_batch_request(calls)
+        else:
+            responses = [self._request(m, p) for m, p in calls]
+        for response in responses:
+            self._match(response.get("result"))
+
+    def _fetch_pending(self):
+        self._skipped = 0
+        self._fetch_receipts(list(self.pending))
+
+    def _bloom_excludes(self, number):
+        if self.bloom is None or self.follower is None:
+            return False
+        header = self.follower.ring.get(number)
+        if header is None or self.bloom.matches(header[5]):
+            return False
+        self.bloom_skips += 1
+        if not self._skipped:
+            self._skipped_ticks = ticks_ms()
+        self._skipped += 1
+        return True
+
+    def _bloom_recheck_due(self):
+        if not self._skipped or not self.pending:
+            return False
+        return (self._skipped >= self.bloom_recheck_blocks
+                or ticks_diff(ticks_ms(), self._skipped_ticks) >= self.bloom_recheck_ms)
+
+    def _fetch_block(self, number):
+        """
+        Recibos del bloque 'number' con eth_getBlockReceipts. Retorna False si falla; solo
+        si el nodo no soporta el método se deja de usar (un error puntual no lo desactiva).
+        """
+        response = self._request("eth_getBlockReceipts", [hex(number)])
+        if "error" in response:
+            if _is_unsupported(response["error"]):
+                self.use_block_receipts = False
+            return False
+        for receipt in response.get("result") or ():
+            self._match(receipt)
+        return True
+
+    def poll(self):
+        """
+        Consulta el bloque actual y procesa los bloques nuevos.
+        Retorna la lista de (hash, recibo) confirmados en este sondeo.
+        """
+        if self.follower is not None:
+            self.follower.poll()
+            head = self.follower.head_number
+            if head is None:
+                # El follower aún no tiene cabeza (el nodo no devolvió el bloque): se reintenta después
+                return []
+        else:
+            head = int(self._request("eth_blockNumber", [])["result"], 16)
+        if self.unchecked:
+            # Las recién añadidas pueden estar ya minadas en bloques anteriores.
+            # Se buscan después de leer 'head' para no perder las minadas entre ambas consultas.
+            hashes = [h for h in self.unchecked if h in self.pending]
+            self.unchecked = []
+            self._fetch_receipts(hashes)
+        previous = self.head
+        if previous is not None and head > previous and self.pending:
+            by_block = self.use_block_receipts and head - previous <= self.max_catchup
+            if by_block:
+                for number in range(previous + 1, head + 1):
+                    if self._bloom_excludes(number):
+                        continue
+                    if not self._fetch_block(number):
+                        by_block = False
+                        break
+            if not by_block:
+                # Hueco grande, nodo sin eth_getBlockReceipts o fallo puntual: recibos por hash
+                self._fetch_pending()
+            elif self._bloom_recheck_due():
+                # Las revertidas no emiten logs: cada cierto tiempo se buscan sin el filtro bloom
+                self._fetch_pending()
+        if previous is None or head != previous:
+            self._observe_head(head)
+        return self._confirm(head)
+
+    def _confirm(self, head):
+        done = []
+        for key in list(self.mined):
+            future, receipt = self.mined[key]
+            number = int(receipt["blockNumber"], 16)
+            if self.follower is not None:
+                known = self.follower.block_hash(number)
+                if known is not None and known != receipt.get("blockHash", known):
+                    # El recibo es de un bloque huérfano: se vuelve a buscar
+                    self._unmine(key)
+                    continue
+            if head - number + 1 >= self.confirmations:
+                del self.mined[key]
+                future.receipt = receipt
+                self.confirmed.append((key, receipt))
+                done.append((key, receipt))
+                if future.callback is not None:
+                    future.callback(key, receipt)
+        if len(self.confirmed) > self.max_confirmed:
+            # Solo las más recientes: el TxFuture de cada una conserva su recibo
+            del self.confirmed[:len(self.confirmed) - self.max_confirmed]
+        return done
+
+    def _unmine(self, key):
+        future, _receipt = self.mined.pop(key)
+        self.pending[key] = future
+        self.unchecked.append(key)
+
+    def on_reorg(self, fork_block, depth):
+        """
+        Llamado por el BlockFollower: las transacciones minadas en bloques >= fork_block
+        vuelven a pendientes hasta encontrarlas en la cadena nueva.
+        """
+        for key in list(self.mined):
+            if int(self.mined[key][1]["blockNumber"], 16) >= fork_block:
+                self._unmine(key)
+
+    def wait(self, timeout=120):
+        """
+        Sondea hasta que todas las transacciones se confirmen o pase 'timeout' (segundos).
+        Retorna la lista de (hash, recibo) confirmados durante la espera.
+        """
+        start = ticks_ms()
+        done = []
+        while len(self):
+            done.extend(self.poll())
+            if not len(self) or ticks_diff(ticks_ms(), start) >= timeout * 1000:
+                break
+            sleep_ms(self.next_poll_ms())
+        return done
+
+    def stats(self):
+        return {
+            "pending": len(self.pending),
+            "mined": len(self.mined),
+            "confirmed": len(self.confirmed),
+            "head": self.head,
+            "block_time_ms": self.block_time_ms,
+            "requests": self.requests,
+            "block_receipts": self.use_block_receipts,
+            "bloom_skips": self.bloom_skips,
+        }
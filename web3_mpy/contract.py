@@ -105,11 +105,33 @@ class ContractFunction:
 # nota: Con decodificacion dinamica
 
 from web3_mpy.keccak import keccak_256
-import gc
-import re
+from web3_mpy.memory import maybe_collect
+from web3_mpy.abi import encode_abi, decode_abi, decode_tail, parse_params, parse_type, is_dynamic, CodecPlan
+from web3_mpy.abi import UINT, INT, ADDRESS, BOOL, FBYTES
+from web3_mpy.abi_compiler import is_compact_abi, compact_parts, expand_function, expand_event
+from web3_mpy.address import Address
+from web3_mpy.codec import to_hex, to_json
 
 def clear_memory():
-    gc.collect()
+    maybe_collect()
+
+def canonical_type(abi_param):
+    """
+    Retorna el tipo canónico de un parámetro del ABI para la firma.
+    Las tuplas se expanden a sus componentes: "tuple[]" -> "(address,uint256)[]".
+    """
+    typ = abi_param["type"]
+    if typ.startswith("tuple"):
+        inner = ",".join(canonical_type(c) for c in abi_param.get("components", []))
+        return "(" + inner + ")" + typ[5:]
+    return typ
+
+def get_signature(abi_item):
+    """
+    Retorna la firma textual de una función o evento, por ejemplo "transfer(address,uint256)".
+    """
+    types = [canonical_type(inp) for inp in abi_item.get("inputs", [])]
+    return "{}({})".format(abi_item["name"], ",".join(types))
 
 def get_function_selector(abi_item):
     """
@@ -119,21 +141,46 @@ def get_function_selector(abi_item):
     """
     if abi_item.get("type") != "function":
         return None
-    inputs = abi_item.get("inputs", [])
-    types = [inp["type"] for inp in inputs]
-    signature_str = "{}({})".format(abi_item["name"], ",".join(types))
-    hash_bytes = keccak_256(signature_str.encode("utf-8"))
-    return bytes.fromhex(hash_bytes[:4].hex())
+    hash_bytes = keccak_256(get_signature(abi_item).encode("utf-8"))
+    return bytes(hash_bytes[:4])
+
+def get_event_topic(abi_item):
+    """
+    Retorna el topic 0 de un evento: el hash Keccak-256 completo (32 bytes) de su firma.
+    Ejemplo: Transfer(address,address,uint256) -> 0xddf252ad...
+    """
+    return bytes(keccak_256(get_signature(abi_item).encode("utf-8")))
+
+def arg_matches_type(typ, arg):
+    """
+    Comprueba si el argumento de Python es compatible con el tipo del ABI.
+    Se usa para elegir entre sobrecargas con el mismo número de argumentos.
+    """
+    if typ.endswith("]"):
+        return isinstance(arg, (list, tuple))
+    if typ.startswith("tuple") or typ.startswith("("):
+        return isinstance(arg, (list, tuple, dict))
+    if typ == "bool":
+        return isinstance(arg, bool)
+    if typ.startswith("uint") or typ.startswith("int"):
+        return isinstance(arg, int) and not isinstance(arg, bool)
+    if typ == "address":
+        if isinstance(arg, Address):
+            return True
+        if isinstance(arg, (bytes, bytearray)):
+            return len(arg) == 20
+        return isinstance(arg, str) and arg.startswith("0x") and len(arg) == 42
+    if typ == "string":
+        return isinstance(arg, str)
+    if typ.startswith("bytes"):
+        return isinstance(arg, (bytes, bytearray)) or (isinstance(arg, str) and arg.startswith("0x"))
+    return True
 
 def is_dynamic_type(typ):
     """
-    Retorna True si el tipo es dinámico (string, bytes o array dinámico).
+    Retorna True si el tipo es dinámico (string, bytes, array dinámico o con elementos dinámicos).
     """
-    if typ == "string" or typ == "bytes":
-        return True
-    if typ.endswith("[]"):
-        return True
-    return False
+    return is_dynamic(parse_type(typ))
 
 def is_array_type(typ):
     """
@@ -148,172 +195,391 @@ def get_array_info(typ):
       "uint256[3]" -> ("uint256", 3)
       "uint256[]"  -> ("uint256", None)
     """
-    m = re.match(r"(.*)\[(.*?)\]$", typ)
-    if m:
-        base = m.group(1)
-        length_str = m.group(2)
-        if length_str == "":
-            return base, None
-        else:
-            return base, int(length_str)
-    return None, None
+    if not typ.endswith("]"):
+        return None, None
+    idx = typ.rindex("[")
+    length_str = typ[idx + 1:-1]
+    return typ[:idx], (int(length_str) if length_str else None)
 
 def decode_static(typ, data):
     """
-    Decodifica tipos estáticos contenidos en 32 bytes.
-    Soporta: uint, int, address, bool y bytes fijos (ej. bytes32).
-    """
-    if typ.startswith("uint"):
-        return int.from_bytes(data, "big")
-    elif typ.startswith("int"):
-        unsigned_val = int.from_bytes(data, "big")
-        # Si el entero es negativo, se ajusta
-        if unsigned_val >= (1 << 255):
-            return unsigned_val - (1 << 256)
-        return unsigned_val
-    elif typ == "address":
-        return "0x" + data[-20:].hex()
-    elif typ == "bool":
-        return bool(int.from_bytes(data, "big"))
-    elif typ.startswith("bytes") and typ != "bytes":
-        # bytes fijos: ej. bytes4, bytes32; se toman los primeros N bytes
-        size = int(typ[5:])
-        return data[:size]
-    else:
-        raise ValueError("Tipo estático no soportado: " + typ)
-
+    Decodifica un tipo estático a partir de sus bytes (32 por palabra).
+    Soporta: uint, int, address, bool, bytes fijos (ej. bytes32), arrays fijos y tuplas estáticas.
+    """
+    return decode_abi([parse_type(typ)], data)[0]
 
 def decode_dynamic(typ, full_data, offset):
     """
-    Decodifica tipos dinámicos a partir de full_data comenzando en offset.
-    Soporta:
-      - string: se decodifica asumiendo codificación UTF-8.
-      - bytes: retorna los bytes.
-      - Arrays dinámicos con elementos estáticos.
+    Decodifica un tipo dinámico de full_data cuyo contenido comienza en 'offset'.
+    Soporta string, bytes y arrays (incluidos arrays de strings y arrays anidados).
     """
-    if typ == "string":
-        length = int.from_bytes(full_data[offset:offset+32], "big")
-        data = full_data[offset+32: offset+32+length]
-        return data.decode("utf-8")
-    elif typ == "bytes":
-        length = int.from_bytes(full_data[offset:offset+32], "big")
-        data = full_data[offset+32: offset+32+length]
-        return data
-    elif is_array_type(typ):
-        base, fixed_length = get_array_info(typ)
-        # Para arrays dinámicos, el primer slot es la longitud
-        length = int.from_bytes(full_data[offset:offset+32], "big")
-        arr = []
-        # En este ejemplo se asume que los elementos son de tipo estático.
-        element_size = 32
-        for i in range(length):
-            start = offset + 32 + i * element_size
-            element_data = full_data[start:start+element_size]
-            arr.append(decode_static(base, element_data))
-        return arr
-    else:
-        raise ValueError("Tipo dinámico no soportado: " + typ)
+    return decode_tail(memoryview(full_data), offset, parse_type(typ))
+
+def compile_function(abi_item):
+    """
+    Compila una sola vez las entradas y salidas de una función.
+    Retorna (plan_entradas, plan_salidas, nombres_salidas).
+    """
+    outputs = abi_item.get("outputs", [])
+    return (CodecPlan(parse_params(abi_item.get("inputs", []))),
+            CodecPlan(parse_params(outputs)),
+            tuple(o.get("name", "") for o in outputs))
 
 class Contract:
     def __init__(self, address, abi, web3):
         """
         Inicializa el contrato.
         :param address: Dirección del contrato (string con "0x...").
-        :param abi: Lista con el ABI del contrato.
+        :param abi: Lista con el ABI del contrato, o ABI compilado con web3_mpy.abi_compiler
+                    (módulo o diccionario con FUNCTIONS/EVENTS).
         :param web3: Instancia de Web3.
         """
         self.address = address
         self.abi = abi
         self.web3 = web3
         self.functions = ContractFunctions(abi, web3, address)
+        self.events = ContractEvents(abi, web3, address)
 
 class ContractFunctions:
     def __init__(self, abi, web3, address):
+        """
+        Indexa el ABI una sola vez:
+          - _overloads: nombre -> [(abi_item, selector), ...]
+          - _by_selector: selector (4 bytes) -> abi_item
+        Los selectores se calculan aquí y no en cada llamada. Con un ABI compilado
+        los selectores ya vienen calculados y cada entrada compacta solo se expande
+        a abi_item cuando se usa la función.
+        """
         self.abi = abi
         self.web3 = web3
         self.address = address
+        self._overloads = {}
+        self._by_selector = {}
+        if is_compact_abi(abi):
+            for entry in compact_parts(abi)[0]:
+                self._add(entry[0], entry, entry[1])
+        else:
+            for item in abi:
+                if item.get("type") == "function":
+                    self._add(item["name"], item, get_function_selector(item))
+
+    def _add(self, name, item, selector):
+        entries = self._overloads.get(name)
+        if entries is None:
+            entries = self._overloads[name] = []
+        entries.append((item, selector))
+        self._by_selector[selector] = item
 
     def __getattr__(self, name):
         """
         Permite acceder a las funciones del contrato como atributos.
         Ejemplo: contract.functions.getPool(*args)
-        Busca en el ABI un elemento con "name" igual al solicitado.
+        El objeto creado se guarda como atributo, así los siguientes accesos
+        no vuelven a pasar por __getattr__.
         """
-        for item in self.abi:
-            if item.get("type") == "function" and item.get("name") == name:
-                # Retorna una lambda que crea una instancia de ContractFunction
-                return lambda *args: ContractFunction(item, args, self.web3, self.address)
-        raise AttributeError("Función {} no encontrada en el ABI del contrato.".format(name))
+        overloads = self.__dict__.get("_overloads")
+        if overloads is None or name not in overloads:
+            raise AttributeError("Función {} no encontrada en el ABI del contrato.".format(name))
+        bound = BoundFunction(self, name, overloads[name])
+        setattr(self, name, bound)
+        return bound
+
+    def __contains__(self, name):
+        return name in self._overloads
+
+    def get_function_by_selector(self, selector):
+        """
+        Retorna el abi_item cuyo selector coincide ("0x..." o 4 bytes), o None.
+        """
+        if isinstance(selector, str):
+            selector = bytes.fromhex(selector[2:] if selector.startswith("0x") else selector)
+        item = self._by_selector.get(bytes(selector[:4]))
+        if isinstance(item, tuple):
+            item = expand_function(item)
+        return item
+
+class BoundFunction:
+    """
+    Función del contrato con sus sobrecargas. Al llamarla con argumentos
+    elige la sobrecarga por número y tipo de argumentos y crea el ContractFunction.
+    """
+
+    def __init__(self, functions, name, overloads):
+        self.functions = functions
+        self.name = name
+        # Las entradas de un ABI compilado se expanden aquí, solo para las funciones usadas
+        self.overloads = [(expand_function(item) if isinstance(item, tuple) else item, selector)
+                          for item, selector in overloads]
+        # selector -> plan compilado (compile_function), creado en la primera llamada
+        self.plans = {}
+
+    def resolve(self, args):
+        """
+        Retorna (abi_item, selector) de la sobrecarga compatible con 'args'.
+        """
+        candidates = [o for o in self.overloads if len(o[0].get("inputs", [])) == len(args)]
+        if len(candidates) > 1:
+            candidates = [o for o in candidates
+                          if all(arg_matches_type(inp["type"], arg)
+                                 for inp, arg in zip(o[0].get("inputs", []), args))]
+        if not candidates:
+            raise ValueError("Ninguna sobrecarga de {} acepta {} argumento(s) de esos tipos.".format(self.name, len(args)))
+        if len(candidates) > 1:
+            raise ValueError("Llamada ambigua a {}: varias sobrecargas aceptan esos argumentos.".format(self.name))
+        return candidates[0]
+
+    def __call__(self, *args):
+        item, selector = self.resolve(args)
+        plan = self.plans.get(selector)
+        if plan is None:
+            plan = self.plans[selector] = compile_function(item)
+        functions = self.functions
+        return ContractFunction(item, args, functions.web3, functions.address, selector, plan)
 
 class ContractFunction:
-    def __init__(self, abi_item, args, web3, address):
+    def __init__(self, abi_item, args, web3, address, selector=None, plan=None):
         self.abi_item = abi_item
         self.args = args
         self.web3 = web3
         self.address = address
+        self.selector = selector if selector is not None else get_function_selector(abi_item)
+        self.plan = plan if plan is not None else compile_function(abi_item)
         self.data = self.encode_call()
 
     def encode_call(self):
         """
-        Codifica la llamada a la función:
-          - Calcula el selector (primeros 4 bytes del hash keccak de la firma).
-          - Codifica los argumentos (en esta versión se soportan enteros y direcciones).
-        Retorna la concatenación del selector y la codificación de argumentos.
+        Codifica la llamada a la función (ABI v2):
+          - Selector precalculado (primeros 4 bytes del hash keccak de la firma).
+          - Argumentos de cualquier tipo del ABI: enteros con signo, address, bool,
+            bytes/bytesN, string, arrays (fijos, dinámicos y anidados) y tuplas.
+        Retorna un bytearray con selector + head + tail, reservado de una sola vez.
+        Usa el plan compilado de la función: no se analiza ningún tipo en cada llamada.
         """
-        selector = get_function_selector(self.abi_item)
-        encoded_args = b""
-        for arg in self.args:
-            if isinstance(arg, int):
-                encoded_args += arg.to_bytes(32, "big")
-            elif isinstance(arg, str) and arg.startswith("0x") and len(arg) == 42:
-                # Se asume que es una dirección Ethereum
-                addr_bytes = bytes.fromhex(arg[2:])
-                # Se rellena a la izquierda con 12 bytes de 0 para completar 32 bytes
-                encoded_args += (b'\x00' * 12) + addr_bytes
-            else:
-                raise ValueError("Tipo de argumento no soportado: solo enteros y direcciones en esta implementación.")
-        return selector + encoded_args
+        return self.plan[0].encode(self.args, self.selector)
 
-    def decode_output(self, raw_result):
+    def decode_output(self, raw_result, lazy=False):
         """
         Decodifica la respuesta del nodo según la estructura de salida definida en el ABI.
-        Separa la parte head (32 bytes por cada salida) y, para cada salida:
-          - Si es un tipo dinámico, se utiliza el offset indicado para decodificar.
-          - Si es un tipo estático, se decodifica directamente el slot.
+        Trabaja sobre un memoryview de los datos, sin copiar cada slot.
+          - lazy=False: un único valor o una tupla con todas las salidas.
+          - lazy=True: un LazyResult que decodifica cada salida al accederla
+            (por índice o por nombre, por ejemplo result.answer).
         """
-        outputs = self.abi_item.get("outputs", [])
-        if not outputs:
+        _, outputs, names = self.plan
+        if not outputs.nodes:
             return None
-
-        # Convertir el resultado a bytes, removiendo el prefijo "0x" si existe.
-        full_data = bytes.fromhex(raw_result[2:]) if raw_result.startswith("0x") else bytes.fromhex(raw_result)
-        values = []
-        # Se asume que la parte head tiene 32 bytes por cada salida.
-        head_slots = [full_data[i*32:(i+1)*32] for i in range(len(outputs))]
-        
-        for i, output in enumerate(outputs):
-            typ = output["type"]
-            if is_dynamic_type(typ):
-                # Para tipos dinámicos, el slot contiene el offset relativo al inicio de full_data.
-                offset = int.from_bytes(head_slots[i], "big")
-                value = decode_dynamic(typ, full_data, offset)
-            else:
-                value = decode_static(typ, head_slots[i])
-            values.append(value)
+        if lazy:
+            return outputs.decode(raw_result, names, lazy=True)
+        values = outputs.decode(raw_result)
         if len(values) == 1:
             return values[0]
         return tuple(values)
 
-    def call(self):
+    def call(self, lazy=False, block_identifier="latest", cache=None):
         """
         Realiza la llamada a la función mediante JSON‑RPC usando el método "eth_call".
         Construye el payload con la dirección del contrato y los datos codificados.
-        Retorna la respuesta decodificada según el ABI.
+        Retorna la respuesta decodificada según el ABI (perezosa si lazy=True).
+        :param block_identifier: "latest", "pending", número de bloque (int) o hash.
+        :param cache: CallCache opcional (web3_mpy.cache) con resultados ya decodificados
+                      por (dirección, calldata, bloque).
         """
+        if cache is not None:
+            cached = cache.get(self, block_identifier, lazy)
+            if cached is not cache.MISS:
+                return cached
+        # El payload se crea aquí: se guarda ya en "0x..." para que to_json no tenga
+        # que copiar la lista y el diccionario al serializar (la conversión es la misma)
         payload = {
-            "to": self.address,
-            "data": "0x" + self.data.hex()
+            "to": to_json(self.address),
+            "data": to_hex(self.data)
         }
-        response = self.web3.provider.make_request("eth_call", [payload, "latest"])
+        block = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+        response = self.web3.provider.make_request("eth_call", [payload, block])
         raw_result = response.get("result")
-        return self.decode_output(raw_result)
+        if raw_result is None:
+            error = response.get("error") or {}
+            raise Exception("Error en eth_call: " + str(error.get("message")))
+        result = self.decode_output(raw_result, lazy)
+        if cache is not None:
+            # Un LazyResult ocupa aproximadamente lo mismo que los datos sin decodificar
+            cache.put(self, block_identifier, result, lazy, len(raw_result) // 2 + 64 if lazy else None)
+        return result
+
+
+_TWO_256 = 1 << 256
+
+def decode_topic(node, topic):
+    """
+    Decodifica un topic indexado ("0x" + 64 hex) sin convertirlo entero a bytes.
+    Los tipos dinámicos indexados (string, bytes, arrays, tuplas) solo guardan su
+    hash Keccak, por lo que se retornan como los 32 bytes del topic.
+    """
+    kind = node[0]
+    if kind == ADDRESS:
+        return "0x" + topic[26:66].lower()
+    if kind == UINT:
+        return int(topic, 16)
+    if kind == INT:
+        value = int(topic, 16)
+        return value - _TWO_256 if value >> 255 else value
+    if kind == BOOL:
+        return int(topic, 16) != 0
+    if kind == FBYTES:
+        return bytes.fromhex(topic[2:2 + 2 * node[1]])
+    return bytes.fromhex(topic[2:])
+
+class ContractEvent:
+    """
+    Evento del ABI con su topic 0 y la separación indexados/no indexados precalculados.
+    """
+
+    def __init__(self, abi_item, web3, address, topic_hex=None):
+        self.abi_item = abi_item
+        self.web3 = web3
+        self.address = address
+        self.name = abi_item["name"]
+        self.anonymous = abi_item.get("anonymous", False)
+        if topic_hex is None:
+            topic_hex = "0x" + get_event_topic(abi_item).hex()
+        self.topic_hex = topic_hex
+        self.topic = bytes.fromhex(topic_hex[2:])
+        self.indexed = []      # [(nombre, nodo)] en orden de topics
+        data_params = []
+        for inp in abi_item.get("inputs", []):
+            if inp.get("indexed"):
+                self.indexed.append((inp.get("name", ""), parse_type(inp["type"], inp.get("components"))))
+            else:
+                data_params.append(inp)
+        self.data_names = [p.get("name", "") for p in data_params]
+        self.data_nodes = parse_params(data_params)
+
+    def matches_topics(self, topics):
+        """
+        True si el número de topics corresponde a los parámetros indexados del evento
+        (el Transfer de ERC-721 comparte topic 0 con el de ERC-20 pero tiene 4 topics).
+        """
+        first = 0 if self.anonymous else 1
+        return len(topics) - first == len(self.indexed)
+
+    def decode_log(self, log):
+        """
+        Decodifica un log (tal como lo retorna eth_getLogs) en un diccionario:
+        {"event", "args", "address", "blockNumber", "transactionHash", "logIndex"}.
+        """
+        topics = log.get("topics", [])
+        if not self.matches_topics(topics):
+            raise ValueError("El log no coincide con el evento " + self.name)
+        first = 0 if self.anonymous else 1
+        args = {}
+        for i, (name, node) in enumerate(self.indexed):
+            args[name] = decode_topic(node, topics[first + i])
+        if self.data_nodes:
+            values = decode_abi(self.data_nodes, log.get("data", "0x"))
+            for name, value in zip(self.data_names, values):
+                args[name] = value
+        return {
+            "event": self.name,
+            "args": args,
+            "address": log.get("address"),
+            "blockNumber": log.get("blockNumber"),
+            "transactionHash": log.get("transactionHash"),
+            "logIndex": log.get("logIndex"),
+        }
+
+    def filter_params(self, from_block="latest", to_block="latest"):
+        """
+        Parámetros de filtro para eth_getLogs / eth_newFilter limitados a este evento.
+        """
+        return {
+            "address": self.address,
+            "fromBlock": from_block if isinstance(from_block, str) else hex(from_block),
+            "toBlock": to_block if isinstance(to_block, str) else hex(to_block),
+            "topics": [self.topic_hex],
+        }
+
+    def get_logs(self, from_block="latest", to_block="latest"):
+        """
+        Consulta eth_getLogs para este evento y retorna los logs decodificados.
+        """
+        response = self.web3.provider.make_request("eth_getLogs", [self.filter_params(from_block, to_block)])
+        if "error" in response:
+            raise Exception("Error en eth_getLogs: " + response["error"]["message"])
+        return [self.decode_log(log) for log in response.get("result", [])]
+
+class ContractEvents:
+    """
+    Eventos del contrato: contract.events.Transfer, con un índice topic0 -> evento
+    construido una sola vez para despachar logs en O(1).
+    """
+
+    def __init__(self, abi, web3, address):
+        self._events = {}
+        self._by_topic = {}
+        if is_compact_abi(abi):
+            for entry in compact_parts(abi)[1]:
+                self._add(ContractEvent(expand_event(entry), web3, address, entry[1]))
+        else:
+            for item in abi:
+                if item.get("type") == "event":
+                    self._add(ContractEvent(item, web3, address))
+
+    def _add(self, event):
+        self._events[event.name] = event
+        if not event.anonymous:
+            self._by_topic[event.topic_hex] = event
+
+    def __getattr__(self, name):
+        events = self.__dict__.get("_events")
+        if events is None or name not in events:
+            raise AttributeError("Evento {} no encontrado en el ABI del contrato.".format(name))
+        return events[name]
+
+    def __contains__(self, name):
+        return name in self._events
+
+    def get_event_by_topic(self, topic0):
+        """
+        Retorna el ContractEvent cuyo topic 0 coincide ("0x..." o 32 bytes), o None.
+        """
+        if not isinstance(topic0, str):
+            topic0 = "0x" + bytes(topic0).hex()
+        return self._by_topic.get(topic0.lower())
+
+    def decode_log(self, log):
+        """
+        Decodifica un log de cualquier evento conocido. Retorna None si el topic 0 no está en el ABI
+        o el número de topics no corresponde al evento.
+        """
+        topics = log.get("topics")
+        if not topics:
+            return None
+        event = self._by_topic.get(topics[0]) or self._by_topic.get(topics[0].lower())
+        if event is None or not event.matches_topics(topics):
+            return None
+        return event.decode_log(log)
+
+    def iter_decode_logs(self, logs, skip_unknown=True):
+        """
+        Generador que decodifica un resultado o stream de eth_getLogs log a log,
+        sin recorrer el ABI: cada log se despacha por su topic 0. Los logs de eventos
+        desconocidos, o con un número de topics distinto del evento, se omiten
+        (o se entregan como None si skip_unknown es False).
+        """
+        by_topic = self._by_topic
+        for log in logs:
+            topics = log.get("topics")
+            event = None
+            if topics:
+                event = by_topic.get(topics[0]) or by_topic.get(topics[0].lower())
+            if event is None or not event.matches_topics(topics):
+                if not skip_unknown:
+                    yield None
+                continue
+            yield event.decode_log(log)
+
+    def decode_logs(self, logs, skip_unknown=True):
+        """
+        Decodifica en bloque una lista de logs (por ejemplo, el resultado de eth_getLogs).
+        """
+        return list(self.iter_decode_logs(logs, skip_unknown))
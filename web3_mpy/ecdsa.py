@@ -7,6 +7,7 @@
 # - Usa k aleatorio con os.urandom(32) en vez de RFC6979.
 
 import os
+from web3_mpy.codec import int_from_bytes
 
 # Parámetros secp256k1
 P = 2**256 - 2**32 - 977
@@ -17,11 +18,8 @@ Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
 Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
 G = (Gx, Gy)
 
-def bytes_to_int(b):
-    num = 0
-    for byte in b:
-        num = (num << 8) | byte
-    return num
+# Entero big-endian de bytes (int.from_bytes, o la ruta hexadecimal si el port no lo tiene)
+bytes_to_int = int_from_bytes
 
 def inv(a, m):
     """Inverso modular de 'a' mod 'm' (Euclides extendido)."""
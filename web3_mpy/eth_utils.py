@@ -10,6 +10,8 @@ from web3_mpy.eth_utils_helpers import (
     to_hex
 )
 from web3_mpy.keccak import keccak_256  # Asegúrate de que este módulo exista en web3_mpy/keccak.py
+from web3_mpy.address import Address, to_checksum_address as _to_checksum_address
+from web3_mpy.codec import int_from_bytes, int_to_min_bytes
 
 def apply_to_return_value(func):
     """
@@ -43,8 +45,10 @@ def to_wei(value, unit="ether"):
 def is_address(value):
     """
     Verifica si 'value' es una dirección Ethereum válida.
-    Se espera una cadena que comience con "0x" y tenga 42 caracteres.
+    Se espera una cadena que comience con "0x" y tenga 42 caracteres, o un Address.
     """
+    if isinstance(value, Address):
+        return True
     if not isinstance(value, str):
         return False
     if not value.startswith("0x") or len(value) != 42:
@@ -58,17 +62,12 @@ def is_address(value):
 def to_checksum_address(value):
     """
     Convierte una dirección a su formato checksum (EIP-55).
-    Se asume que se recibe en formato hexadecimal.
+    Se asume que se recibe en formato hexadecimal (o como Address).
+    La implementación es la de web3_mpy.address, que cachea el resultado.
     """
     if not is_address(value):
         raise ValueError("Dirección Ethereum inválida")
-    lower_address = remove_0x_prefix(value).lower()
-    address_hash = encode_hex(keccak_256(lower_address.encode("ascii")))
-    checksum_address = "0x" + "".join(
-        lower_address[i].upper() if int(address_hash[i], 16) >= 8 else lower_address[i]
-        for i in range(40)
-    )
-    return checksum_address
+    return _to_checksum_address(value)
 
 def is_checksum_address(value):
     """
@@ -91,8 +90,7 @@ def to_bytes(value, encoding="utf-8"):
     elif isinstance(value, str):
         return value.encode(encoding)
     elif isinstance(value, int):
-        length = (value.bit_length() + 7) // 8 or 1
-        return value.to_bytes(length, "big")
+        return int_to_min_bytes(value) or b"\x00"
     else:
         raise TypeError("Tipo no soportado para to_bytes")
 
@@ -109,7 +107,7 @@ def to_int(value, base=16):
             return int(value, 16)
         return int(value, base)
     if isinstance(value, bytes):
-        return int.from_bytes(value, "big")
+        return int_from_bytes(value)
     raise TypeError("Tipo no soportado para to_int")
 
 def to_text(value, encoding="utf-8"):
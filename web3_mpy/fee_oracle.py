@@ -0,0 +1,169 @@
+# main/web3_mpy/fee_oracle.py
+#
+# Oráculo de comisiones basado en eth_feeHistory.
+# Se consulta como mucho una vez por bloque, se guarda una ventana pequeña de
+# bloques recientes (baseFee y percentiles de la propina) y las sugerencias se
+# calculan desde memoria. Se conecta como estrategia de gas de BaseEth:
+#
+#   oracle = FeeOracle(w3)
+#   w3.eth.set_gas_price_strategy(oracle)
+#   w3.eth.account.gas_price          # Sin petición si el bloque no cambió
+#   oracle.suggest("fast")            # {"gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"}
+#
+# Con un BlockFollower (w3.eth.follow_blocks()) el oráculo sabe cuándo hay bloque
+# nuevo sin preguntar al nodo; sin él, los datos se consideran vigentes durante
+# 'max_age_s' segundos.
+
+import time
+
+# Nivel de urgencia -> índice en 'percentiles'
+URGENCY = {"slow": 0, "standard": 1, "fast": 2}
+
+
+class FeeOracle:
+    def __init__(self, web3, percentiles=(10, 50, 90), window=10, max_age_s=12,
+                 base_fee_multiplier=2, min_priority_fee=10 ** 8):
+        """
+        :param web3: Instancia de Web3.
+        :param percentiles: Percentiles de propina pedidos a eth_feeHistory (uno por urgencia).
+        :param window: Bloques que se guardan en la ventana.
+        :param max_age_s: Vigencia de los datos si no hay BlockFollower.
+        :param base_fee_multiplier: maxFeePerGas = baseFee * multiplicador + propina.
+        :param min_priority_fee: Propina mínima sugerida (wei).
+        """
+        self.web3 = web3
+        self.percentiles = list(percentiles)
+        self.window = window
+        self.max_age_s = max_age_s
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+        self.blocks = []            # [(número, baseFee, (propina por percentil...))], la más antigua primero
+        self.next_base_fee = None   # baseFee del siguiente bloque (último valor de eth_feeHistory)
+        self.last_block = None      # Último bloque guardado en la ventana
+        self.follower = None
+        self.head = None            # Cabeza según el BlockFollower (None sin follower)
+        self.sampled_head = None    # Cabeza del follower en la última consulta
+        self.sampled_at = None
+        self.legacy_gas_price = None   # Red sin EIP-1559: eth_gasPrice cacheado
+        self.requests = 0
+        self._attach()
+
+    def _attach(self):
+        # Se registra en el BlockFollower aunque follow_blocks() se llame después de crear el oráculo
+        if self.follower is None:
+            follower = getattr(self.web3.eth, "block_follower", None)
+            if follower is not None:
+                self.follower = follower
+                follower.add_listener(self)
+
+    def notify_block(self, block_number):
+        self.head = block_number
+
+    def on_reorg(self, fork_block, depth):
+        # Los bloques reorganizados se vuelven a pedir en el siguiente refresh
+        self.blocks = [b for b in self.blocks if b[0] < fork_block]
+        if self.last_block is not None and self.last_block >= fork_block:
+            self.last_block = fork_block - 1
+        self.sampled_head = None
+
+    def _is_stale(self):
+        if self.sampled_at is None:
+            return True
+        if self.follower is not None and self.head is not None:
+            return self.sampled_head is None or self.head > self.sampled_head
+        # Sin follower: los datos valen 'max_age_s' segundos
+        return time.time() - self.sampled_at >= self.max_age_s
+
+    def refresh(self, force=False):
+        """
+        Actualiza la ventana con eth_feeHistory (solo los bloques nuevos) si los datos caducaron.
+        """
+        self._attach()
+        if not force and not self._is_stale():
+            return
+        count = self.window
+        if self.follower is not None and self.head is not None and self.last_block is not None:
+            count = max(1, min(self.window, self.head - self.last_block))
+        self.requests += 1
+        response = self.web3.provider.make_request(
+            "eth_feeHistory", [hex(count), "latest", self.percentiles])
+        result = response.get("result")
+        self.sampled_at = time.time()
+        self.sampled_head = self.head
+        if not result or not result.get("baseFeePerGas") or "error" in response:
+            # Sin EIP-1559: precio único con eth_gasPrice
+            self.requests += 1
+            gas_price = self.web3.provider.make_request("eth_gasPrice", []).get("result")
+            self.legacy_gas_price = int(gas_price, 16) if gas_price else None
+            return
+        oldest = int(result["oldestBlock"], 16)
+        base_fees = result["baseFeePerGas"]
+        rewards = result.get("reward") or []
+        for i in range(len(base_fees) - 1):
+            number = oldest + i
+            if self.last_block is not None and number <= self.last_block:
+                continue
+            tips = tuple(int(r, 16) for r in rewards[i]) if i < len(rewards) else ()
+            self.blocks.append((number, int(base_fees[i], 16), tips))
+        if len(self.blocks) > self.window:
+            self.blocks = self.blocks[-self.window:]
+        self.next_base_fee = int(base_fees[-1], 16)
+        self.last_block = oldest + len(base_fees) - 2
+
+    def priority_fee(self, urgency="standard"):
+        """
+        Mediana en la ventana de la propina del percentil asociado a 'urgency'.
+        """
+        index = self._index(urgency)
+        self.refresh()
+        return self._tip(index)
+
+    def _tip(self, index):
+        tips = sorted(b[2][index] for b in self.blocks if len(b[2]) > index)
+        if not tips:
+            return self.min_priority_fee
+        return max(self.min_priority_fee, tips[len(tips) // 2])
+
+    def _index(self, urgency):
+        index = urgency if isinstance(urgency, int) else URGENCY.get(urgency)
+        if index is None or not 0 <= index < len(self.percentiles):
+            raise ValueError("Urgencia desconocida: {!r} (usa {})".format(
+                urgency, ", ".join(sorted(URGENCY))))
+        return index
+
+    def suggest(self, urgency="standard"):
+        """
+        Retorna {"gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"} en wei.
+        """
+        index = self._index(urgency)
+        self.refresh()
+        if self.next_base_fee is None:
+            price = self.legacy_gas_price or 0
+            return {"gasPrice": price, "maxFeePerGas": price, "maxPriorityFeePerGas": price}
+        tip = self._tip(index)
+        return {
+            "gasPrice": self.next_base_fee + tip,
+            "maxFeePerGas": self.next_base_fee * self.base_fee_multiplier + tip,
+            "maxPriorityFeePerGas": tip,
+        }
+
+    def gas_price(self, urgency="standard"):
+        return self.suggest(urgency)["gasPrice"]
+
+    def __call__(self, web3, transaction_params=None):
+        """
+        Estrategia para BaseEth.set_gas_price_strategy. 'transaction_params' puede
+        indicar {"urgency": "slow" | "standard" | "fast"}.
+        """
+        urgency = "standard"
+        if transaction_params and "urgency" in transaction_params:
+            urgency = transaction_params["urgency"]
+        return self.gas_price(urgency)
+
+    def stats(self):
+        return {
+            "blocks": len(self.blocks),
+            "last_block": self.last_block,
+            "next_base_fee": self.next_base_fee,
+            "requests": self.requests,
+        }
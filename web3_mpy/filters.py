@@ -0,0 +1,198 @@
+# main/web3_mpy/filters.py
+#
+# Filtros del nodo (eth_newFilter / eth_newBlockFilter) con sondeo incremental:
+# eth_getFilterChanges solo devuelve lo nuevo desde el sondeo anterior, sin
+# volver a pedir el rango completo. Si el nodo olvida el filtro (los nodos los
+# descartan tras unos minutos sin sondeo) se vuelve a crear, recuperando con
+# eth_getLogs los bloques intermedios. Si el nodo no soporta filtros (muchos
+# endpoints públicos), se emula con eth_getLogs por rangos de bloques.
+#
+# Uso:
+#   f = w3.eth.filter({"address": token_address, "topics": [transfer_topic]})
+#   while True:
+#       for log in f.get_new_entries():
+#           print(log)
+#       time.sleep(12)
+
+LOG = "logs"
+BLOCK = "block"
+PENDING = "pending"
+
+_NOT_FOUND = ("filter not found", "not found", "unknown filter", "does not exist")
+
+
+def _error_message(response):
+    error = response.get("error") or {}
+    return str(error.get("message", "")).lower()
+
+
+def _is_filter_missing(response):
+    message = _error_message(response)
+    for fragment in _NOT_FOUND:
+        if fragment in message:
+            return True
+    return False
+
+
+class Filter:
+    def __init__(self, web3, filter_params, filter_id=None, max_blocks=16):
+        """
+        :param web3: Instancia de Web3.
+        :param filter_params: Diccionario de eth_getLogs, "latest" (bloques nuevos) o "pending".
+                              None solo junto a 'filter_id': filtro de parámetros desconocidos,
+                              que no se puede recrear si el nodo lo descarta.
+        :param filter_id: Id de un filtro ya creado en el nodo (no se crea otro).
+        :param max_blocks: Bloques máximos recorridos por sondeo al emular un filtro de bloques.
+        """
+        self.web3 = web3
+        if filter_params is None and filter_id is None:
+            raise ValueError("Filter necesita filter_params o filter_id")
+        self.filter_params = filter_params
+        if filter_params is None:
+            self.kind = None      # Filtro ajeno: se sondea, pero no se sabe recrear
+        elif isinstance(filter_params, dict):
+            self.kind = LOG
+        elif filter_params == "pending":
+            self.kind = PENDING
+        else:
+            self.kind = BLOCK
+        self.max_blocks = max_blocks
+        self.filter_id = filter_id
+        self.native = True        # False: emulado con eth_getLogs / eth_getBlockByNumber
+        self.last_block = None    # Último bloque visto (para recuperar o emular)
+        self.recreated = 0
+        if filter_id is None:
+            self._install()
+
+    def _request(self, method, params):
+        return self.web3.provider.make_request(method, params)
+
+    def _head(self):
+        return int(self._request("eth_blockNumber", [])["result"], 16)
+
+    def _install(self):
+        if self.kind == LOG:
+            response = self._request("eth_newFilter", [self.filter_params])
+        elif self.kind == BLOCK:
+            response = self._request("eth_newBlockFilter", [])
+        else:
+            response = self._request("eth_newPendingTransactionFilter", [])
+        if "error" in response or response.get("result") is None:
+            if self.kind == PENDING:
+                raise Exception("El nodo no soporta filtros de transacciones pendientes: " + _error_message(response))
+            # Sin filtros en el nodo: se emula desde el bloque actual (o desde fromBlock si es un número)
+            self.native = False
+            self.filter_id = None
+            start = self.filter_params.get("fromBlock") if self.kind == LOG else None
+            if isinstance(start, str) and start.startswith("0x"):
+                self.last_block = int(start, 16) - 1
+            elif isinstance(start, int):
+                self.last_block = start - 1
+            else:
+                self.last_block = self._head()
+            return
+        self.filter_id = response["result"]
+        if self.last_block is None:
+            self.last_block = self._head()
+
+    def _range_logs(self, from_block, to_block):
+        params = dict(self.filter_params)
+        params["fromBlock"] = hex(from_block)
+        params["toBlock"] = hex(to_block)
+        response = self._request("eth_getLogs", [params])
+        if "error" in response:
+            raise Exception("Error en eth_getLogs: " + _error_message(response))
+        return response.get("result") or []
+
+    def _track(self, entries):
+        if self.kind == LOG:
+            for log in entries:
+                number = log.get("blockNumber")
+                if number is not None:
+                    number = int(number, 16)
+                    if self.last_block is None or number > self.last_block:
+                        self.last_block = number
+
+    def _emulated_changes(self):
+        head = self._head()
+        if head <= self.last_block:
+            return []
+        start = self.last_block + 1
+        if self.kind == LOG:
+            entries = self._range_logs(start, head)
+        else:
+            start = max(start, head - self.max_blocks + 1)
+            entries = []
+            for number in range(start, head + 1):
+                block = self._request("eth_getBlockByNumber", [hex(number), False]).get("result")
+                if block is not None:
+                    entries.append(block["hash"])
+        self.last_block = head
+        return entries
+
+    def get_new_entries(self):
+        """
+        Retorna lo nuevo desde el sondeo anterior: logs (filtro de logs) o hashes
+        de bloque/transacción (filtros "latest"/"pending").
+        """
+        if not self.native:
+            return self._emulated_changes()
+        response = self._request("eth_getFilterChanges", [self.filter_id])
+        if "error" in response:
+            if not _is_filter_missing(response):
+                raise Exception("Error en eth_getFilterChanges: " + _error_message(response))
+            return self._recreate()
+        entries = response.get("result") or []
+        self._track(entries)
+        return entries
+
+    def _recreate(self):
+        """
+        El nodo descartó el filtro: se crea de nuevo y, para filtros de logs, se recuperan
+        con eth_getLogs los bloques transcurridos desde el último visto.
+        """
+        if self.kind is None:
+            # Recrearlo con parámetros inventados (eth_newFilter({})) devolvería todos los logs de la red
+            raise Exception("El nodo descartó el filtro {} y no se conocen sus parámetros para recrearlo; "
+                            "crea el Filter con filter_params".format(self.filter_id))
+        self.recreated += 1
+        since = self.last_block
+        head = self._head()   # Se lee antes de crear el filtro: lo posterior lo reporta el filtro nuevo
+        self.filter_id = None
+        self._install()
+        if self.kind != LOG or since is None:
+            return [] if self.native else self._emulated_changes()
+        if not self.native:
+            self.last_block = since
+            return self._emulated_changes()
+        self.last_block = head
+        if head <= since:
+            return []
+        return self._range_logs(since + 1, head)
+
+    def get_all_entries(self):
+        """
+        Retorna todos los logs que cumplen el filtro (eth_getFilterLogs o eth_getLogs).
+        """
+        if self.kind not in (LOG, None):
+            raise Exception("get_all_entries solo está disponible para filtros de logs")
+        if self.native:
+            response = self._request("eth_getFilterLogs", [self.filter_id])
+            if "error" not in response:
+                return response.get("result") or []
+            if self.kind is None:
+                raise Exception("Error en eth_getFilterLogs: " + _error_message(response))
+        response = self._request("eth_getLogs", [self.filter_params])
+        if "error" in response:
+            raise Exception("Error en eth_getLogs: " + _error_message(response))
+        return response.get("result") or []
+
+    def uninstall(self):
+        """
+        Elimina el filtro del nodo. Retorna True si el nodo lo confirmó.
+        """
+        if not self.native or self.filter_id is None:
+            return True
+        response = self._request("eth_uninstallFilter", [self.filter_id])
+        self.filter_id = None
+        return bool(response.get("result"))
@@ -0,0 +1,130 @@
+# main/web3_mpy/gas.py
+#
+# Caché de estimaciones de gas por "forma" de la llamada.
+# Dos transferencias al mismo contrato con el mismo selector, con o sin valor y
+# con la misma longitud de datos estiman prácticamente lo mismo, así que la
+# estimación se reutiliza y se ahorra un eth_estimateGas por transacción.
+# Se vuelve a estimar si no hay entrada, si la transacción se quedó sin gas o
+# cuando la estimación tiene más de 'max_age_blocks' bloques (o 'max_age_s' segundos).
+
+import time
+from web3_mpy.codec import as_bytes, to_hex
+
+try:
+    from ucollections import OrderedDict
+except ImportError:
+    from collections import OrderedDict
+
+
+def _to_int(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return value
+
+
+def shape_key(transaction_object):
+    """
+    Clave (to, selector, valor > 0, palabras de datos) de una transacción/llamada.
+    """
+    data = transaction_object.get("data") or "0x"
+    if isinstance(data, str):
+        hexdata = data[2:] if data.startswith("0x") else data
+        size = len(hexdata) // 2
+        selector = hexdata[:8].lower()
+    else:
+        # bytes, bytearray o memoryview
+        size = len(data)
+        selector = bytes(data[:4]).hex()
+    words = (size - 4 + 31) // 32 if size > 4 else 0
+    to = transaction_object.get("to") or ""
+    to = to.lower() if isinstance(to, str) else to_hex(as_bytes(to))   # Cadena, Address o bytes
+    value = 1 if _to_int(transaction_object.get("value")) > 0 else 0
+    return "{}|{}|{}|{}".format(to, selector, value, words)
+
+
+class GasEstimateCache:
+    """
+    Estimaciones de gas recientes por forma de llamada (ver shape_key).
+    Las estimaciones se guardan sin margen; gas_limit() aplica el multiplicador.
+    """
+
+    def __init__(self, multiplier=1.2, max_age_blocks=100, max_age_s=1200, max_entries=16):
+        """
+        :param multiplier: Margen de seguridad aplicado a la estimación (1.2 = +20%).
+        :param max_age_blocks: Bloques tras los que se vuelve a estimar (si se conoce el bloque).
+        :param max_age_s: Segundos tras los que se vuelve a estimar.
+        :param max_entries: Número máximo de formas guardadas (LRU).
+        """
+        self.multiplier = multiplier
+        self.max_age_blocks = max_age_blocks
+        self.max_age_s = max_age_s
+        self.max_entries = max_entries
+        self.block_number = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # clave -> (estimación, bloque, instante)
+
+    def notify_block(self, block_number):
+        self.block_number = block_number
+
+    def get(self, transaction_object):
+        """
+        Retorna la estimación (sin margen) para la forma de la transacción, o None.
+        """
+        key = shape_key(transaction_object)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            estimate, block, stamp = entry
+            expired = time.time() - stamp >= self.max_age_s
+            if (not expired and block is not None and self.block_number is not None
+                    and self.block_number - block >= self.max_age_blocks):
+                expired = True
+            if not expired:
+                self._entries[key] = entry
+                self.hits += 1
+                return estimate
+        self.misses += 1
+        return None
+
+    def put(self, transaction_object, estimate):
+        key = shape_key(transaction_object)
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (estimate, self.block_number, time.time())
+
+    def invalidate(self, transaction_object):
+        """
+        Descarta la estimación de esa forma (por ejemplo, tras un "out of gas").
+        """
+        self._entries.pop(shape_key(transaction_object), None)
+
+    def check_receipt(self, transaction_object, receipt, gas_limit):
+        """
+        Si el recibo indica que la transacción falló consumiendo todo su gas,
+        invalida la estimación de su forma. Retorna True en ese caso.
+        """
+        if not receipt or _to_int(receipt.get("status")) != 0:
+            return False
+        if _to_int(receipt.get("gasUsed")) < gas_limit:
+            return False
+        self.invalidate(transaction_object)
+        return True
+
+    def gas_limit(self, estimate):
+        return int(estimate * self.multiplier)
+
+    def clear(self):
+        self._entries = OrderedDict()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "entries": len(self._entries),
+            "block_number": self.block_number,
+        }
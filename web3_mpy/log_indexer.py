@@ -0,0 +1,276 @@
+# main/web3_mpy/log_indexer.py
+#
+# Indexador de logs reanudable sobre eth_getLogs.
+# - Recorre el rango de bloques por tramos: el tramo crece cuando las respuestas
+#   son pequeñas y se divide a la mitad si el nodo responde "too many results",
+#   "range too large" o que la consulta excedió su tiempo.
+# - Los rate limits (429, "too many requests") y los fallos de transporte no
+#   reducen el tramo: se reintenta el mismo rango con espera exponencial.
+# - Cada log se decodifica y se entrega a un callback, tramo a tramo, sin
+#   acumular el rango completo en el heap.
+# - Guarda en flash el último bloque procesado por completo (checkpoint), de modo
+#   que tras un reinicio del dispositivo continúa donde lo dejó.
+#
+# Uso:
+#   indexer = LogIndexer(w3, token.events.Transfer.filter_params(), on_log,
+#                        from_block=5000000, events=token.events,
+#                        checkpoint_path="/transfers.ckpt")
+#   indexer.run()              # hasta la cabeza de la cadena
+
+import os
+from web3_mpy.clock import sleep_ms
+
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+# Fragmentos de los mensajes de error con los que los nodos rechazan un rango
+_RANGE_ERRORS = (
+    "more than",            # "query returned more than 10000 results"
+    "too many results",
+    "too many blocks",
+    "too many logs",
+    "block range",          # "block range is too large", "exceed maximum block range"
+    "range too large",
+    "response size",        # "Log response size exceeded"
+    "query timeout",        # El nodo cortó la consulta por tiempo
+    "timed out",
+)
+
+# Saturación del nodo: se reintenta el mismo rango tras esperar
+_RATE_LIMIT_ERRORS = ("rate limit", "too many requests", "request limit", "capacity")
+_RATE_LIMIT_CODES = (429, -32029)
+
+
+class LogRangeError(Exception):
+    pass
+
+
+class _RetryableError(Exception):
+    # Rate limit o fallo de transporte: no depende del tamaño del tramo
+    pass
+
+
+def is_range_error(message):
+    """
+    True si el mensaje de error indica que el tramo pedido es demasiado grande.
+    """
+    message = str(message).lower()
+    if is_rate_limit(message):
+        return False
+    for fragment in _RANGE_ERRORS:
+        if fragment in message:
+            return True
+    return False
+
+
+def is_rate_limit(message, code=None):
+    """
+    True si el error indica rate limiting del nodo (código 429/-32029 o el mensaje).
+    """
+    if code in _RATE_LIMIT_CODES:
+        return True
+    message = str(message).lower()
+    for fragment in _RATE_LIMIT_ERRORS:
+        if fragment in message:
+            return True
+    return False
+
+
+class LogIndexer:
+    def __init__(self, web3, filter_params, callback, from_block=0, events=None,
+                 chunk=1000, min_chunk=1, max_chunk=10000, grow_below=200,
+                 checkpoint_path=None, confirmations=0, follower=None,
+                 max_retries=5, backoff_ms=500, max_backoff_ms=8000):
+        """
+        :param web3: Instancia de Web3.
+        :param filter_params: Filtro de eth_getLogs ("address", "topics"); fromBlock/toBlock se ignoran.
+        :param callback: callback(log) por cada log (decodificado si se indica 'events').
+        :param from_block: Primer bloque a indexar si no hay checkpoint.
+        :param events: ContractEvents (contract.events) para decodificar los logs.
+        :param chunk: Tamaño inicial del tramo en bloques.
+        :param min_chunk: Tramo mínimo; si el nodo rechaza incluso este, se lanza LogRangeError.
+        :param max_chunk: Tramo máximo.
+        :param grow_below: Si un tramo devuelve menos logs que esto, el siguiente se duplica.
+        :param checkpoint_path: Archivo en flash para el checkpoint (None lo desactiva).
+        :param confirmations: Bloques de margen bajo la cabeza para no indexar bloques que puedan reorganizarse.
+        :param follower: BlockFollower opcional. Los tramos cuyas cabeceras están en su buffer
+                         y cuyo logsBloom descarta el filtro se saltan sin llamar a eth_getLogs.
+        :param max_retries: Reintentos seguidos de un tramo ante rate limit o fallo de transporte.
+        :param backoff_ms: Espera antes del primer reintento; se duplica en cada uno.
+        :param max_backoff_ms: Espera máxima entre reintentos.
+        """
+        self.web3 = web3
+        self.filter_params = {k: v for k, v in filter_params.items() if k not in ("fromBlock", "toBlock")}
+        self.callback = callback
+        self.events = events
+        self.chunk = chunk
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.grow_below = grow_below
+        self.checkpoint_path = checkpoint_path
+        self.confirmations = confirmations
+        self.filter_key = self._filter_key()
+        checkpoint = self.load_checkpoint()
+        self.next_block = checkpoint + 1 if checkpoint is not None else from_block
+        self.logs = 0
+        self.requests = 0
+        self.splits = 0
+        self.retries = 0
+        self.max_retries = max_retries
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.follower = follower
+        self.bloom_skips = 0
+        if follower is not None:
+            from web3_mpy.bloom import BloomMatcher
+            self.bloom = BloomMatcher.from_filter(self.filter_params)
+
+    def _filter_key(self):
+        # Identifica el filtro en el checkpoint para no reanudar con otro distinto
+        text = repr(sorted(self.filter_params.items()))
+        return "{:08x}".format(binascii.crc32(text.encode()) & 0xFFFFFFFF)
+
+    def load_checkpoint(self):
+        """
+        Retorna el último bloque procesado guardado en flash para este filtro, o None.
+        """
+        if not self.checkpoint_path:
+            return None
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                key, block = f.read().strip().split(":")
+        except (OSError, ValueError):
+            return None
+        if key != self.filter_key:
+            return None
+        return int(block)
+
+    def save_checkpoint(self, block):
+        """
+        Escribe el checkpoint en un archivo temporal y lo renombra, para que un corte
+        de alimentación no deje un checkpoint a medias.
+        """
+        if not self.checkpoint_path:
+            return
+        tmp = self.checkpoint_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write("{}:{}".format(self.filter_key, block))
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError:
+                pass
+            os.rename(tmp, self.checkpoint_path)
+        except OSError:
+            pass  # Flash no disponible: se sigue indexando sin checkpoint
+
+    def head(self):
+        response = self.web3.provider.make_request("eth_blockNumber", [])
+        return int(response["result"], 16) - self.confirmations
+
+    def _get_logs(self, start, end):
+        params = dict(self.filter_params)
+        params["fromBlock"] = hex(start)
+        params["toBlock"] = hex(end)
+        self.requests += 1
+        try:
+            response = self.web3.provider.make_request("eth_getLogs", [params])
+        except Exception as e:
+            # Errores de transporte (socket, timeout HTTP, MultiProvider sin endpoints): se reintenta
+            raise _RetryableError(str(e))
+        if "error" in response:
+            error = response["error"]
+            message = str(error.get("message", ""))
+            if is_range_error(message):
+                raise LogRangeError(message)
+            if is_rate_limit(message, error.get("code")) or error.get("code") == -32005:
+                # -32005 también lo usan algunos nodos para "demasiados resultados" (ya tratado arriba)
+                raise _RetryableError(message)
+            raise Exception("Error en eth_getLogs: " + message)
+        return response.get("result") or []
+
+    def _bloom_skip(self, start, end):
+        """
+        True si todas las cabeceras del tramo están en el BlockFollower y ningún
+        logsBloom puede contener logs del filtro.
+        """
+        if self.follower is None:
+            return False
+        ring = self.follower.ring
+        for number in range(start, end + 1):
+            header = ring.get(number)
+            if header is None or self.bloom.matches(header[5]):
+                return False
+        return True
+
+    def step(self, to_block):
+        """
+        Procesa un tramo a partir de next_block (sin pasar de 'to_block').
+        Retorna el número de logs entregados, o None si ya no quedan bloques.
+        """
+        start = self.next_block
+        if start > to_block:
+            return None
+        attempts = 0
+        while True:
+            end = min(start + self.chunk - 1, to_block)
+            if self._bloom_skip(start, end):
+                logs = []
+                self.bloom_skips += 1
+                break
+            try:
+                logs = self._get_logs(start, end)
+                break
+            except LogRangeError:
+                if self.chunk <= self.min_chunk:
+                    raise
+                self.chunk = max(self.min_chunk, self.chunk // 2)
+                self.splits += 1
+            except _RetryableError as e:
+                attempts += 1
+                if attempts > self.max_retries:
+                    raise Exception("Error en eth_getLogs tras {} reintentos: {}".format(self.max_retries, e))
+                self.retries += 1
+                sleep_ms(min(self.max_backoff_ms, self.backoff_ms << (attempts - 1)))
+        callback = self.callback
+        if self.events is not None:
+            for log in self.events.iter_decode_logs(logs):
+                callback(log)
+        else:
+            for log in logs:
+                callback(log)
+        count = len(logs)
+        del logs
+        self.logs += count
+        self.next_block = end + 1
+        self.save_checkpoint(end)
+        if count < self.grow_below and end - start + 1 == self.chunk:
+            self.chunk = min(self.max_chunk, self.chunk * 2)
+        return count
+
+    def run(self, to_block=None, max_steps=None):
+        """
+        Indexa hasta 'to_block' (por defecto, la cabeza menos 'confirmations').
+        Retorna el último bloque procesado.
+        """
+        if to_block is None:
+            to_block = self.head()
+        steps = 0
+        while self.step(to_block) is not None:
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                break
+        return self.next_block - 1
+
+    def stats(self):
+        return {
+            "next_block": self.next_block,
+            "chunk": self.chunk,
+            "logs": self.logs,
+            "requests": self.requests,
+            "splits": self.splits,
+            "retries": self.retries,
+            "bloom_skips": self.bloom_skips,
+        }
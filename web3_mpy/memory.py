@@ -0,0 +1,120 @@
+# main/web3_mpy/memory.py
+#
+# Política de recolección de basura adaptativa.
+# En lugar de llamar a gc.collect() antes de cada petición, solo se recolecta
+# cuando la memoria libre baja de un umbral o antes de una asignación grande
+# conocida (respuesta JSON grande, firma ECDSA).
+
+import gc
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+# Reservas orientativas (bytes) para las asignaciones grandes conocidas
+RESPONSE_RESERVE = 4096
+SIGN_RESERVE = 8192
+
+
+def mem_free():
+    """
+    Retorna los bytes libres del heap, o None si el intérprete no lo expone (CPython).
+    """
+    if hasattr(gc, "mem_free"):
+        return gc.mem_free()
+    return None
+
+
+class MemoryPolicy:
+    """
+    Decide cuándo ejecutar gc.collect() y lleva la cuenta de lo que cuesta.
+    """
+
+    def __init__(self, min_free=16384, auto_threshold=True):
+        """
+        :param min_free: Bytes libres por debajo de los cuales se recolecta.
+        :param auto_threshold: Configura gc.threshold() (si existe) para que el propio
+                               intérprete recolecte tras asignar ~1/4 del heap libre.
+        """
+        self.min_free = min_free
+        self.checks = 0
+        self.collections = 0
+        self.total_ms = 0
+        self.max_ms = 0
+        if auto_threshold:
+            self.configure_threshold()
+
+    def configure_threshold(self, amount=None):
+        """
+        Ajusta gc.threshold(). Sin 'amount' usa la recomendación de MicroPython:
+        mem_free() // 4 + mem_alloc(). Retorna True si se pudo configurar.
+        """
+        if not hasattr(gc, "threshold") or not hasattr(gc, "mem_alloc"):
+            return False
+        if amount is None:
+            amount = gc.mem_free() // 4 + gc.mem_alloc()
+        gc.threshold(amount)
+        return True
+
+    def collect(self):
+        """
+        Ejecuta una recolección completa y registra su duración.
+        """
+        start = ticks_ms()
+        gc.collect()
+        ms = elapsed_ms(start)
+        self.collections += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def maybe_collect(self, needed=0):
+        """
+        Recolecta solo si tras reservar 'needed' bytes quedarían menos de min_free.
+        Retorna True si se recolectó.
+        """
+        self.checks += 1
+        free = mem_free()
+        if free is None:
+            return False  # CPython gestiona su propia memoria
+        if free - needed < self.min_free:
+            self.collect()
+            return True
+        return False
+
+    def before_large_alloc(self, size):
+        """
+        Llamar antes de una asignación grande conocida (respuesta grande, firma...).
+        """
+        return self.maybe_collect(size)
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "collections": self.collections,
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+            "avg_ms": (self.total_ms / self.collections) if self.collections else 0,
+            "mem_free": mem_free(),
+        }
+
+
+# Política global usada por la librería
+default_policy = MemoryPolicy()
+
+
+def set_policy(policy):
+    """
+    Sustituye la política global (por ejemplo, con otro min_free).
+    """
+    global default_policy
+    default_policy = policy
+
+
+def maybe_collect(needed=0):
+    return default_policy.maybe_collect(needed)
+
+
+def before_large_alloc(size):
+    return default_policy.before_large_alloc(size)
+
+
+def stats():
+    return default_policy.stats()
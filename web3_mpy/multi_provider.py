@@ -0,0 +1,338 @@
+# main/web3_mpy/multi_provider.py
+#
+# Proveedor con varios endpoints:
+# - Puntuación por latencia EWMA y tasa de error de cada endpoint.
+# - Failover automático al siguiente endpoint ante errores o rate limiting.
+# - Lecturas "hedged" opcionales: si el mejor endpoint tarda más que su percentil
+#   de latencia, se lanza un duplicado a otro endpoint y se usa la primera respuesta.
+#   Un hilo de _thread no se puede cancelar: el perdedor sigue hasta que su petición
+#   termina (o vence el timeout de socket), ocupando un socket y la pila del hilo.
+#   'max_in_flight' acota cuántos hilos de petición hay vivos a la vez; sin hueco,
+#   la lectura se hace sin duplicar, en el hilo que llama.
+
+from web3_mpy.clock import ticks_ms, elapsed_ms, sleep_ms
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+# Métodos de solo lectura que se pueden duplicar sin efectos secundarios
+READ_ONLY_METHODS = (
+    "eth_blockNumber", "eth_call", "eth_chainId", "eth_estimateGas", "eth_feeHistory",
+    "eth_gasPrice", "eth_getBalance", "eth_getBlockByHash", "eth_getBlockByNumber",
+    "eth_getBlockReceipts", "eth_getCode", "eth_getLogs", "eth_getStorageAt",
+    "eth_getTransactionByHash", "eth_getTransactionCount", "eth_getTransactionReceipt",
+    "eth_blobBaseFee", "net_version", "web3_clientVersion",
+)
+
+# Métodos que nunca se reintentan en otro endpoint (el nodo firma o guarda estado).
+# eth_sendRawTransaction sí puede reenviarse: los bytes firmados son idempotentes
+# (mismo hash de transacción), pero nunca se duplica en paralelo.
+NON_IDEMPOTENT_METHODS = (
+    "eth_sendTransaction", "eth_sign", "eth_newFilter", "eth_newBlockFilter",
+    "eth_newPendingTransactionFilter", "eth_uninstallFilter",
+)
+
+# Códigos JSON‑RPC que indican saturación del endpoint y no un error de la llamada
+_RATE_LIMIT_CODES = (-32005, -32029, 429)
+
+
+class EndpointError(Exception):
+    pass
+
+
+def _is_endpoint_error(response):
+    """
+    Retorna True si la respuesta indica un problema del endpoint (rate limit, etc.)
+    en lugar de un error legítimo de la llamada (por ejemplo, "execution reverted").
+    """
+    error = response.get("error") if isinstance(response, dict) else None
+    if not error:
+        return False
+    if error.get("code") in _RATE_LIMIT_CODES:
+        return True
+    message = str(error.get("message", "")).lower()
+    return "rate limit" in message or "too many requests" in message
+
+
+class Endpoint:
+    """
+    Estado y estadísticas de un endpoint.
+    """
+
+    def __init__(self, provider, alpha=0.2, window=16):
+        self.provider = provider
+        self.name = getattr(provider, "endpoint_uri", repr(provider))
+        self.alpha = alpha
+        self.ewma_ms = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedges_won = 0
+        # Ventana circular de latencias recientes para el percentil
+        self._samples = [0] * window
+        self._count = 0
+
+    def record_success(self, ms):
+        self.requests += 1
+        if self.ewma_ms is None:
+            self.ewma_ms = ms
+        else:
+            self.ewma_ms += self.alpha * (ms - self.ewma_ms)
+        self.error_rate -= self.alpha * self.error_rate
+        self._samples[self._count % len(self._samples)] = ms
+        self._count += 1
+
+    def record_error(self, ms):
+        self.requests += 1
+        self.errors += 1
+        # Un error cuenta también como latencia alta para la EWMA
+        if self.ewma_ms is None:
+            self.ewma_ms = ms
+        else:
+            self.ewma_ms += self.alpha * (max(ms, self.ewma_ms) - self.ewma_ms)
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+
+    def percentile(self, p):
+        """
+        Retorna el percentil 'p' (0..1) de las latencias recientes, o None sin muestras.
+        """
+        n = min(self._count, len(self._samples))
+        if n == 0:
+            return None
+        ordered = sorted(self._samples[:n])
+        return ordered[int(p * (n - 1))]
+
+    def score(self, error_penalty_ms):
+        """
+        Puntuación del endpoint (menor es mejor). Los endpoints sin muestras
+        puntúan 0 para que se prueben al menos una vez.
+        """
+        if self.ewma_ms is None:
+            return 0
+        return self.ewma_ms + self.error_rate * error_penalty_ms
+
+    def stats(self):
+        return {
+            "endpoint": self.name,
+            "ewma_ms": self.ewma_ms,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges_won": self.hedges_won,
+            "p90_ms": self.percentile(0.9),
+        }
+
+
+class _Race:
+    """
+    Estado compartido entre los hilos de una lectura hedged.
+    """
+
+    def __init__(self):
+        self.lock = _thread.allocate_lock()
+        self.response = None
+        self.winner = None
+        self.finished = 0
+
+
+class MultiProvider:
+    """
+    Proveedor que reparte las peticiones entre varios endpoints.
+
+    Ejemplo:
+        provider = MultiProvider([
+            "https://mainnet.infura.io/v3/Token_infura",
+            "https://eth.llamarpc.com",
+        ], hedge=True)
+        w3 = Web3(provider)
+    """
+
+    def __init__(self, endpoints, hedge=False, hedge_percentile=0.9, hedge_min_ms=50,
+                 hedge_timeout_ms=15000, error_penalty_ms=5000, alpha=0.2, timeout=None,
+                 max_in_flight=2):
+        """
+        :param endpoints: Lista de URLs o de proveedores con make_request(method, params).
+        :param hedge: Activa las lecturas hedged (requiere _thread).
+        :param hedge_percentile: Percentil de latencia del mejor endpoint a partir del cual
+                                 se lanza el duplicado.
+        :param hedge_min_ms: Retardo mínimo antes de lanzar el duplicado.
+        :param hedge_timeout_ms: Tiempo máximo de espera de una lectura hedged.
+        :param error_penalty_ms: Milisegundos que suma una tasa de error del 100% a la puntuación.
+        :param alpha: Factor de suavizado de la EWMA.
+        :param timeout: Timeout de socket para los HTTPProvider creados a partir de URLs
+                        (también limita cuánto vive el hilo de una petición perdedora).
+        :param max_in_flight: Hilos de petición simultáneos como máximo, contando los
+                              perdedores de lecturas anteriores que aún no terminaron.
+        """
+        if not endpoints:
+            raise ValueError("Se necesita al menos un endpoint")
+        self.endpoints = []
+        for ep in endpoints:
+            if isinstance(ep, str):
+                from web3_mpy.web3 import HTTPProvider
+                ep = HTTPProvider(ep, timeout=timeout)
+            self.endpoints.append(Endpoint(ep, alpha))
+        self.hedge = hedge and _thread is not None and len(self.endpoints) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_timeout_ms = hedge_timeout_ms
+        self.error_penalty_ms = error_penalty_ms
+        self.hedges_sent = 0
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._lock = _thread.allocate_lock() if self.hedge else None
+
+    @property
+    def endpoint_uri(self):
+        return self.ranked()[0].name
+
+    def ranked(self):
+        """
+        Retorna los endpoints ordenados de mejor a peor puntuación.
+        """
+        penalty = self.error_penalty_ms
+        return sorted(self.endpoints, key=lambda ep: ep.score(penalty))
+
+    def _call(self, endpoint, method, params):
+        """
+        Ejecuta la petición en un endpoint y actualiza sus estadísticas.
+        Lanza EndpointError si el endpoint falla o responde con rate limiting.
+        """
+        start = ticks_ms()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception as e:
+            endpoint.record_error(elapsed_ms(start))
+            raise EndpointError("{}: {}".format(endpoint.name, e))
+        if _is_endpoint_error(response):
+            endpoint.record_error(elapsed_ms(start))
+            raise EndpointError("{}: {}".format(endpoint.name, response["error"].get("message")))
+        endpoint.record_success(elapsed_ms(start))
+        return response
+
+    def make_request(self, method, params):
+        ranked = self.ranked()
+        if self.hedge and method in READ_ONLY_METHODS:
+            return self._hedged_request(ranked, method, params)
+        if method in NON_IDEMPOTENT_METHODS:
+            ranked = ranked[:1]
+        return self._failover(ranked, method, params)
+
+    def _failover(self, ranked, method, params):
+        last_error = None
+        for endpoint in ranked:
+            try:
+                return self._call(endpoint, method, params)
+            except EndpointError as e:
+                last_error = e
+        raise EndpointError("Todos los endpoints fallaron. Último error: {}".format(last_error))
+
+    def make_batch_request(self, calls):
+        """
+        Envía un batch JSON‑RPC al mejor endpoint que lo soporte, con failover.
+        Los endpoints sin make_batch_request responden petición a petición.
+        """
+        last_error = None
+        for endpoint in self.ranked():
+            provider = endpoint.provider
+            start = ticks_ms()
+            try:
+                if hasattr(provider, "make_batch_request"):
+                    responses = provider.make_batch_request(calls)
+                else:
+                    responses = [provider.make_request(m, p) for m, p in calls]
+            except Exception as e:
+                endpoint.record_error(elapsed_ms(start))
+                last_error = EndpointError("{}: {}".format(endpoint.name, e))
+                continue
+            if responses and all(_is_endpoint_error(r) for r in responses):
+                endpoint.record_error(elapsed_ms(start))
+                last_error = EndpointError("{}: {}".format(endpoint.name, responses[0]["error"].get("message")))
+                continue
+            endpoint.record_success(elapsed_ms(start))
+            return responses
+        raise EndpointError("Todos los endpoints fallaron. Último error: {}".format(last_error))
+
+    def _hedge_delay(self, endpoint):
+        p = endpoint.percentile(self.hedge_percentile)
+        if p is None:
+            return self.hedge_min_ms
+        return max(self.hedge_min_ms, p)
+
+    def _spawn(self, race, endpoint, method, params):
+        # Lanza un hilo de petición si no se supera max_in_flight
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+        try:
+            _thread.start_new_thread(self._race_worker, (race, endpoint, method, params))
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            return False
+        return True
+
+    def _race_worker(self, race, endpoint, method, params):
+        try:
+            response = self._call(endpoint, method, params)
+        except EndpointError:
+            response = None
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with race.lock:
+            race.finished += 1
+            if response is not None and race.response is None:
+                race.response = response
+                race.winner = endpoint
+
+    def _hedged_request(self, ranked, method, params):
+        """
+        Lanza la petición al mejor endpoint y, si no responde antes de su percentil
+        de latencia (o falla), lanza la siguiente. Retorna la primera respuesta válida.
+        Sin hilos libres (max_in_flight) no se duplica: se sigue en el hilo actual.
+        """
+        race = _Race()
+        if not self._spawn(race, ranked[0], method, params):
+            return self._failover(ranked, method, params)
+        launched = 1
+        next_launch = self._hedge_delay(ranked[0])
+        start = ticks_ms()
+        while True:
+            with race.lock:
+                response = race.response
+                finished = race.finished
+            if response is not None:
+                if race.winner is not ranked[0]:
+                    race.winner.hedges_won += 1
+                return response
+            waited = elapsed_ms(start)
+            if launched < len(ranked) and (waited >= next_launch or finished == launched):
+                endpoint = ranked[launched]
+                if self._spawn(race, endpoint, method, params):
+                    self.hedges_sent += 1
+                    launched += 1
+                    next_launch = waited + self._hedge_delay(endpoint)
+                elif finished == launched:
+                    # Todo lo lanzado falló y no quedan hilos libres: failover síncrono con el resto
+                    return self._failover(ranked[launched:], method, params)
+                else:
+                    next_launch = waited + self.hedge_min_ms
+            elif finished == launched and launched == len(ranked):
+                raise EndpointError("Todos los endpoints fallaron para " + method)
+            if waited > self.hedge_timeout_ms:
+                raise EndpointError("Timeout en la lectura hedged de " + method)
+            sleep_ms(5)
+
+    def stats(self):
+        """
+        Retorna las estadísticas de cada endpoint y el número de duplicados enviados.
+        """
+        return {
+            "hedges_sent": self.hedges_sent,
+            "in_flight": self.in_flight,
+            "endpoints": [ep.stats() for ep in self.ranked()],
+        }
@@ -0,0 +1,126 @@
+# main/web3_mpy/multicall.py
+#
+# Agrupa varias lecturas de contratos en una sola petición al nodo.
+# Con Multicall3 (desplegado en la misma dirección en casi todas las redes) se
+# envía un único eth_call a aggregate3; si la red no tiene el contrato se
+# recurre a un batch JSON‑RPC con un eth_call por lectura.
+#
+# Uso:
+#   mc = Multicall(w3)
+#   mc.add(feed.functions.latestRoundData())
+#   mc.add(token.functions.balanceOf(wallet))
+#   for ok, value in mc.call():
+#       ...
+
+from web3_mpy.abi import parse_type, encode_abi, decode_abi
+from web3_mpy.codec import to_hex, to_json
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# aggregate3((address,bool,bytes)[]) -> (bool,bytes)[]
+AGGREGATE3_SELECTOR = b"\x82\xad\x56\xcb"
+_CALLS_NODE = parse_type("(address,bool,bytes)[]")
+_RESULTS_NODE = parse_type("(bool,bytes)[]")
+
+
+def _decode(fn, return_data):
+    """
+    Decodifica el retorno de una sub‑llamada con el ABI de su propia función.
+    Retorna (True, valor) o (False, None) si los datos no son decodificables.
+    """
+    try:
+        return True, fn.decode_output(return_data)
+    except Exception:
+        return False, None
+
+
+class Multicall:
+    def __init__(self, web3, address=MULTICALL3_ADDRESS, allow_failure=True, use_multicall=None):
+        """
+        :param web3: Instancia de Web3.
+        :param address: Dirección del contrato Multicall3.
+        :param allow_failure: Si es False, un revert en cualquier sub‑llamada revierte todo el aggregate3.
+        :param use_multicall: True/False fuerza el modo; None comprueba (una vez) si hay código en 'address'.
+        """
+        self.web3 = web3
+        self.address = address
+        self.allow_failure = allow_failure
+        self.use_multicall = use_multicall
+        self.calls = []
+
+    def add(self, fn):
+        """
+        Añade una llamada (ContractFunction, por ejemplo contract.functions.decimals()).
+        Retorna el índice que tendrá su resultado.
+        """
+        self.calls.append(fn)
+        return len(self.calls) - 1
+
+    def clear(self):
+        self.calls = []
+
+    def __len__(self):
+        return len(self.calls)
+
+    def is_available(self, block_identifier="latest"):
+        """
+        Retorna True si hay un contrato desplegado en la dirección de Multicall3.
+        El resultado se recuerda para no repetir eth_getCode.
+        """
+        if self.use_multicall is None:
+            response = self.web3.provider.make_request("eth_getCode", [self.address, block_identifier])
+            code = response.get("result") or "0x"
+            self.use_multicall = len(code) > 2
+        return self.use_multicall
+
+    def encode(self):
+        """
+        Retorna el calldata de aggregate3 para las llamadas añadidas.
+        """
+        allow = self.allow_failure
+        calls = [(fn.address, allow, fn.data) for fn in self.calls]
+        return encode_abi((_CALLS_NODE,), (calls,), AGGREGATE3_SELECTOR)
+
+    def call(self, block_identifier="latest"):
+        """
+        Ejecuta todas las llamadas y retorna una lista de tuplas (éxito, valor),
+        en el mismo orden en que se añadieron. 'valor' es None si la llamada falló.
+        """
+        if not self.calls:
+            return []
+        if self.is_available(block_identifier):
+            return self._call_aggregate3(block_identifier)
+        return self._call_batch(block_identifier)
+
+    def _call_aggregate3(self, block_identifier):
+        payload = {
+            "to": to_json(self.address),
+            "data": to_hex(self.encode())   # Ya en hex: to_json no copia los params
+        }
+        response = self.web3.provider.make_request("eth_call", [payload, block_identifier])
+        if "error" in response:
+            raise Exception("Error en aggregate3: " + str(response["error"].get("message")))
+        results = decode_abi((_RESULTS_NODE,), response.get("result"))[0]
+        out = []
+        for fn, (success, return_data) in zip(self.calls, results):
+            out.append(_decode(fn, return_data) if success else (False, None))
+        return out
+
+    def _call_batch(self, block_identifier):
+        requests = [
+            ("eth_call", [{"to": to_json(fn.address), "data": to_hex(fn.data)}, block_identifier])
+            for fn in self.calls
+        ]
+        provider = self.web3.provider
+        if hasattr(provider, "make_batch_request"):
+            responses = provider.make_batch_request(requests)
+        else:
+            responses = [provider.make_request(m, p) for m, p in requests]
+        out = []
+        for fn, response in zip(self.calls, responses):
+            result = response.get("result") if isinstance(response, dict) else None
+            if result is None or "error" in response:
+                out.append((False, None))
+            else:
+                out.append(_decode(fn, result))
+        return out
@@ -0,0 +1,216 @@
+# main/web3_mpy/price_feed.py
+#
+# Seguimiento de un oráculo de precios Chainlink sin hacer eth_call en cada consulta.
+# El proxy (EACAggregatorProxy) no emite eventos: los emite el agregador al que
+# apunta, por lo que se resuelve una vez con aggregator() y se leen sus logs
+# AnswerUpdated/NewRound. Cada AnswerUpdated trae el precio, el round y la hora,
+# así que la ronda se registra directamente desde el log; latestRoundData solo
+# se vuelve a leer al arrancar, tras un hueco demasiado grande, si el oráculo
+# lleva 'max_idle_blocks' bloques sin actualizarse o, en cualquier caso, cada
+# 'recheck_blocks' bloques. Así se detecta que el proxy cambió de agregador (fase
+# nueva) aunque el agregador antiguo siga emitiendo rondas.
+#
+# Uso:
+#   import abi_oracle_btc_usd
+#   feed = PriceFeed(w3, "0xF4030086522a5bEEa4988F8cA5B36dbC97BeE88c", abi_oracle_btc_usd)
+#   while True:
+#       if feed.poll():
+#           print(feed.price())
+#       time.sleep(12)
+
+from web3_mpy.contract import Contract
+
+_PHASE_OFFSET = 64
+
+
+class RoundBuffer:
+    """
+    Buffer circular de las últimas rondas (roundId, answer, updatedAt) con memoria fija.
+    """
+
+    def __init__(self, size=16):
+        self.size = size
+        self.round_ids = [0] * size
+        self.answers = [0] * size
+        self.updated_at = [0] * size
+        self.count = 0
+        self.head = 0   # Posición donde se escribirá la siguiente ronda
+
+    def __len__(self):
+        return self.count
+
+    def append(self, round_id, answer, updated_at):
+        i = self.head
+        self.round_ids[i] = round_id
+        self.answers[i] = answer
+        self.updated_at[i] = updated_at
+        self.head = (i + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def latest(self):
+        """
+        Retorna la última ronda (roundId, answer, updatedAt) o None si está vacío.
+        """
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.size
+        return self.round_ids[i], self.answers[i], self.updated_at[i]
+
+    def get(self, round_id):
+        """
+        Retorna (roundId, answer, updatedAt) si la ronda sigue en el buffer, o None.
+        """
+        for entry in self:
+            if entry[0] == round_id:
+                return entry
+        return None
+
+    def __iter__(self):
+        # De la más antigua a la más reciente
+        start = (self.head - self.count) % self.size
+        for k in range(self.count):
+            i = (start + k) % self.size
+            yield self.round_ids[i], self.answers[i], self.updated_at[i]
+
+
+class PriceFeed:
+    def __init__(self, web3, address, abi, history=16, max_block_range=500, max_idle_blocks=300,
+                 recheck_blocks=7200):
+        """
+        :param web3: Instancia de Web3.
+        :param address: Dirección del proxy del oráculo.
+        :param abi: ABI del oráculo (JSON o compilado) con latestRoundData, aggregator,
+                    decimals y los eventos AnswerUpdated/NewRound.
+        :param history: Número de rondas que se guardan en el buffer circular.
+        :param max_block_range: Máximo de bloques por eth_getLogs; con un hueco mayor se relee latestRoundData.
+        :param max_idle_blocks: Relee latestRoundData cuando pasan esos bloques sin rondas nuevas
+                                (por ejemplo, si el proxy cambió de agregador). None lo desactiva.
+        :param recheck_blocks: Relee latestRoundData (y la fase del proxy) cada tantos bloques
+                               aunque haya rondas nuevas. None lo desactiva.
+        """
+        self.web3 = web3
+        self.proxy = Contract(address, abi, web3)
+        self.abi = abi
+        self.rounds = RoundBuffer(history)
+        self.max_block_range = max_block_range
+        self.max_idle_blocks = max_idle_blocks
+        self.recheck_blocks = recheck_blocks
+        self.last_refresh_block = None
+        self.aggregator = None
+        self.phase = 0
+        self.decimals = None
+        self.last_block = None
+        self.last_update_block = None
+        self.pending_round = None   # Ronda abierta con NewRound y aún sin respuesta
+        self.calls = 0              # eth_call realizados (para medir el ahorro)
+
+    def _block_number(self):
+        response = self.web3.provider.make_request("eth_blockNumber", [])
+        return int(response["result"], 16)
+
+    def resolve_aggregator(self):
+        """
+        Consulta aggregator() en el proxy y prepara el contrato del agregador para los eventos.
+        """
+        self.calls += 1
+        address = self.proxy.functions.aggregator().call()
+        self.aggregator = Contract(address, self.abi, self.web3)
+        return address
+
+    def refresh(self):
+        """
+        Lee latestRoundData (un eth_call) y registra la ronda si es nueva.
+        Retorna True si la ronda cambió.
+        """
+        self.calls += 1
+        self.last_refresh_block = self.last_block
+        round_id, answer, _started, updated_at, _answered = self.proxy.functions.latestRoundData().call()
+        phase = round_id >> _PHASE_OFFSET
+        if self.aggregator is None or phase != self.phase:
+            # Nueva fase: el proxy apunta a otro agregador
+            self.phase = phase
+            self.resolve_aggregator()
+        return self._record(round_id, answer, updated_at)
+
+    def _record(self, round_id, answer, updated_at):
+        latest = self.rounds.latest()
+        if latest is not None and latest[0] >= round_id:
+            return False
+        self.rounds.append(round_id, answer, updated_at)
+        self.last_update_block = self.last_block
+        if self.pending_round is not None and self.pending_round <= round_id:
+            self.pending_round = None
+        return True
+
+    def _event_filter(self, from_block, to_block):
+        events = self.aggregator.events
+        return {
+            "address": self.aggregator.address,
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "topics": [[events.AnswerUpdated.topic_hex, events.NewRound.topic_hex]],
+        }
+
+    def poll(self):
+        """
+        Comprueba si hay rondas nuevas. Sin bloques nuevos solo cuesta un eth_blockNumber;
+        con bloques nuevos, un eth_getLogs sobre el agregador. Retorna True si hay ronda nueva.
+        """
+        block = self._block_number()
+        if self.last_block is None:
+            self.last_block = block
+            return self.refresh()
+        if block <= self.last_block:
+            return False
+        if block - self.last_block > self.max_block_range:
+            self.last_block = block
+            return self.refresh()
+        params = self._event_filter(self.last_block + 1, block)
+        response = self.web3.provider.make_request("eth_getLogs", [params])
+        if "error" in response:
+            raise Exception("Error en eth_getLogs: " + response["error"]["message"])
+        self.last_block = block
+        changed = False
+        base = self.phase << _PHASE_OFFSET
+        for event in self.aggregator.events.iter_decode_logs(response.get("result", [])):
+            args = event["args"]
+            if event["event"] == "AnswerUpdated":
+                # El roundId del agregador no incluye la fase; el del proxy sí
+                if self._record(base | args["roundId"], args["current"], args["updatedAt"]):
+                    changed = True
+            elif event["event"] == "NewRound":
+                self.pending_round = base | args["roundId"]
+        if (not changed and self.max_idle_blocks is not None
+                and block - (self.last_update_block or 0) >= self.max_idle_blocks):
+            self.last_update_block = block
+            changed = self.refresh()
+        elif (self.recheck_blocks is not None
+                and block - (self.last_refresh_block or 0) >= self.recheck_blocks):
+            # El agregador antiguo puede seguir emitiendo rondas tras el cambio de fase
+            changed = self.refresh() or changed
+        return changed
+
+    def latest(self):
+        """
+        Retorna la última ronda conocida (roundId, answer, updatedAt) sin consultar la red.
+        """
+        return self.rounds.latest()
+
+    def price(self):
+        """
+        Retorna el último precio normalizado con los decimales del oráculo.
+        """
+        latest = self.rounds.latest()
+        if latest is None:
+            return None
+        if self.decimals is None:
+            self.calls += 1
+            self.decimals = self.proxy.functions.decimals().call()
+        return latest[1] / (10 ** self.decimals)
+
+    def history(self):
+        """
+        Lista de rondas del buffer, de la más antigua a la más reciente.
+        """
+        return list(self.rounds)
@@ -2,14 +2,21 @@
 
 
 import urequests
-import json, gc
+import json
+from web3_mpy.memory import before_large_alloc, RESPONSE_RESERVE
+from web3_mpy.codec import to_json
 
 class Provider:
-    def __init__(self, endpoint_uri):
+    def __init__(self, endpoint_uri, resolver=None):
         """
         Inicializa el proveedor con la URL del nodo (por ejemplo, Infura).
+        Si se indica 'resolver' (web3_mpy.resolver.Resolver), el DNS del endpoint se cachea.
         """
         self.endpoint_uri = endpoint_uri
+        self.resolver = resolver
+        if resolver is not None:
+            from web3_mpy.resolver import install
+            install(resolver)
 
     def make_request(self, method, params):
         """
@@ -19,7 +26,7 @@ class Provider:
         :param params: Lista de parámetros para la llamada.
         :return: Diccionario con la respuesta del nodo.
         """
-        gc.collect()  # Liberar memoria antes de la solicitud
+        before_large_alloc(RESPONSE_RESERVE)  # Recolectar solo si no cabe la respuesta
         payload = {
             "jsonrpc": "2.0",
             "method": method,
@@ -30,7 +37,7 @@ class Provider:
             response = urequests.post(
                 self.endpoint_uri,
                 headers={"Content-Type": "application/json"},
-                data=json.dumps(payload)
+                data=json.dumps(to_json(payload))
             )
             # Convertir la respuesta a un diccionario
             result = response.json()
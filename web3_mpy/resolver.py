@@ -0,0 +1,177 @@
+# main/web3_mpy/resolver.py
+#
+# Caché de resolución DNS para los endpoints JSON‑RPC.
+# urequests llama a getaddrinfo en cada petición; este módulo sustituye esa
+# llamada por una versión cacheada (con TTL y último resultado conocido como
+# respaldo si el DNS falla).
+
+import time
+from web3_mpy.clock import ticks_ms, elapsed_ms
+
+try:
+    import usocket as socket
+except ImportError:
+    import socket
+
+
+def split_url(url):
+    """
+    Extrae (host, puerto) de una URL http(s)://host[:puerto]/ruta.
+    """
+    proto, _, rest = url.partition("://")
+    host = rest.split("/", 1)[0]
+    port = 443 if proto == "https" else 80
+    if ":" in host:
+        host, port_str = host.rsplit(":", 1)
+        port = int(port_str)
+    return host, port
+
+
+class Resolver:
+    """
+    Resolver con caché por (host, puerto).
+
+    Ejemplo:
+        resolver = Resolver(ttl=600)
+        provider = HTTPProvider(infura_url, resolver=resolver)
+        net = Network(ssid, password, resolver=resolver, prewarm_urls=[infura_url])
+    """
+
+    def __init__(self, ttl=300, max_entries=8, hosts=None):
+        """
+        :param ttl: Segundos que se considera válida una resolución.
+        :param max_entries: Número máximo de hosts en caché.
+        :param hosts: Diccionario {host: ip} con direcciones fijas (no se consulta el DNS).
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hosts = hosts or {}
+        self._getaddrinfo = socket.getaddrinfo
+        self._cache = {}  # (host, puerto) -> [addrinfo, expira]
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.lookup_ms = 0
+        self.last_lookup_ms = {}
+
+    def getaddrinfo(self, host, port, *args):
+        """
+        Sustituto de socket.getaddrinfo con caché.
+        """
+        key = (host, port)
+        now = time.time()
+        entry = self._cache.get(key)
+        if entry is not None and now < entry[1]:
+            self.hits += 1
+            return entry[0]
+
+        start = ticks_ms()
+        try:
+            info = self._getaddrinfo(self.hosts.get(host, host), port, *args)
+        except OSError:
+            if entry is not None:
+                # DNS caído: se usa la última dirección conocida
+                self.fallbacks += 1
+                entry[1] = now + self.ttl
+                return entry[0]
+            raise
+        ms = elapsed_ms(start)
+        self.misses += 1
+        self.lookup_ms += ms
+        self.last_lookup_ms[host] = ms
+
+        if entry is None and len(self._cache) >= self.max_entries:
+            # Se expulsa la entrada que caduca antes
+            oldest = min(self._cache, key=lambda k: self._cache[k][1])
+            del self._cache[oldest]
+        self._cache[key] = [info, now + self.ttl]
+        return info
+
+    def prewarm(self, urls):
+        """
+        Resuelve por adelantado los hosts de las URLs indicadas (justo tras conectar la red).
+        Los fallos se ignoran: la primera petición volverá a intentarlo.
+        """
+        for url in urls:
+            host, port = split_url(url)
+            try:
+                self.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+            except OSError:
+                pass
+
+    def invalidate(self, host=None):
+        """
+        Olvida las resoluciones de 'host' (o todas si es None).
+        """
+        if host is None:
+            self._cache = {}
+        else:
+            for key in [k for k in self._cache if k[0] == host]:
+                del self._cache[key]
+
+    def stats(self):
+        """
+        Retorna contadores y tiempos. 'saved_ms' estima la latencia ahorrada
+        multiplicando los aciertos por la duración media de una resolución real.
+        """
+        avg = (self.lookup_ms / self.misses) if self.misses else 0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "lookup_ms": self.lookup_ms,
+            "avg_lookup_ms": avg,
+            "saved_ms": self.hits * avg,
+            "last_lookup_ms": dict(self.last_lookup_ms),
+        }
+
+
+class _SocketProxy:
+    """
+    Sustituye al módulo socket dentro de urequests: getaddrinfo pasa por el
+    Resolver y el resto de atributos se delegan en el módulo original.
+    """
+
+    def __init__(self, module, resolver):
+        self._module = module
+        self.getaddrinfo = resolver.getaddrinfo
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+
+def _implementation(module):
+    # En micropython-lib, urequests.py es solo "from requests import *": sus funciones
+    # leen los globales de requests, así que parchear urequests.socket no tendría efecto
+    try:
+        import requests
+    except ImportError:
+        return module
+    if module is not requests and getattr(module, "request", None) is getattr(requests, "request", False):
+        return requests
+    return module
+
+
+def install(resolver, module=None):
+    """
+    Instala 'resolver' en urequests (o en 'module'). Soporta tanto el urequests
+    clásico ('import usocket') como el paquete requests de micropython-lib ('import socket'),
+    también cuando urequests es solo el alias de requests.
+    Retorna True si se pudo instalar, False si ningún parche tendría efecto.
+    """
+    if module is None:
+        try:
+            import urequests as module
+        except ImportError:
+            return False
+    module = _implementation(module)
+    installed = False
+    for name in ("usocket", "socket"):
+        mod = getattr(module, name, None)
+        if mod is None:
+            continue
+        if isinstance(mod, _SocketProxy):
+            mod = mod._module
+        setattr(module, name, _SocketProxy(mod, resolver))
+        installed = True
+    return installed
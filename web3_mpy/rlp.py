@@ -1,14 +1,12 @@
 # main/web3_mpy/rlp.py
 
+from web3_mpy.codec import int_to_min_bytes
+
 def int_to_bytes(x):
-    """Convierte un entero a su representación en bytes."""
+    """Convierte un entero a su representación en bytes (longitud mínima, big-endian)."""
     if x == 0:
         return b'\x00'
-    b = b""
-    while x:
-        b = bytes([x & 0xff]) + b
-        x //= 256
-    return b
+    return int_to_min_bytes(x)
 
 
 
@@ -21,9 +19,10 @@ def rlp_encode(item):
         else:
             b = int_to_bytes(item)
             return bytes([len(b) + 0x80]) + b
-    elif isinstance(item, bytes):
+    elif isinstance(item, (bytes, bytearray, memoryview)):
+        # bytearray/memoryview (calldata de ContractFunction) se aceptan sin copia previa
         if len(item) == 1 and item[0] < 128:
-            return item
+            return bytes(item)
         elif len(item) < 56:
             return bytes([len(item) + 0x80]) + item
         else:
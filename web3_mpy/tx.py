@@ -2,6 +2,17 @@
 
 from web3_mpy.rlp import rlp_encode
 from web3_mpy.keccak import keccak_256
+from web3_mpy.address import canonical_address
+from web3_mpy.codec import as_bytes
+
+
+def _to_field(to):
+    """
+    Campo 'to' de la transacción: 20 bytes (cadena, bytes o Address) o b"" al crear un contrato.
+    """
+    if not to:
+        return b""
+    return canonical_address(to)
 
 def encode_tx(tx):
     """
@@ -15,9 +26,9 @@ def encode_tx(tx):
         int(tx['nonce']),
         int(tx['gasPrice']),
         int(tx['gasLimit']),
-        bytes.fromhex(tx['to'][2:]) if tx['to'].startswith("0x") else tx['to'],
+        _to_field(tx['to']),
         int(tx['value']),
-        bytes.fromhex(tx['data'][2:]) if tx['data'].startswith("0x") else bytes.fromhex(tx['data']),
+        as_bytes(tx['data']),
         int(tx['v']),
         int(tx['r']),
         int(tx['s'])
@@ -86,9 +97,9 @@ def construct_signed_tx(tx, r, s, chain_id, recid):
         tx['nonce'],
         tx['gasPrice'],
         tx['gasLimit'],
-        bytes.fromhex(tx['to'][2:]) if tx['to'].startswith("0x") else tx['to'],
+        _to_field(tx['to']),
         tx['value'],
-        bytes.fromhex(tx['data'][2:]) if tx['data'].startswith("0x") else tx['data'],
+        as_bytes(tx['data']),
         tx['v'],
         tx['r'],
         tx['s']
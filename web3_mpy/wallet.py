@@ -1,13 +1,13 @@
 # main/web3_mpy/wallet.py
 
 import os
-import ubinascii
+from web3_mpy.codec import int_from_bytes, int_to_bytes, int_to_hex, pad_hex, to_hex
 from web3_mpy.keccak import keccak_256  # Asegúrate de que keccak.py esté en el mismo directorio
 
-import gc
+from web3_mpy.memory import maybe_collect, before_large_alloc, SIGN_RESERVE
 
 def clear_memory():
-    gc.collect()
+    maybe_collect()
 
 # Parámetros de la curva secp256k1
 p = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
@@ -60,9 +60,7 @@ def pad_left(s, width):
     return s.rjust(width, "0")
 '''
 def pad_left(s, width):
-    while len(s) < width:
-        s = "0" + s
-    return s
+    return pad_hex(s, width)
 
 class Wallet:
     """Clase para generar claves privadas, públicas y la dirección Ethereum."""
@@ -70,24 +68,23 @@ class Wallet:
     @staticmethod
     def generate_keypair():
         # Generar una clave privada aleatoria (32 bytes) y asegurar que sea válida
-        private_key = int.from_bytes(os.urandom(32), 'big') % n
+        private_key = int_from_bytes(os.urandom(32)) % n
         if private_key == 0:
             private_key = 1
         # Calcular la clave pública (punto en la curva secp256k1)
+        before_large_alloc(SIGN_RESERVE)
         public_point = scalar_mult(private_key, G)
         # Formatear la clave privada a hexadecimal (64 dígitos)
-        private_key_hex = pad_left(hex(private_key)[2:].rstrip("L"), 64)
+        private_key_hex = int_to_hex(private_key, 64)
         # Convertir las coordenadas de la clave pública a bytes (32 bytes cada una)
-        x_bytes = public_point[0].to_bytes(32, 'big')
-        y_bytes = public_point[1].to_bytes(32, 'big')
+        x_bytes = int_to_bytes(public_point[0], 32)
+        y_bytes = int_to_bytes(public_point[1], 32)
         public_key_bytes = x_bytes + y_bytes
         # Calcular el hash Keccak-256 de la clave pública
         hash_bytes = keccak_256(public_key_bytes)
         # Derivar la dirección Ethereum: se toman los últimos 20 bytes del hash
         address_bytes = hash_bytes[-20:]
-        address_hex = ubinascii.hexlify(address_bytes).decode()
-        clear_memory()
-        return "0x" + private_key_hex, "0x" + address_hex
+        return "0x" + private_key_hex, to_hex(address_bytes)
 '''
 if __name__ == '__main__':
     priv, addr = Wallet.generate_keypair()
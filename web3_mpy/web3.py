@@ -1,38 +1,55 @@
 # main/web3_mpy/web3.py
 
-import urequests
 import json
-import ubinascii
-from web3_mpy.eth_utils import to_checksum_address  # Para validación
-from web3_mpy.account import Account
+from web3_mpy.codec import to_json, to_hex
+from web3_mpy.compression import ACCEPT_ENCODING, CompressionStats, header_value, read_compressed_json
+from web3_mpy.memory import before_large_alloc, RESPONSE_RESERVE
+from web3_mpy.gas import GasEstimateCache
+from web3_mpy.base_eth import BaseEth
 
-'''
-import gc
+# La recolección de basura la decide web3_mpy.memory (umbral de memoria libre y
+# gc.threshold), en lugar de un hilo que llame a gc.collect() periódicamente.
 
-clear_memory():
-    gc.collect()
-'''
+# Carga diferida: urequests se importa en la primera petición, y la firma
+# (Account -> tx, rlp, ecdsa, wallet) y la validación de direcciones (keccak)
+# al usarlas por primera vez. Un script de solo lectura no las carga nunca.
+urequests = None
 
-import gc
-import _thread
-import time
+# None hasta la primera respuesta: si urequests no expone sus cabeceras (versiones
+# antiguas no guardan 'headers'), no se puede saber si el cuerpo viene comprimido
+# y no se anuncia Accept-Encoding.
+_headers_readable = None
 
-def memory_cleaner():
-    while True:
-        gc.collect()
-        free = gc.mem_free()
-        total = free + gc.mem_alloc()
-        #print("GC: {} bytes libres de {} totales".format(free, total))
-        time.sleep(120)  # Espera 60 segundos antes de la siguiente recolección
 
-# Inicia el hilo de limpieza de memoria
-#_thread.start_new_thread(memory_cleaner, ())
+def _http():
+    global urequests
+    if urequests is None:
+        import urequests as module
+        urequests = module
+    return urequests
 
 
 
 class HTTPProvider:
-    def __init__(self, endpoint_uri):
+    def __init__(self, endpoint_uri, timeout=None, compression=True, window_bits=15, resolver=None):
+        """
+        :param endpoint_uri: URL del nodo JSON‑RPC.
+        :param timeout: Timeout de socket en segundos (None usa el de urequests).
+        :param compression: Negocia gzip/deflate con el nodo si el firmware puede descomprimir
+                            y urequests expone las cabeceras de la respuesta (se comprueba
+                            en la primera petición, que va sin comprimir).
+        :param window_bits: Tamaño de la ventana de descompresión (2**window_bits bytes).
+        :param resolver: Instancia de web3_mpy.resolver.Resolver para cachear el DNS del endpoint.
+        """
         self.endpoint_uri = endpoint_uri
+        self.resolver = resolver
+        if resolver is not None:
+            from web3_mpy.resolver import install
+            install(resolver)
+        self.timeout = timeout
+        self.compression = compression and ACCEPT_ENCODING is not None
+        self.window_bits = window_bits
+        self.compression_stats = CompressionStats()
 
     def make_request(self, method, params):
         """
@@ -44,25 +61,109 @@ class HTTPProvider:
             "params": params,
             "id": 1
         }
-        response = urequests.post(
+        return self._post(payload, method)
+
+    def make_batch_request(self, calls):
+        """
+        Envía varias peticiones en un único batch JSON‑RPC (una sola conexión HTTP).
+        'calls' es una lista de tuplas (method, params).
+        Retorna la lista de respuestas en el mismo orden que 'calls'.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+            for i, (method, params) in enumerate(calls)
+        ]
+        result = self._post(payload, "batch")
+        if isinstance(result, dict):
+            # El nodo no acepta batches: responde con un único error
+            return [result] * len(calls)
+        ordered = [None] * len(calls)
+        for item in result:
+            i = item.get("id")
+            if isinstance(i, int) and 0 <= i < len(calls):
+                ordered[i] = item
+        for i in range(len(calls)):
+            if ordered[i] is None:
+                ordered[i] = {"error": {"code": -32603, "message": "Sin respuesta en el batch"}}
+        return ordered
+
+    def _post(self, payload, label):
+        global _headers_readable
+        before_large_alloc(RESPONSE_RESERVE)
+        headers = {"Content-Type": "application/json"}
+        if self.compression and _headers_readable:
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
+        kwargs = {}
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        response = _http().post(
             self.endpoint_uri,
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload)
+            headers=headers,
+            data=json.dumps(to_json(payload)),   # bytes/Address -> "0x..." solo aquí, al serializar
+            **kwargs
         )
-        result = response.json()
-        response.close()
+        try:
+            response_headers = getattr(response, "headers", None)
+            if _headers_readable is None:
+                _headers_readable = response_headers is not None
+            encoding = header_value(response_headers, "Content-Encoding")
+            if encoding in ("gzip", "deflate"):
+                # Se descomprime directamente desde el socket, sin copiar el cuerpo comprimido
+                result = read_compressed_json(response.raw, encoding, self.window_bits,
+                                              self.compression_stats, label)
+            else:
+                content = response.content
+                self.compression_stats.record(label, len(content), len(content))
+                result = json.loads(content)
+        finally:
+            response.close()
         return result
 
-class Eth:
+class Eth(BaseEth):
     def __init__(self, web3):
+        BaseEth.__init__(self, web3)
         self.web3 = web3
+        # Estimaciones de gas reutilizables por forma de llamada (ver estimate_gas)
+        self.gas_estimates = GasEstimateCache()
+        # Vista compartida de las últimas cabeceras (ver follow_blocks)
+        self.block_follower = None
+
+    @property
+    def account(self):
+        # Account (y con ella tx, rlp, ecdsa y wallet) se importa al usarla por primera vez
+        if self._account is None:
+            from web3_mpy.account import Account
+            self._account = Account(self.web3)
+        return self._account
+
+    @account.setter
+    def account(self, value):
+        self._account = value
+
+    def follow_blocks(self, size=16, on_reorg=None, backfill=False):
+        """
+        Crea (una sola vez) el BlockFollower de esta instancia. eth_avgGasLimit y la caché
+        de estimaciones de gas pasan a usar sus cabeceras; llama a follower.poll() para avanzar.
+        Con backfill=True el primer sondeo carga los 'size' últimos bloques y no solo la cabeza.
+        """
+        if self.block_follower is None:
+            from web3_mpy.blocks import BlockFollower
+            self.block_follower = BlockFollower(self.web3, size, on_reorg, backfill)
+            self.block_follower.add_listener(self.gas_estimates)
+        return self.block_follower
     
     def eth_avgGasLimit(self, block_identifier="latest"):
         """
         Obtiene el bloque más reciente (sin transacciones completas) y calcula el gas limit promedio
         dividiendo el gasLimit total entre el número de transacciones (si existen).  
         Retorna una tupla (total_gas_limit, avg_gas_limit) en entero.
+        Si hay un BlockFollower (follow_blocks) y el bloque está en su buffer, no hace ninguna petición.
         """
+        follower = self.block_follower
+        if follower is not None and (block_identifier == "latest" or isinstance(block_identifier, int)):
+            cached = follower.avg_gas_limit(None if block_identifier == "latest" else block_identifier)
+            if cached is not None:
+                return cached
         response = self.web3.provider.make_request("eth_getBlockByNumber", [block_identifier, False])
         block = response.get("result")
         if block is None:
@@ -90,6 +191,22 @@ class Eth:
         from web3_mpy.contract import Contract
         return Contract(address, abi, self.web3)
 
+    def filter(self, filter_params=None, filter_id=None):
+        """
+        Crea un filtro en el nodo y retorna un objeto Filter con sondeo incremental:
+          - filter_params dict: filtro de logs (eth_newFilter).
+          - "latest": hashes de bloques nuevos (eth_newBlockFilter).
+          - "pending": hashes de transacciones pendientes.
+          - filter_id: usa un filtro ya creado en el nodo. Sus parámetros no se conocen, así que
+            no se puede recrear si el nodo lo descarta; para eso, usa Filter(w3, params, filter_id=...).
+        Si el nodo no soporta filtros, se emulan con eth_getLogs por rangos de bloques.
+        """
+        from web3_mpy.filters import Filter
+        params = self.filter_munger(filter_params, filter_id)[0]
+        if filter_id is not None:
+            return Filter(self.web3, None, filter_id=params)
+        return Filter(self.web3, params)
+
     def get_balance(self, address, block_identifier="latest"):
         result = self.web3.provider.make_request("eth_getBalance", [address, block_identifier])
         return result.get("result")
@@ -137,6 +254,20 @@ class Eth:
             raise Exception("Error en eth_estimateGas: " + response["error"]["message"])
         return response["result"]
 
+    def estimate_gas(self, transaction_object, block_identifier="latest", refresh=False):
+        """
+        Retorna el gas límite (entero, con el margen de self.gas_estimates.multiplier).
+        Reutiliza la estimación de llamadas con la misma forma (to, selector, valor > 0,
+        longitud de datos); solo llama a eth_estimateGas si no hay estimación vigente
+        o si refresh=True (por ejemplo, tras una transacción que se quedó sin gas).
+        """
+        cache = self.gas_estimates
+        estimate = None if refresh else cache.get(transaction_object)
+        if estimate is None:
+            estimate = int(self.eth_estimateGas(transaction_object, block_identifier), 16)
+            cache.put(transaction_object, estimate)
+        return cache.gas_limit(estimate)
+
     def eth_feeHistory(self, block_count, newest_block, reward_percentiles):
         return self.web3.provider.make_request("eth_feeHistory", [block_count, newest_block, reward_percentiles])["result"]
 
@@ -182,6 +313,21 @@ class Eth:
     def eth_getTransactionReceipt(self, transaction_hash):
         return self.web3.provider.make_request("eth_getTransactionReceipt", [transaction_hash])["result"]
 
+    def eth_newFilter(self, filter_object):
+        return self.web3.provider.make_request("eth_newFilter", [filter_object])["result"]
+
+    def eth_newBlockFilter(self):
+        return self.web3.provider.make_request("eth_newBlockFilter", [])["result"]
+
+    def eth_getFilterChanges(self, filter_id):
+        return self.web3.provider.make_request("eth_getFilterChanges", [filter_id])["result"]
+
+    def eth_getFilterLogs(self, filter_id):
+        return self.web3.provider.make_request("eth_getFilterLogs", [filter_id])["result"]
+
+    def eth_uninstallFilter(self, filter_id):
+        return self.web3.provider.make_request("eth_uninstallFilter", [filter_id])["result"]
+
 
 class Web3:
     def __init__(self, provider):
@@ -191,15 +337,11 @@ class Web3:
         """
         self.provider = provider  # Por ejemplo, una instancia de HTTPProvider o Provider
         self.eth = Eth(self)
-        #from web3_mpy.account import Account
-        #self._account = Account(self)
-        
-        # Inicializa la funcionalidad de cuentas y la asigna a w3.eth.account
-        self.eth.account = Account(self)
+        # w3.eth.account se crea al usarla por primera vez (ver Eth.account)
 
     @property
     def account(self):
-        return self._account
+        return self.eth.account
 
     @property
     def chain_id(self):
@@ -233,11 +375,12 @@ class Web3:
         return True
 
     def to_checksum_address(self, address):
+        from web3_mpy.address import to_checksum_address
         return to_checksum_address(address)
 
     def to_hex(self, value):
         if isinstance(value, bytes):
-            return "0x" + ubinascii.hexlify(value).decode()
+            return to_hex(value)
         raise TypeError("El valor debe ser de tipo bytes")
 
     def from_wei(self, value, unit="ether"):